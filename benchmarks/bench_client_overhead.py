@@ -0,0 +1,83 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Microbenchmarks for the per-request Python overhead of OsduClient.
+
+Requests are sent to a zero-latency FakeOsduServer, so the difference between OsduClient and a
+plain requests.Session call is the overhead added by the SDK.
+
+    python benchmarks/bench_client_overhead.py --requests 2000
+"""
+
+import argparse
+import json
+import timeit
+
+import requests
+
+from osdu.client import OsduClient
+from osdu.testing import FakeOsduServer, StaticTokenCredential, SyntheticDataset
+
+
+def per_call_us(func, count: int) -> float:
+    """Best of 3 runs of count calls to func, in microseconds per call"""
+    return min(timeit.repeat(func, number=count, repeat=3)) / count * 1e6
+
+
+def parse_args(argv: list = None) -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    return parser.parse_args(argv)
+
+
+def run_benchmark(args: argparse.Namespace) -> dict:
+    """Run the benchmark and return the results"""
+    with FakeOsduServer(SyntheticDataset(records=0)) as server:
+        url = server.url + "/api/search/v2/info"
+        query_url = server.url + "/api/search/v2/query"
+        client = OsduClient(server.url, "opendes", StaticTokenCredential())
+        session = requests.Session()
+        headers = client.get_headers()
+        data = {"kind": "*:*:*:*", "limit": 1}
+
+        results = {
+            "get_headers_us": per_call_us(client.get_headers, args.requests * 100),
+            "get_headers_extra_us": per_call_us(
+                lambda: client.get_headers({"correlation-id": "1"}), args.requests * 100
+            ),
+            "session_get_us": per_call_us(
+                lambda: session.get(url, headers=headers, timeout=60), args.requests
+            ),
+            "client_get_us": per_call_us(lambda: client.get(url), args.requests),
+            "session_post_us": per_call_us(
+                lambda: session.post(query_url, json=data, headers=headers, timeout=60).json(),
+                args.requests,
+            ),
+            "client_post_returning_json_us": per_call_us(
+                lambda: client.post_returning_json(query_url, data), args.requests
+            ),
+            "requests_module_get_us": per_call_us(
+                lambda: requests.get(url, headers=headers, timeout=60), args.requests // 4
+            ),
+        }
+
+    overheads = {
+        "client_get_overhead_us": results["client_get_us"] - results["session_get_us"],
+        "client_post_overhead_us": (
+            results["client_post_returning_json_us"] - results["session_post_us"]
+        ),
+    }
+    return {**results, **overheads}
+
+
+def main():
+    """Main function"""
+    print(json.dumps(run_benchmark(parse_args()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Benchmark p50/p99 search latency with and without request hedging.
+
+Runs against a FakeOsduServer where a fraction of calls hit a slow "node".
+
+    python benchmarks/bench_hedging.py --requests 500 --slow-fraction 0.02
+"""
+
+import argparse
+import json
+import time
+
+from common import percentile
+
+from osdu.client import OsduClient
+from osdu.hedging import HedgingPolicy
+from osdu.search import SearchClient
+from osdu.testing import FakeOsduServer, StaticTokenCredential, SyntheticDataset, bimodal_latency
+
+
+def run(search_client: SearchClient, count: int) -> dict:
+    """Run count queries and return latency statistics in milliseconds"""
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        search_client.query(kind="osdu:wks:master-data--Well:1.0.0", limit=10)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {"p50_ms": percentile(latencies, 50), "p99_ms": percentile(latencies, 99)}
+
+
+def parse_args(argv: list = None) -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--fast", type=float, default=0.005, help="fast latency in seconds")
+    parser.add_argument("--slow", type=float, default=0.2, help="slow latency in seconds")
+    parser.add_argument("--slow-fraction", type=float, default=0.02)
+    parser.add_argument("--percentile", type=float, default=90)
+    parser.add_argument("--max-hedge-ratio", type=float, default=0.1)
+    return parser.parse_args(argv)
+
+
+def run_benchmark(args: argparse.Namespace) -> dict:
+    """Run the benchmark and return the results"""
+    latency = bimodal_latency(args.fast, args.slow, args.slow_fraction)
+    with FakeOsduServer(SyntheticDataset(records=0), latency=latency) as server:
+        client = OsduClient(server.url, "opendes", StaticTokenCredential())
+        baseline = run(SearchClient(client), args.requests)
+
+        policy = HedgingPolicy(percentile=args.percentile, max_hedge_ratio=args.max_hedge_ratio)
+        hedged_client = OsduClient(server.url, "opendes", StaticTokenCredential(), hedging=policy)
+        hedged = run(SearchClient(hedged_client), args.requests)
+        hedged["hedges"] = policy.hedges
+        hedged["hedge_wins"] = policy.hedge_wins
+
+    return {"baseline": baseline, "hedged": hedged}
+
+
+def main():
+    """Main function"""
+    print(json.dumps(run_benchmark(parse_args()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
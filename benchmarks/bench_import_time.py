@@ -0,0 +1,71 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Benchmark cold start import time of the SDK modules.
+
+Each import runs in a fresh interpreter, the best of --repeat runs is reported along with
+the number of modules it loaded. Use python -X importtime -c "import osdu.client" to see
+where the time goes.
+
+    python benchmarks/bench_import_time.py --repeat 10
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+IMPORTS = {
+    "identity": "import osdu.identity",
+    "token_credential": "from osdu.identity import OsduTokenCredential",
+    "msal_credential": "from osdu.identity import OsduMsalNonInteractiveCredential",
+    "client": "import osdu.client",
+    "search": "from osdu.search import SearchClient",
+}
+
+_TIMED = """
+import sys, time
+modules = len(sys.modules)
+start = time.perf_counter()
+{statement}
+print(time.perf_counter() - start, len(sys.modules) - modules)
+"""
+
+
+def time_import(statement: str, repeat: int) -> dict:
+    """Best time in milliseconds of running statement in a fresh interpreter"""
+    times = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-c", _TIMED.format(statement=statement)],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        elapsed, modules = result.stdout.split()
+        times.append(float(elapsed))
+    return {"import_ms": min(times) * 1000, "modules": int(modules)}
+
+
+def parse_args(argv: list = None) -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=10)
+    return parser.parse_args(argv)
+
+
+def run_benchmark(args: argparse.Namespace) -> dict:
+    """Run the benchmark and return the results"""
+    return {name: time_import(statement, args.repeat) for name, statement in IMPORTS.items()}
+
+
+def main():
+    """Main function"""
+    print(json.dumps(run_benchmark(parse_args()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
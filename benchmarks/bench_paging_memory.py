@@ -0,0 +1,85 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Benchmark memory and time per record when paging through search results.
+
+Compares streaming records with SearchClient.iter_query_records against collecting them all
+in a list, using tracemalloc peak memory.
+
+    python benchmarks/bench_paging_memory.py --records 20000 --page-size 1000
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from osdu.client import OsduClient
+from osdu.search import SearchClient
+from osdu.testing import FakeOsduServer, StaticTokenCredential, SyntheticDataset
+
+KIND = "osdu:wks:master-data--Well:1.0.0"
+
+
+def measure(func) -> tuple:
+    """Peak memory in bytes above the starting point and elapsed seconds of calling func"""
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    return peak - before, elapsed
+
+
+def parse_args(argv: list = None) -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--record-size", type=int, default=256, help="record payload bytes")
+    return parser.parse_args(argv)
+
+
+def run_benchmark(args: argparse.Namespace) -> dict:
+    """Run the benchmark and return the results"""
+    dataset = SyntheticDataset(args.records, args.record_size, kinds=(KIND,))
+    with FakeOsduServer(dataset) as server:
+        search_client = SearchClient(OsduClient(server.url, "opendes", StaticTokenCredential()))
+
+        def stream():
+            for _ in search_client.iter_query_records(KIND, limit=args.page_size):
+                pass
+
+        def collect():
+            records = list(search_client.iter_query_records(KIND, limit=args.page_size))
+            assert len(records) == args.records
+
+        stream()  # warm up
+        tracemalloc.start()
+        try:
+            stream_peak, stream_time = measure(stream)
+            collect_peak, collect_time = measure(collect)
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "stream_peak_bytes": stream_peak,
+        "stream_bytes_per_record": stream_peak / args.records,
+        "stream_records_per_s": args.records / stream_time,
+        "collect_peak_bytes": collect_peak,
+        "collect_bytes_per_record": collect_peak / args.records,
+        "collect_records_per_s": args.records / collect_time,
+    }
+
+
+def main():
+    """Main function"""
+    print(json.dumps(run_benchmark(parse_args()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Benchmark CPU heavy processing of search results with PipelineRunner.
+
+Compares transforming the records in the reading thread against PipelineRunner with process
+pools of each --workers size. The transform hashes each record --rounds times to stand in
+for parsing or geometry work.
+
+    python benchmarks/bench_pipeline.py --records 20000 --workers 1 2 4
+"""
+
+import argparse
+import functools
+import hashlib
+import json
+import time
+
+from osdu.client import OsduClient
+from osdu.pipeline import ListSink, PipelineRunner
+from osdu.search import SearchClient
+from osdu.testing import FakeOsduServer, StaticTokenCredential, SyntheticDataset
+
+KIND = "osdu:wks:master-data--Well:1.0.0"
+
+
+def transform(records: list, rounds: int) -> list:
+    """Hash each record rounds times"""
+    results = []
+    for record in records:
+        digest = json.dumps(record, sort_keys=True).encode()
+        for _ in range(rounds):
+            digest = hashlib.sha256(digest).digest()
+        results.append(digest.hex())
+    return results
+
+
+def parse_args(argv: list = None) -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=200, help="hash rounds per record")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    return parser.parse_args(argv)
+
+
+def run_benchmark(args: argparse.Namespace) -> dict:
+    """Run the benchmark and return the results"""
+    func = functools.partial(transform, rounds=args.rounds)
+    dataset = SyntheticDataset(args.records, kinds=(KIND,))
+    results = {}
+    with FakeOsduServer(dataset) as server:
+        search_client = SearchClient(OsduClient(server.url, "opendes", StaticTokenCredential()))
+
+        start = time.perf_counter()
+        records = search_client.iter_query_records(KIND, limit=args.page_size)
+        count = sum(len(func([record])) for record in records)
+        results["inline"] = {"records_per_s": count / (time.perf_counter() - start)}
+
+        for workers in args.workers:
+            runner = PipelineRunner(func, ListSink(), batch_size=args.batch_size, max_workers=workers)
+            stats = runner.run(search_client.iter_query_records(KIND, limit=args.page_size))
+            results[f"workers_{workers}"] = {"records_per_s": stats.results_written / stats.elapsed}
+    return results
+
+
+def main():
+    """Main function"""
+    print(json.dumps(run_benchmark(parse_args()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
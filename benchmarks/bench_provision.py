@@ -0,0 +1,81 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Benchmark provisioning entitlements groups and bulk membership changes at increasing concurrency.
+
+Each level provisions a fresh FakeOsduServer with --projects viewers and owners groups, the
+owners nested in the viewers and --members members each, then removes the members again.
+
+    python benchmarks/bench_provision.py --projects 50 --concurrency 1 8 32 --latency 0.01
+"""
+
+import argparse
+import json
+
+from osdu.client import OsduClient
+from osdu.entitlements import EntitlementsClient
+from osdu.testing import (
+    FakeEntitlements,
+    FakeOsduServer,
+    StaticTokenCredential,
+    SyntheticDataset,
+    constant_latency,
+)
+
+DOMAIN = "opendes.contoso.com"
+
+
+def manifest(projects: int, members: int) -> dict:
+    """Viewers and owners groups for each project"""
+    groups = {}
+    for project in range(projects):
+        viewers, owners = (f"data.bench{project}.{name}@{DOMAIN}" for name in ("viewers", "owners"))
+        users = [f"user{member}@contoso.com" for member in range(members)]
+        groups[viewers] = {"description": "viewers", "members": [owners] + users}
+        groups[owners] = {"description": "owners", "members": users[:1]}
+    return {"groups": groups}
+
+
+def run_level(args: argparse.Namespace, concurrency: int) -> dict:
+    """Provision then remove the members against a fresh server"""
+    document = manifest(args.projects, args.members)
+    server = FakeOsduServer(SyntheticDataset(1), FakeEntitlements(groups=0), latency=constant_latency(args.latency))
+    with server:
+        entitlements = EntitlementsClient(OsduClient(server.url, "opendes", StaticTokenCredential()))
+        provisioned = entitlements.provision_groups(document, max_workers=concurrency)
+        removals = [
+            (member, group) for group, spec in document["groups"].items() for member in spec["members"]
+        ]
+        removed = entitlements.remove_members_from_groups(removals, max_workers=concurrency)
+    return {
+        "provision_calls_per_s": provisioned.calls_per_s,
+        "remove_members_per_s": removed.items_per_s,
+        "failed": len(provisioned.failed) + len(removed.failed),
+    }
+
+
+def parse_args(argv: list = None) -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--projects", type=int, default=50)
+    parser.add_argument("--members", type=int, default=10, help="members per viewers group")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--latency", type=float, default=0.01, help="fake server latency in seconds")
+    return parser.parse_args(argv)
+
+
+def run_benchmark(args: argparse.Namespace) -> dict:
+    """Run the benchmark and return the results"""
+    return {f"concurrency_{concurrency}": run_level(args, concurrency) for concurrency in args.concurrency}
+
+
+def main():
+    """Main function"""
+    print(json.dumps(run_benchmark(parse_args()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
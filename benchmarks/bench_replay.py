@@ -0,0 +1,128 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Replay recorded OSDU sessions to measure SDK throughput and CPU cost for realistic traffic.
+
+Each workload is recorded to a vcrpy cassette with a timing sidecar, then replayed through
+OsduClient with the recorded latency scaled by each --latency-scale (0 for no waiting).
+
+Without --server-url the sessions are recorded against a FakeOsduServer with log-normal
+latency. To record a real session, pass --server-url and --cassette-dir, with credentials
+in the environment variables read by OsduEnvironmentCredential. The cassettes are then
+replayed without network access on later runs that pass only --cassette-dir.
+
+    python benchmarks/bench_replay.py --latency-scale 0 1
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from osdu.client import OsduClient
+from osdu.entitlements import EntitlementsClient
+from osdu.identity import OsduEnvironmentCredential
+from osdu.search import SearchClient
+from osdu.testing import (
+    FakeOsduServer,
+    StaticTokenCredential,
+    SyntheticDataset,
+    lognormal_latency,
+    record_session,
+    replay_session,
+)
+
+
+def scan(client: OsduClient, args: argparse.Namespace) -> int:
+    """Cursor scan of all records of a kind"""
+    records = SearchClient(client).iter_query_records(args.kind, limit=args.page_size)
+    return sum(1 for _ in records)
+
+
+def entitlements_sync(client: OsduClient, _) -> int:
+    """List every group and its members"""
+    entitlements = EntitlementsClient(client)
+    groups = entitlements.list_groups()["groups"]
+    return sum(len(entitlements.list_group_members(group["email"])["members"]) for group in groups)
+
+
+WORKLOADS = {"scan": scan, "entitlements_sync": entitlements_sync}
+
+
+def record(args: argparse.Namespace, cassette_dir: str):
+    """Record the workloads to cassette_dir, against args.server_url or a fake server"""
+    if args.server_url:
+        client = OsduClient(args.server_url, args.data_partition, OsduEnvironmentCredential())
+        for name in args.workload:
+            with record_session(os.path.join(cassette_dir, name + ".json")):
+                WORKLOADS[name](client, args)
+        return
+
+    dataset = SyntheticDataset(args.records, kinds=(args.kind,))
+    with FakeOsduServer(dataset, latency=lognormal_latency(args.latency, seed=1)) as server:
+        client = OsduClient(server.url, args.data_partition, StaticTokenCredential())
+        for name in args.workload:
+            with record_session(os.path.join(cassette_dir, name + ".json")):
+                WORKLOADS[name](client, args)
+
+
+def replay(args: argparse.Namespace, path: str, workload, latency_scale: float) -> dict:
+    """Replay a cassette, returning throughput and client CPU time per request"""
+    with replay_session(path, latency_scale) as cassette:
+        request = cassette.data[0][0]
+        server_url = f"{request.scheme}://{request.host}:{request.port}"
+        client = OsduClient(server_url, args.data_partition, StaticTokenCredential())
+        start, cpu_start = time.perf_counter(), time.process_time()
+        workload(client, args)
+        elapsed, cpu = time.perf_counter() - start, time.process_time() - cpu_start
+        requests = cassette.play_count
+    return {
+        "requests": requests,
+        "requests_per_s": requests / elapsed,
+        "cpu_per_request_us": cpu / requests * 1e6,
+    }
+
+
+def parse_args(argv: list = None) -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workload", nargs="+", choices=list(WORKLOADS), default=list(WORKLOADS))
+    parser.add_argument("--latency-scale", type=float, nargs="+", default=[0])
+    parser.add_argument("--cassette-dir", help="directory of cassettes, recorded if missing")
+    parser.add_argument("--server-url", help="OSDU server to record from, instead of a fake server")
+    parser.add_argument("--data-partition", default="opendes")
+    parser.add_argument("--kind", default="osdu:wks:master-data--Well:1.0.0")
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--records", type=int, default=20000, help="records in the fake server")
+    parser.add_argument("--latency", type=float, default=0.02, help="fake server median latency")
+    return parser.parse_args(argv)
+
+
+def run_benchmark(args: argparse.Namespace) -> dict:
+    """Run the benchmark and return the results"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cassette_dir = args.cassette_dir or temp_dir
+        paths = {name: os.path.join(cassette_dir, name + ".json") for name in args.workload}
+        if args.server_url or not all(os.path.exists(path) for path in paths.values()):
+            os.makedirs(cassette_dir, exist_ok=True)
+            record(args, cassette_dir)
+        return {
+            name: {
+                f"latency_scale_{scale:g}": replay(args, path, WORKLOADS[name], scale)
+                for scale in args.latency_scale
+            }
+            for name, path in paths.items()
+        }
+
+
+def main():
+    """Main function"""
+    print(json.dumps(run_benchmark(parse_args()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
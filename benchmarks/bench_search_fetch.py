@@ -0,0 +1,75 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Benchmark searching for ids and fetching the full records, in two sequential phases and pipelined.
+
+Sequential collects all the ids from the search pages before fetching the records from storage,
+pipelined uses osdu.storage.search_and_fetch to fetch the records of each page while later pages
+load.
+
+    python benchmarks/bench_search_fetch.py --records 20000 --page-size 1000 --workers 8 --latency 0.02
+"""
+
+import argparse
+import json
+import time
+
+from osdu.client import OsduClient
+from osdu.search import SearchClient
+from osdu.storage import StorageClient, search_and_fetch
+from osdu.testing import (
+    FakeOsduServer,
+    StaticTokenCredential,
+    SyntheticDataset,
+    constant_latency,
+)
+
+
+def sequential(search: SearchClient, storage: StorageClient, args: argparse.Namespace) -> int:
+    """Search for all ids, then fetch the records"""
+    ids = [record["id"] for record in search.iter_query_records(limit=args.page_size, returned_fields=["id"])]
+    return sum(len(batch.records) for batch in storage.get_records(ids, max_workers=args.workers))
+
+
+def pipelined(search: SearchClient, storage: StorageClient, args: argparse.Namespace) -> int:
+    """Fetch the records of each search page while later pages load"""
+    batches = search_and_fetch(search, storage, page_size=args.page_size, max_workers=args.workers)
+    return sum(len(batch.records) for batch in batches)
+
+
+def parse_args(argv: list = None) -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=8, help="concurrent storage calls")
+    parser.add_argument("--latency", type=float, default=0.02, help="fake server latency in seconds")
+    return parser.parse_args(argv)
+
+
+def run_benchmark(args: argparse.Namespace) -> dict:
+    """Run the benchmark and return the results"""
+    results = {}
+    server = FakeOsduServer(SyntheticDataset(args.records), latency=constant_latency(args.latency))
+    with server:
+        client = OsduClient(server.url, "opendes", StaticTokenCredential())
+        search, storage = SearchClient(client), StorageClient(client)
+        for name, join in (("sequential", sequential), ("pipelined", pipelined)):
+            start = time.perf_counter()
+            records = join(search, storage, args)
+            elapsed = time.perf_counter() - start
+            results[name] = {"records": records, "records_per_s": records / elapsed, "elapsed_s": elapsed}
+    results["speedup"] = results["sequential"]["elapsed_s"] / results["pipelined"]["elapsed_s"]
+    return results
+
+
+def main():
+    """Main function"""
+    print(json.dumps(run_benchmark(parse_args()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Benchmark sustained bulk record upsert throughput at increasing concurrency.
+
+Each level puts --records records of about --record-size bytes to a fresh FakeOsduServer with
+StorageClient.put_records, --invalid of them missing their legal tags so chunks are split.
+
+    python benchmarks/bench_storage_put.py --records 20000 --concurrency 1 8 32 --latency 0.02
+"""
+
+import argparse
+import json
+
+from osdu.client import OsduClient
+from osdu.storage import StorageClient
+from osdu.testing import (
+    FakeOsduServer,
+    FakeStorage,
+    StaticTokenCredential,
+    SyntheticDataset,
+    constant_latency,
+)
+
+
+def records(args: argparse.Namespace):
+    """Records to put, generated lazily"""
+    for index in range(args.records):
+        record = {
+            "id": f"opendes:master-data--Wellbore:bench{index}",
+            "kind": "osdu:wks:master-data--Wellbore:1.0.0",
+            "acl": {"viewers": ["data.default.viewers@opendes.contoso.com"], "owners": []},
+            "legal": {"legaltags": ["opendes-public"], "otherRelevantDataCountries": ["NO"]},
+            "data": {"FacilityName": f"Wellbore {index}", "Description": "x" * args.record_size},
+        }
+        if args.invalid and index % (args.records // args.invalid) == 0:
+            del record["legal"]
+        yield record
+
+
+def run_level(args: argparse.Namespace, concurrency: int) -> dict:
+    """Put the records against a fresh server"""
+    server = FakeOsduServer(SyntheticDataset(1), storage=FakeStorage(), latency=constant_latency(args.latency))
+    with server:
+        storage = StorageClient(OsduClient(server.url, "opendes", StaticTokenCredential()))
+        report = storage.put_records(records(args), max_records=args.max_records, max_workers=concurrency)
+    return {
+        "records_per_s": report.records_per_s,
+        "mb_per_s": report.bytes_per_s / 1e6,
+        "calls": report.calls,
+        "failed": len(report.failed),
+    }
+
+
+def parse_args(argv: list = None) -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--record-size", type=int, default=512, help="approximate bytes of data per record")
+    parser.add_argument("--max-records", type=int, default=500, help="records per call")
+    parser.add_argument("--invalid", type=int, default=0, help="number of invalid records")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--latency", type=float, default=0.02, help="fake server latency in seconds")
+    return parser.parse_args(argv)
+
+
+def run_benchmark(args: argparse.Namespace) -> dict:
+    """Run the benchmark and return the results"""
+    return {f"concurrency_{concurrency}": run_level(args, concurrency) for concurrency in args.concurrency}
+
+
+def main():
+    """Main function"""
+    print(json.dumps(run_benchmark(parse_args()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Benchmark search throughput and latency at increasing concurrency.
+
+Threads share a single client and send queries to a FakeOsduServer.
+
+    python benchmarks/bench_throughput.py --concurrency 1 4 16 64 --latency 0.005
+"""
+
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common import percentile
+
+from osdu.client import OsduClient
+from osdu.search import SearchClient
+from osdu.testing import FakeOsduServer, StaticTokenCredential, SyntheticDataset
+
+KIND = "osdu:wks:master-data--Well:1.0.0"
+
+
+def run_level(search_client: SearchClient, kind: str, concurrency: int, count: int, limit: int) -> dict:
+    """Run count queries spread over concurrency threads"""
+
+    def query(_):
+        start = time.perf_counter()
+        search_client.query(kind=kind, limit=limit)
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        latencies = list(executor.map(query, range(count)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests_per_s": count / elapsed,
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+
+def parse_args(argv: list = None) -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--requests", type=int, default=400, help="requests per concurrency level")
+    parser.add_argument("--latency", type=float, default=0.005, help="server latency in seconds")
+    parser.add_argument("--page-size", type=int, default=100, help="records per query")
+    parser.add_argument("--record-size", type=int, default=256, help="record payload bytes")
+    return parser.parse_args(argv)
+
+
+def run_benchmark(args: argparse.Namespace) -> dict:
+    """Run the benchmark and return the results"""
+    dataset = SyntheticDataset(args.page_size, args.record_size, kinds=(KIND,))
+    with FakeOsduServer(dataset, latency=args.latency) as server:
+        client = OsduClient(
+            server.url, "opendes", StaticTokenCredential(), pool_size=max(args.concurrency)
+        )
+        search_client = SearchClient(client)
+        # warm up the connection pool
+        run_level(search_client, KIND, max(args.concurrency), max(args.concurrency), 1)
+        return {
+            f"concurrency_{concurrency}": run_level(
+                search_client, KIND, concurrency, args.requests, args.page_size
+            )
+            for concurrency in args.concurrency
+        }
+
+
+def main():
+    """Main function"""
+    print(json.dumps(run_benchmark(parse_args()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Benchmark the cost of getting an access token with each credential class.
+
+Token and msal authority endpoints are served by a FakeOsduServer, so the numbers are
+the client side cost of the cached and refresh paths.
+
+    python benchmarks/bench_token_path.py --calls 200
+"""
+
+import argparse
+import functools
+import json
+import os
+import tempfile
+import timeit
+from unittest import mock
+
+import msal
+
+from osdu.identity import (
+    OsduMsalInteractiveCredential,
+    OsduMsalNonInteractiveCredential,
+    OsduTokenCredential,
+)
+from osdu.testing import FAKE_AUTHORITY_BASE, FakeAuthorityHttpClient, FakeOsduServer
+
+AUTHORITY = FAKE_AUTHORITY_BASE + "/tenant"
+
+
+def per_call_us(func, count: int) -> float:
+    """Best of 3 runs of count calls to func, in microseconds per call"""
+    return min(timeit.repeat(func, number=count, repeat=3)) / count * 1e6
+
+
+def token_credential(server_url: str, calls: int) -> dict:
+    """Refresh token credential, refreshing with urllib against the token endpoint"""
+    credential = OsduTokenCredential("client", server_url + "/token", "refresh", "secret")
+    credential.get_token()
+    return {
+        "cached_us": per_call_us(credential.get_token, calls * 10),
+        "refresh_us": per_call_us(credential.refresh_access_token, calls),
+    }
+
+
+def msal_non_interactive_credential(server_url: str, calls: int) -> dict:
+    """Client credentials using a long lived msal ConfidentialClientApplication"""
+
+    def create():
+        app = msal.ConfidentialClientApplication(
+            "client",
+            client_credential="secret",
+            authority=AUTHORITY,
+            http_client=FakeAuthorityHttpClient(server_url),
+            instance_discovery=False,
+        )
+        return OsduMsalNonInteractiveCredential("client", "secret", AUTHORITY, "scope", app)
+
+    credential = create()
+    credential.get_token()
+    return {
+        "cached_us": per_call_us(credential.get_token, calls),
+        "new_client_us": per_call_us(lambda: create().get_token(), calls // 10 or 1),
+    }
+
+
+def msal_interactive_credential(server_url: str, calls: int) -> dict:
+    """Interactive credential with a token cache file already holding a valid token"""
+    public_client = functools.partial(
+        msal.PublicClientApplication,
+        http_client=FakeAuthorityHttpClient(server_url),
+        instance_discovery=False,
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        cache_path = os.path.join(directory, "token_cache.json")
+        cache = msal.SerializableTokenCache()
+        public_client("client", authority=AUTHORITY, token_cache=cache).acquire_token_by_refresh_token(
+            "refresh", ["scope"]
+        )
+        with open(cache_path, "w", encoding="utf8") as file:
+            file.write(cache.serialize())
+
+        credential = OsduMsalInteractiveCredential("client", AUTHORITY, "scope", cache_path)
+        with mock.patch.object(msal, "PublicClientApplication", public_client):
+            credential.get_token()
+            return {"cached_us": per_call_us(credential.get_token, calls // 10 or 1)}
+
+
+def parse_args(argv: list = None) -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200)
+    return parser.parse_args(argv)
+
+
+def run_benchmark(args: argparse.Namespace) -> dict:
+    """Run the benchmark and return the results"""
+    with FakeOsduServer() as server:
+        return {
+            "OsduTokenCredential": token_credential(server.url, args.calls),
+            "OsduMsalNonInteractiveCredential": msal_non_interactive_credential(server.url, args.calls),
+            "OsduMsalInteractiveCredential": msal_interactive_credential(server.url, args.calls),
+        }
+
+
+def main():
+    """Main function"""
+    print(json.dumps(run_benchmark(parse_args()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Compare two benchmark result files written by run_all.py.
+
+Metrics ending in _per_s are better when higher, other metrics with a unit suffix (_us, _ms,
+_bytes, _bytes_per_record) are better when lower. Exits with status 1 if any metric regressed
+by more than the threshold.
+
+    python benchmarks/compare.py base.json head.json --threshold 10
+"""
+
+import argparse
+import json
+import sys
+
+HIGHER_IS_BETTER = ("_per_s",)
+LOWER_IS_BETTER = ("_us", "_ms", "_bytes", "_bytes_per_record")
+
+
+def flatten(results: dict, prefix: str = "") -> dict:
+    """Flatten nested results into dotted metric names"""
+    metrics = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            metrics.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            metrics[name] = value
+    return metrics
+
+
+def change_pct(name: str, base: float, head: float) -> float:
+    """Change in percent where positive is an improvement, None if the metric has no direction"""
+    if not base:
+        return None
+    change = (head - base) / abs(base) * 100
+    if name.endswith(HIGHER_IS_BETTER):
+        return change
+    if name.endswith(LOWER_IS_BETTER):
+        return -change
+    return None
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("base", help="results of the baseline run")
+    parser.add_argument("head", help="results of the run to compare")
+    parser.add_argument("--threshold", type=float, default=10, help="regression threshold in percent")
+    args = parser.parse_args()
+
+    with open(args.base, encoding="utf8") as file:
+        base = json.load(file)
+    with open(args.head, encoding="utf8") as file:
+        head = json.load(file)
+    base_metrics = flatten(base["results"])
+    head_metrics = flatten(head["results"])
+
+    print(f"base: {base['metadata'].get('commit')}  head: {head['metadata'].get('commit')}")
+    regressions = []
+    for name in sorted(base_metrics.keys() & head_metrics.keys()):
+        change = change_pct(name, base_metrics[name], head_metrics[name])
+        if change is None:
+            continue
+        status = ""
+        if change < -args.threshold:
+            status = "REGRESSION"
+            regressions.append(name)
+        elif change > args.threshold:
+            status = "improved"
+        print(f"{name:70} {base_metrics[name]:14.2f} {head_metrics[name]:14.2f} {change:+8.1f}% {status}")
+
+    if regressions:
+        print(f"{len(regressions)} metric(s) regressed by more than {args.threshold}%")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
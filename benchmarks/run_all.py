@@ -0,0 +1,108 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+"""Run all benchmarks and write the results as json, compare two runs with compare.py.
+
+    python benchmarks/run_all.py --output results.json
+    python benchmarks/run_all.py --quick --only throughput token_path
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+
+import bench_client_overhead
+import bench_hedging
+import bench_import_time
+import bench_paging_memory
+import bench_pipeline
+import bench_provision
+import bench_replay
+import bench_search_fetch
+import bench_storage_put
+import bench_throughput
+import bench_token_path
+
+import osdu
+
+BENCHMARKS = {
+    "client_overhead": bench_client_overhead,
+    "hedging": bench_hedging,
+    "throughput": bench_throughput,
+    "paging_memory": bench_paging_memory,
+    "token_path": bench_token_path,
+    "replay": bench_replay,
+    "import_time": bench_import_time,
+    "pipeline": bench_pipeline,
+    "provision": bench_provision,
+    "storage_put": bench_storage_put,
+    "search_fetch": bench_search_fetch,
+}
+
+QUICK_ARGS = {
+    "client_overhead": ["--requests", "200"],
+    "hedging": ["--requests", "100"],
+    "throughput": ["--requests", "100", "--concurrency", "1", "8"],
+    "paging_memory": ["--records", "2000", "--page-size", "500"],
+    "token_path": ["--calls", "20"],
+    "replay": ["--records", "2000", "--page-size", "500"],
+    "import_time": ["--repeat", "3"],
+    "pipeline": ["--records", "2000", "--rounds", "20", "--workers", "2"],
+    "provision": ["--projects", "10", "--concurrency", "1", "8"],
+    "storage_put": ["--records", "5000", "--invalid", "2", "--concurrency", "1", "8"],
+    "search_fetch": ["--records", "5000", "--page-size", "500"],
+}
+"""Arguments for a quick smoke run, e.g. in CI"""
+
+
+def git_commit() -> str:
+    """Current git commit, None if not available"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, check=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", help="file to write results to, defaults to stdout")
+    parser.add_argument("--quick", action="store_true", help="run fewer iterations")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="benchmarks to run")
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.only or BENCHMARKS:
+        module = BENCHMARKS[name]
+        results[name] = module.run_benchmark(module.parse_args(QUICK_ARGS[name] if args.quick else []))
+
+    output = json.dumps(
+        {
+            "metadata": {
+                "commit": git_commit(),
+                "sdk_version": osdu.__VERSION__,
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                "quick": args.quick,
+            },
+            "results": results,
+        },
+        indent=2,
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf8") as file:
+            file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
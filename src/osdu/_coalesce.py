@@ -0,0 +1,107 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""Coalescing of identical concurrent calls."""
+
+import threading
+from collections.abc import Callable, Hashable
+
+from osdu import instrumentation
+from osdu.exceptions import DeadlineExceededError
+
+
+class _InFlightCall:
+    """A call being made on behalf of one or more callers."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class RequestCoalescer:
+    """Share a single in-flight call between concurrent callers using the same key.
+
+    The first caller for a key makes the call, any callers arriving while it is in flight
+    wait for and share its result (or exception). Once the call completes the key is
+    released, so later callers make a new call - nothing is cached.
+    """
+
+    @property
+    def calls(self) -> int:
+        """Number of calls actually made
+
+        Returns:
+            int: number of calls made
+        """
+        return self._calls
+
+    @property
+    def shared(self) -> int:
+        """Number of callers that shared another caller's in-flight call
+
+        Returns:
+            int: number of coalesced callers
+        """
+        return self._shared
+
+    def __init__(self):
+        """Setup the coalescer"""
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._calls = 0
+        self._shared = 0
+
+    def __getstate__(self) -> dict:
+        # in-flight calls belong to the pickling process
+        return {"_calls": self._calls, "_shared": self._shared}
+
+    def __setstate__(self, state: dict):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self.__dict__.update(state)
+
+    def call(self, key: Hashable, func: Callable, timeout: float = None):
+        """Call func, or wait for an identical in-flight call and share its result.
+
+        Args:
+            key (Hashable): key identifying identical calls
+            func (Callable): function making the call
+            timeout (float): maximum time to wait for an in-flight call, None waits forever
+
+        Returns:
+            The result of func
+
+        Raises:
+            DeadlineExceededError: Raised if waiting for an in-flight call exceeds timeout
+            BaseException: Any exception raised by func
+        """
+        with self._lock:
+            in_flight = self._in_flight.get(key)
+            leader = in_flight is None
+            if leader:
+                in_flight = self._in_flight[key] = _InFlightCall()
+                self._calls += 1
+            else:
+                self._shared += 1
+        instrumentation.emit_cache_event("coalesce", not leader)
+
+        if not leader:
+            if not in_flight.done.wait(timeout):
+                raise DeadlineExceededError("Deadline exceeded waiting for in-flight request")
+            if in_flight.error is not None:
+                raise in_flight.error
+            return in_flight.result
+
+        try:
+            in_flight.result = func()
+            return in_flight.result
+        except BaseException as ex:
+            in_flight.error = ex
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            in_flight.done.set()
@@ -0,0 +1,231 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""Lazily map a function over items on a thread pool with a bounded number in flight, and read
+items ahead in a background thread."""
+
+import itertools
+import queue
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+END = object()
+"""Put in the buffer by fill when the items are exhausted."""
+
+
+class ReadError:
+    """Put in the buffer by fill when reading the items raises, to raise again in the consumer."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def batches(items: Iterable, size: int) -> Iterator[list]:
+    """Lists of up to size items, read lazily
+
+    Args:
+        items (Iterable): items to batch
+        size (int): maximum items per batch
+
+    Yields:
+        list: each batch
+    """
+    iterator = iter(items)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def bounded_map(
+    func: Callable,
+    items: Iterable,
+    max_workers: int = 8,
+    ordered: bool = True,
+    max_pending: int = None,
+    thread_name_prefix: str = "osdu-map",
+) -> Iterator:
+    """Call func on each item concurrently, yielding the results as they are consumed
+
+    Items are read and submitted in a background thread, only while fewer than max_pending
+    calls are submitted but not yet yielded. A lazy iterable, e.g. pages of search results,
+    is so read while earlier calls run, and results are yielded while waiting for the next
+    item. Calls not yet started are cancelled if the generator is closed early. An exception
+    of a call is raised when its result would be yielded, one reading the items once the
+    results of the items before it are yielded.
+
+    Args:
+        func (Callable): function called with each item
+        items (Iterable): items to call func with
+        max_workers (int): maximum number of concurrent calls. Defaults to 8.
+        ordered (bool): yield results in the order of the items rather than as they complete.
+            Defaults to True.
+        max_pending (int): maximum calls submitted but not yet yielded. Defaults to twice
+            max_workers.
+        thread_name_prefix (str): name prefix of the worker threads. Defaults to "osdu-map".
+
+    Yields:
+        the result of each call
+    """
+    submitter = _Submitter(func, items, ordered, max_pending or 2 * max_workers)
+    with ThreadPoolExecutor(max_workers, thread_name_prefix=thread_name_prefix) as executor:
+        threading.Thread(
+            target=submitter.run, args=(executor,), name=f"{thread_name_prefix}-reader", daemon=True
+        ).start()
+        try:
+            yield from submitter.results()
+        finally:
+            submitter.stop()
+
+
+class _Submitter:
+    """Reads items and submits the calls of bounded_map, handing the futures to the consumer in
+    the order of the items or as they complete."""
+
+    def __init__(self, func: Callable, items: Iterable, ordered: bool, max_pending: int):
+        self._func = func
+        self._items = items
+        self._ordered = ordered
+        self._slots = threading.Semaphore(max_pending)
+        self._ready = queue.Queue()  # futures, then a _Finished
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._pending = set()
+
+    def run(self, executor: ThreadPoolExecutor):
+        """Submit a call for each item while slots are free, until exhausted or stopped. The
+        items are closed here, as only this thread may resume them."""
+        iterator = iter(self._items)
+        try:
+            submitted, error = self._submit_all(executor, iterator)
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+        self._ready.put(_Finished(submitted, error))
+
+    def _submit_all(self, executor: ThreadPoolExecutor, iterator: Iterator) -> tuple:
+        submitted = 0
+        try:
+            while self._acquire_slot():
+                item = next(iterator, END)
+                if item is END or not self._submit(executor, item):
+                    break
+                submitted += 1
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            return submitted, ex
+        return submitted, None
+
+    def _submit(self, executor: ThreadPoolExecutor, item) -> bool:
+        with self._lock:
+            if self._stopped.is_set():
+                return False
+            future = executor.submit(self._func, item)
+            self._pending.add(future)
+        if self._ordered:
+            self._ready.put(future)
+        else:
+            future.add_done_callback(self._ready.put)
+        return True
+
+    def results(self) -> Iterator:
+        """Results of the calls, then raise any error reading the items"""
+        finished, consumed = None, 0
+        while finished is None or consumed < finished.submitted:
+            entry = self._ready.get()
+            if isinstance(entry, _Finished):
+                finished = entry
+                continue
+            with self._lock:
+                self._pending.discard(entry)
+            result = entry.result()
+            consumed += 1
+            self._slots.release()
+            yield result
+        if finished.error is not None:
+            raise finished.error
+
+    def stop(self):
+        """Stop submitting and cancel the calls not yet started"""
+        with self._lock:
+            self._stopped.set()
+            for future in self._pending:
+                future.cancel()
+
+    def _acquire_slot(self) -> bool:
+        while not self._stopped.is_set():
+            if self._slots.acquire(timeout=0.1):  # pylint: disable=consider-using-with
+                return True
+        return False
+
+
+class _Finished(NamedTuple):
+    """Put in the ready queue by _Submitter once it stops reading items."""
+
+    submitted: int
+    error: Exception
+
+
+def prefetch(items: Iterable, max_pending: int = 2, thread_name: str = "osdu-prefetch") -> Iterator:
+    """Read items in a background thread, up to max_pending ahead of the consumer
+
+    Useful to overlap slow reads, e.g. pages of search results, with processing of the items
+    already read. An exception reading the items is raised once the items before it are
+    consumed. Reading stops after the current item if the generator is closed early.
+
+    Args:
+        items (Iterable): items to read
+        max_pending (int): maximum items read but not yet consumed. Defaults to 2.
+        thread_name (str): name of the reader thread. Defaults to "osdu-prefetch".
+
+    Yields:
+        each item
+    """
+    buffer = queue.Queue(max_pending)
+    stop = threading.Event()
+    threading.Thread(target=fill, args=(items, buffer, stop), name=thread_name, daemon=True).start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is END:
+                return
+            if isinstance(item, ReadError):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+
+
+def fill(items: Iterable, buffer: queue.Queue, stop: threading.Event):
+    """Read items into the buffer until exhausted or stopped, ending with END or a ReadError
+
+    Args:
+        items (Iterable): items to read
+        buffer (queue.Queue): bounded queue to put the items in
+        stop (threading.Event): set by the consumer to stop reading
+    """
+    try:
+        for item in items:
+            if not put_until_stopped(buffer, item, stop):
+                return
+    except Exception as ex:  # pylint: disable=broad-exception-caught
+        put_until_stopped(buffer, ReadError(ex), stop)
+        return
+    put_until_stopped(buffer, END, stop)
+
+
+def put_until_stopped(buffer: queue.Queue, item, stop: threading.Event) -> bool:
+    """Put item in the buffer, giving up if stopped while waiting for space
+
+    Returns:
+        bool: True if the item was put
+    """
+    while not stop.is_set():
+        try:
+            buffer.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
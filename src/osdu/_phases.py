@@ -0,0 +1,137 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""HTTP adapter recording the time spent in each phase of a request.
+
+The adapter installs urllib3 connection classes that note when DNS resolution, the TCP
+connect, the TLS handshake and the response headers complete, for the request being sent on
+the current thread. The result is set as response.timings, a PhaseTimings.
+"""
+
+import socket
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+
+from osdu.instrumentation import PhaseTimings
+
+_local = threading.local()
+
+
+class _PhaseRecorder:
+    """Timestamps for the request currently being sent on a thread."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.dns = 0.0
+        self.connect = 0.0
+        self.tls = 0.0
+        self.headers_received = None
+        self.connection_reused = True
+
+    def timings(self, end: float) -> PhaseTimings:
+        headers_received = self.headers_received if self.headers_received is not None else end
+        connection = self.dns + self.connect + self.tls
+        return PhaseTimings(
+            dns=self.dns,
+            connect=self.connect,
+            tls=self.tls,
+            ttfb=max(0.0, headers_received - self.start - connection),
+            transfer=end - headers_received,
+            total=end - self.start,
+            connection_reused=self.connection_reused,
+        )
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    """Records DNS, connect and time to first byte for the current recorder, if any."""
+
+    def _new_conn(self) -> socket.socket:
+        recorder = getattr(_local, "recorder", None)
+        if recorder is None:
+            return super()._new_conn()
+        recorder.connection_reused = False
+
+        # resolve separately so DNS and connect can be told apart, then connect to the
+        # address directly. Anything unusual falls back to urllib3 resolving itself.
+        start = time.perf_counter()
+        host = self._dns_host
+        try:
+            address = socket.getaddrinfo(host, self.port, allowed_gai_family(), socket.SOCK_STREAM)[0][4][0]
+        except OSError:
+            address = None
+        resolved = time.perf_counter()
+        recorder.dns = resolved - start
+
+        sock = None
+        if address is not None:
+            self._dns_host = address
+            try:
+                sock = super()._new_conn()
+            except NewConnectionError:
+                sock = None
+            finally:
+                self._dns_host = host
+        if sock is None:
+            sock = super()._new_conn()
+        recorder.connect = time.perf_counter() - resolved
+        return sock
+
+    def getresponse(self, *args, **kwargs):
+        response = super().getresponse(*args, **kwargs)
+        recorder = getattr(_local, "recorder", None)
+        if recorder is not None:
+            recorder.headers_received = time.perf_counter()
+        return response
+
+
+class _TimedHTTPSConnection(_TimedHTTPConnection, HTTPSConnection):
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        recorder = getattr(_local, "recorder", None)
+        if recorder is not None and not recorder.connection_reused:
+            recorder.tls = max(0.0, time.perf_counter() - start - recorder.dns - recorder.connect)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class PhaseTimingAdapter(HTTPAdapter):
+    """HTTPAdapter setting response.timings to the PhaseTimings of each request.
+
+    Unless the request is streamed the body is read by the adapter so the transfer time can
+    be included. Requests sent through a proxy only have ttfb and transfer recorded.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+    def send(self, request, stream=False, **kwargs) -> requests.Response:  # pylint: disable=arguments-differ
+        recorder = _PhaseRecorder()
+        _local.recorder = recorder
+        try:
+            response = super().send(request, stream=stream, **kwargs)
+        finally:
+            _local.recorder = None
+        if not stream:
+            _ = response.content
+        response.timings = recorder.timings(time.perf_counter())
+        return response
@@ -0,0 +1,48 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""Token bucket rate limiter shared by the threads of a bulk operation."""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """Allow on average rate calls per second, with bursts of up to burst calls."""
+
+    def __init__(self, rate: float, burst: int = None):
+        """Setup a full bucket
+
+        Args:
+            rate (float): tokens added per second
+            burst (int): maximum tokens held. Defaults to rate, at least 1.
+
+        Raises:
+            ValueError: Raised if rate isn't positive
+        """
+        if rate <= 0:
+            raise ValueError("rate should be positive")
+        self._rate = rate
+        self._burst = max(burst or rate, 1)
+        self._tokens = self._burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take a token, waiting until one is available
+
+        Returns:
+            float: seconds waited
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            # reserve the token now so waiting threads are served in order
+            self._tokens -= 1
+            wait = -self._tokens / self._rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
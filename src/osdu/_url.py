@@ -0,0 +1,64 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""Helpers for describing OSDU API urls."""
+
+import re
+from functools import lru_cache
+from urllib.parse import urlsplit, urlunsplit
+
+_API_PATH = re.compile(r"^/api/(?P<service>[^/]+)/v\d+/?(?P<endpoint>.*)$")
+# path segments that identify a resource rather than an endpoint, e.g. emails and record ids
+_ID_SEGMENT = re.compile(r"[@:%]|^\d+$|^[0-9a-fA-F-]{16,}$")
+ID_PLACEHOLDER = "{id}"
+
+
+def redact_path(path: str) -> str:
+    """Replace resource identifiers in a url path with a placeholder
+
+    Args:
+        path (str): url path
+
+    Returns:
+        str: path with identifiers replaced by {id}
+    """
+    return "/".join(
+        ID_PLACEHOLDER if _ID_SEGMENT.search(segment) else segment for segment in path.split("/")
+    )
+
+
+@lru_cache(maxsize=1024)
+def split_service_url(url: str) -> tuple:
+    """Split a url into the OSDU service name and a redacted endpoint template
+
+    e.g. https://host/api/entitlements/v2/groups/a@b.com/members -> (entitlements, groups/{id}/members)
+
+    Args:
+        url (str): request url
+
+    Returns:
+        tuple: (service, endpoint), service is the host for non OSDU API urls
+    """
+    parts = urlsplit(url)
+    match = _API_PATH.match(parts.path)
+    if match is None:
+        return parts.hostname or "", redact_path(parts.path.strip("/"))
+    return match.group("service"), redact_path(match.group("endpoint").strip("/"))
+
+
+@lru_cache(maxsize=1024)
+def redact_url(url: str) -> str:
+    """Replace resource identifiers in a url with a placeholder, dropping any query string
+
+    e.g. https://host/api/storage/v2/records/opendes:wb:1?x=1 -> https://host/api/storage/v2/records/{id}
+
+    Args:
+        url (str): request url
+
+    Returns:
+        str: url template safe to log
+    """
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc, redact_path(parts.path), "", ""))
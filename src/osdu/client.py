@@ -6,19 +6,53 @@
 """Useful functions."""
 
 import logging
+import os
+import sys
+import time
 from typing import Union
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.models import HTTPError
-
+from urllib3.exceptions import NewConnectionError
+
+from osdu import instrumentation, tracing
+from osdu._coalesce import RequestCoalescer
+from osdu._phases import PhaseTimingAdapter
+from osdu._url import redact_url, split_service_url
+from osdu.deadline import Deadline
+from osdu.exceptions import DeadlineExceededError
+from osdu.hedging import HedgingPolicy
 from osdu.identity import OsduBaseCredential
 
 logger = logging.getLogger(__name__)
+slow_request_logger = logging.getLogger(__name__ + ".slow_requests")
+
+DEFAULT_TIMEOUT = (10.0, 60.0)
+"""Default (connect, read) timeout in seconds."""
+
+RETRY_STATUS_CODES = (429, 502, 503, 504)
+"""Http status codes indicating a transient error that is worth retrying."""
+
+NON_IDEMPOTENT_RETRY_STATUS_CODES = (429, 503)
+"""Http status codes retried for POST, PUT and DELETE. The server refused these requests, while
+a 502 or 504 may be returned after it applied the request."""
 
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS")
+"""Methods retried after any connection error, timeout or RETRY_STATUS_CODES response, others
+only if the request wasn't sent or on NON_IDEMPOTENT_RETRY_STATUS_CODES."""
 
-class OsduClient:
+RETRY_BACKOFF_FACTOR = 0.5
+RETRY_BACKOFF_MAX = 8.0
+
+
+class OsduClient:  # pylint: disable=too-many-instance-attributes
     """
     Class for connecting with API's.
+
+    Clients can be pickled, e.g. to pass to multiprocessing workers, and detect being forked.
+    Either way the new process gets its own connection pool while keeping the credentials
+    and any token they hold.
     """
 
     @property
@@ -57,12 +91,54 @@ class OsduClient:
         """
         return self._retries
 
-    def __init__(
+    @property
+    def hedging(self) -> HedgingPolicy:
+        """Hedging policy used for idempotent requests, None if hedging is disabled
+
+        Returns:
+            HedgingPolicy: hedging policy
+        """
+        return self._hedging
+
+    @property
+    def timeout(self) -> Union[float, tuple]:  # pylint: disable=consider-alternative-union-syntax
+        """Default timeout for requests, as seconds or a (connect, read) tuple
+
+        Returns:
+            Union[float, tuple]: timeout in seconds
+        """
+        return self._timeout
+
+    @property
+    def coalesce_gets(self) -> bool:
+        """Whether identical concurrent GET requests share a single http call
+
+        Returns:
+            bool: True if GET requests are coalesced
+        """
+        return self._coalescer is not None
+
+    @property
+    def slow_request_threshold(self) -> float:
+        """Requests taking longer than this many seconds are logged, None if disabled
+
+        Returns:
+            float: threshold in seconds
+        """
+        return self._slow_request_threshold
+
+    def __init__(  # pylint: disable=too-many-arguments
         self,
         server_url: str,
         data_partition: str,
         credentials: OsduBaseCredential,
         retries: int = 0,
+        hedging: HedgingPolicy = None,
+        timeout: Union[float, tuple] = DEFAULT_TIMEOUT,  # pylint: disable=consider-alternative-union-syntax
+        coalesce_gets: bool = False,
+        pool_size: int = 10,
+        record_phases: bool = False,
+        slow_request_threshold: float = None,
     ):
         """Setup the new client
 
@@ -70,32 +146,121 @@ class OsduClient:
             server_url (str): url of the server without any path e.g. https://www.test.com
             data_partition (str): data partition name e.g. opendes
             credentials (OsduBaseCredential): credentials used for connection
-            retries (int): number of retries incase of http errors (default 0 - no retries)
+            retries (int): number of retries incase of http errors (default 0 - no retries).
+                Connection errors and timeouts of POST, PUT and DELETE requests are only
+                retried if the request wasn't sent, and of their responses only 429 and 503,
+                as the server may have applied them.
+            hedging (HedgingPolicy): hedge idempotent requests according to this policy
+                (default None - no hedging)
+            timeout (Union[float, tuple]): default timeout in seconds for requests, either a
+                single value or a (connect, read) tuple. None waits forever (not recommended).
+                (default (10, 60))
+            coalesce_gets (bool): share a single http call between identical concurrent GET
+                requests, matched on url, headers (including data partition and identity),
+                timeout and deadline (default False)
+            pool_size (int): maximum number of pooled connections kept per host (default 10)
+            record_phases (bool): record the time spent on DNS, connect, TLS, time to first byte
+                and transfer for each request, available as response.timings and in
+                instrumentation events (default False)
+            slow_request_threshold (float): log a warning to the osdu.client.slow_requests
+                logger for requests taking longer than this many seconds including retries,
+                with the details as a structured record in the osdu_slow_request attribute
+                (default None - disabled)
         """
         self._server_url = server_url
         self._data_partition = data_partition
         self._credentials = credentials
         self._retries = retries
+        self._hedging = hedging
+        self._timeout = timeout
+        self._coalescer = RequestCoalescer() if coalesce_gets else None
+        self._slow_request_threshold = slow_request_threshold
 
-    def get_headers(self):
+        self._static_headers = {
+            "Content-Type": "application/json",
+            "data-partition-id": data_partition,
+        }
+        # (token, headers) pair replaced as a whole when the token rotates
+        self._prepared_headers = (None, None)
+
+        self._pool_size = pool_size
+        self._record_phases = record_phases
+        self._session = self._create_session()
+        self._pid = os.getpid()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_session"]
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._session = self._create_session()
+        self._pid = os.getpid()
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter_class = PhaseTimingAdapter if self._record_phases else HTTPAdapter
+        adapter = adapter_class(pool_connections=self._pool_size, pool_maxsize=self._pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _check_fork(self):
+        """Replace the connection pool and coalescer if this is a forked child process.
+
+        Pooled connections are shared with the parent and in-flight calls will never
+        complete in the child. The parent's session isn't closed, that would shut down
+        connections the parent is still using.
+        """
+        if self._pid == os.getpid():
+            return
+        self._session = self._create_session()
+        if self._coalescer is not None:
+            self._coalescer = RequestCoalescer()
+        self._pid = os.getpid()
+
+    def get_headers(self, extra_headers: dict = None) -> dict:
         """Get needed http headers, including authorization bearer token.
 
-        Raises:
-            NotImplementedError: Should be implemented by subclasses.
+        The returned dict is shared between calls until the token changes so must not be
+        modified, pass extra_headers to add to it instead.
+
+        Args:
+            extra_headers (dict, optional): additional headers for a single call.
+
+        Returns:
+            dict: http headers
         """
-        return {
-            "Content-Type": "application/json",
-            "data-partition-id": self.data_partition,
-            "Authorization": f"Bearer {self.credentials.get_token()}",
-        }
+        token = self._credentials.get_token()
+        prepared_token, headers = self._prepared_headers
+        hit = token == prepared_token and headers is not None
+        if not hit:
+            headers = dict(self._static_headers)
+            headers["Authorization"] = "Bearer " + token
+            self._prepared_headers = (token, headers)
+        instrumentation.emit_cache_event("headers", hit)
+        if extra_headers:
+            headers = {**headers, **extra_headers}
+        return headers
 
     # region HTTP methods
-    def get(self, url: str, ok_status_codes: list = None) -> requests.Response:
+    def get(
+        self,
+        url: str,
+        ok_status_codes: list = None,
+        timeout: Union[float, tuple] = None,  # pylint: disable=consider-alternative-union-syntax
+        deadline: Deadline = None,
+        headers: dict = None,
+    ) -> requests.Response:
         """GET from the specified url
 
         Args:
             url (str): url to GET from to
             ok_status_codes (list): [description]
+            timeout (Union[float, tuple], optional): timeout overriding the client default.
+            deadline (Deadline, optional): deadline for the call including any retries.
+            headers (dict, optional): extra http headers for this call.
 
         Raises:
             HTTPError: Raised if ok_status_codes are passed and the get returns a different status
@@ -103,13 +268,30 @@ class OsduClient:
         Returns:
             requests.Response: response object
         """
-        headers = self.get_headers()
-        response = requests.get(url, headers=headers)  # pylint: disable=missing-timeout
-        if ok_status_codes is not None and response.status_code not in ok_status_codes:
-            raise HTTPError(response=response)
+        headers = self.get_headers(headers)
+        if self._coalescer is None:
+            return self._request("GET", url, ok_status_codes, timeout, deadline, headers)
+
+        self._check_fork()
+        # calls only share a response if everything that can change it or how long it may
+        # take is the same, the headers include the partition and identity
+        key = (url, tuple(sorted(headers.items())), timeout, deadline)
+        response = self._coalescer.call(
+            key,
+            lambda: self._request("GET", url, None, timeout, deadline, headers),
+            None if deadline is None else deadline.remaining(),
+        )
+        self._check_status(response, ok_status_codes)
         return response
 
-    def get_returning_json(self, url: str, ok_status_codes: list = None) -> dict:
+    def get_returning_json(
+        self,
+        url: str,
+        ok_status_codes: list = None,
+        timeout: Union[float, tuple] = None,  # pylint: disable=consider-alternative-union-syntax
+        deadline: Deadline = None,
+        headers: dict = None,
+    ) -> dict:
         """Get data from the specified url in json format.
 
         To be able to do a conversion to json we typically need a valid http response so
@@ -118,6 +300,9 @@ class OsduClient:
         Args:
             url (str): url to GET from to
             ok_status_codes (list, optional): Status codes for successful call. Defaults to [200].
+            timeout (Union[float, tuple], optional): timeout overriding the client default.
+            deadline (Deadline, optional): deadline for the call including any retries.
+            headers (dict, optional): extra http headers for this call.
 
         Raises:
             HTTPError: Raised if the get returns a status other than those in ok_status_codes
@@ -127,11 +312,20 @@ class OsduClient:
         """
         if ok_status_codes is None:
             ok_status_codes = [200]
-        response = self.get(url, ok_status_codes)
+        response = self.get(
+            url, ok_status_codes, timeout=timeout, deadline=deadline, headers=headers
+        )
         return response.json()
 
     def post(
-        self, url: str, data: Union[str, dict], ok_status_codes: list = None  # noqa: E501 pylint: disable=consider-alternative-union-syntax
+        self,
+        url: str,
+        data: Union[str, dict],  # pylint: disable=consider-alternative-union-syntax
+        ok_status_codes: list = None,
+        timeout: Union[float, tuple] = None,  # pylint: disable=consider-alternative-union-syntax
+        deadline: Deadline = None,
+        headers: dict = None,
+        retries: int = None,
     ) -> requests.Response:
         """POST data to the specified url
 
@@ -139,6 +333,10 @@ class OsduClient:
             url (str): url to POST to
             data (Union[str, dict]): json data as string or dict to send as the body
             ok_status_codes (list): [description]
+            timeout (Union[float, tuple], optional): timeout overriding the client default.
+            deadline (Deadline, optional): deadline for the call including any retries.
+            headers (dict, optional): extra http headers for this call.
+            retries (int, optional): retries of transient errors overriding the client default.
 
         Raises:
             HTTPError: Raised if ok_status_codes are passed and the post returns a different status
@@ -146,21 +344,26 @@ class OsduClient:
         Returns:
             [requests.Response]: response object
         """
-        headers = self.get_headers()
-
         # determine whether to send to requests as data or json
         _json = None
         if isinstance(data, dict):
             _json = data
             data = None
 
-        response = requests.post(url, data=data, json=_json, headers=headers)  # pylint: disable=missing-timeout
-        if ok_status_codes is not None and response.status_code not in ok_status_codes:
-            raise HTTPError(response=response)
-        return response
+        return self._request(
+            "POST", url, ok_status_codes, timeout, deadline, self.get_headers(headers),
+            retries=retries, data=data, json=_json
+        )
 
     def post_returning_json(
-        self, url: str, data: Union[str, dict], ok_status_codes: list = None  # noqa: E501 pylint: disable=consider-alternative-union-syntax
+        self,
+        url: str,
+        data: Union[str, dict],  # pylint: disable=consider-alternative-union-syntax
+        ok_status_codes: list = None,
+        timeout: Union[float, tuple] = None,  # pylint: disable=consider-alternative-union-syntax
+        deadline: Deadline = None,
+        headers: dict = None,
+        retries: int = None,
     ) -> dict:
         """Post data to the specified url and get the result in json format.
 
@@ -171,6 +374,10 @@ class OsduClient:
             url (str): url to POST to
             data (Union[str, dict]): json data as string or dict to send as the body
             ok_status_codes (list, optional): Status codes indicating successful call. Defaults to [200].
+            timeout (Union[float, tuple], optional): timeout overriding the client default.
+            deadline (Deadline, optional): deadline for the call including any retries.
+            headers (dict, optional): extra http headers for this call.
+            retries (int, optional): retries of transient errors overriding the client default.
 
         Raises:
             HTTPError: Raised if the get returns a status other than those in ok_status_codes
@@ -180,11 +387,20 @@ class OsduClient:
         """
         if ok_status_codes is None:
             ok_status_codes = [200]
-        response = self.post(url, data, ok_status_codes)
+        response = self.post(
+            url, data, ok_status_codes, timeout=timeout, deadline=deadline, headers=headers, retries=retries
+        )
         return response.json()
 
     def put(
-        self, url: str, data: Union[str, dict], ok_status_codes: list = None  # noqa: E501 pylint: disable=consider-alternative-union-syntax
+        self,
+        url: str,
+        data: Union[str, dict],  # pylint: disable=consider-alternative-union-syntax
+        ok_status_codes: list = None,
+        timeout: Union[float, tuple] = None,  # pylint: disable=consider-alternative-union-syntax
+        deadline: Deadline = None,
+        headers: dict = None,
+        retries: int = None,
     ) -> requests.Response:
         """PUT data to the specified url
 
@@ -192,6 +408,10 @@ class OsduClient:
             url (str): url to POST to
             data (Union[str, dict]): json data as string or dict to send as the body
             ok_status_codes (list): [description]
+            timeout (Union[float, tuple], optional): timeout overriding the client default.
+            deadline (Deadline, optional): deadline for the call including any retries.
+            headers (dict, optional): extra http headers for this call.
+            retries (int, optional): retries of transient errors overriding the client default.
 
         Raises:
             HTTPError: Raised if ok_status_codes are passed and the put returns a different status
@@ -199,21 +419,26 @@ class OsduClient:
         Returns:
             [requests.Response]: response object
         """
-        headers = self.get_headers()
-
         # determine whether to send to requests as data or json
         _json = None
         if isinstance(data, (dict, list)):
             _json = data
             data = None
 
-        response = requests.put(url, data=data, json=_json, headers=headers)  # pylint: disable=missing-timeout
-        if ok_status_codes is not None and response.status_code not in ok_status_codes:
-            raise HTTPError(response=response)
-        return response
+        return self._request(
+            "PUT", url, ok_status_codes, timeout, deadline, self.get_headers(headers),
+            retries=retries, data=data, json=_json
+        )
 
     def put_returning_json(
-        self, url: str, data: Union[str, dict], ok_status_codes: list = None  # noqa: E501 pylint: disable=consider-alternative-union-syntax
+        self,
+        url: str,
+        data: Union[str, dict],  # pylint: disable=consider-alternative-union-syntax
+        ok_status_codes: list = None,
+        timeout: Union[float, tuple] = None,  # pylint: disable=consider-alternative-union-syntax
+        deadline: Deadline = None,
+        headers: dict = None,
+        retries: int = None,
     ) -> dict:
         """Post data to the specified url and get the result in json format.
 
@@ -224,6 +449,10 @@ class OsduClient:
             url (str): url to POST to
             data (Union[str, dict]): json data as string or dict to send as the body
             ok_status_codes (list, optional): Status codes indicating successful call. Defaults to [200].
+            timeout (Union[float, tuple], optional): timeout overriding the client default.
+            deadline (Deadline, optional): deadline for the call including any retries.
+            headers (dict, optional): extra http headers for this call.
+            retries (int, optional): retries of transient errors overriding the client default.
 
         Raises:
             HTTPError: Raised if the get returns a status other than those in ok_status_codes
@@ -233,15 +462,29 @@ class OsduClient:
         """
         if ok_status_codes is None:
             ok_status_codes = [200]
-        response = self.put(url, data, ok_status_codes)
+        response = self.put(
+            url, data, ok_status_codes, timeout=timeout, deadline=deadline, headers=headers, retries=retries
+        )
         return response.json()
 
-    def delete(self, url: str, ok_status_codes: list = None) -> requests.Response:
+    def delete(
+        self,
+        url: str,
+        ok_status_codes: list = None,
+        timeout: Union[float, tuple] = None,  # pylint: disable=consider-alternative-union-syntax
+        deadline: Deadline = None,
+        headers: dict = None,
+        retries: int = None,
+    ) -> requests.Response:
         """GET to a url
 
         Args:
             url (str): url to PUT to
             ok_status_codes (list, optional): Status codes indicating successful call.
+            timeout (Union[float, tuple], optional): timeout overriding the client default.
+            deadline (Deadline, optional): deadline for the call including any retries.
+            headers (dict, optional): extra http headers for this call.
+            retries (int, optional): retries of transient errors overriding the client default.
 
         Raises:
             HTTPError: Raised if ok_status_codes are passed and the delete returns a different status
@@ -249,10 +492,258 @@ class OsduClient:
         Returns:
             requests.Response: response object
         """
-        headers = self.get_headers()
-        response = requests.delete(url, headers=headers)  # pylint: disable=missing-timeout
+        return self._request(
+            "DELETE", url, ok_status_codes, timeout, deadline, self.get_headers(headers), retries=retries
+        )
+
+    # endregion HTTP Actions
+
+    def _request(
+        self,
+        method: str,
+        url: str,
+        ok_status_codes: list,
+        timeout: Union[float, tuple],  # pylint: disable=consider-alternative-union-syntax
+        deadline: Deadline,
+        headers: dict,
+        retries: int = None,
+        **kwargs,
+    ) -> requests.Response:
+        """Send a request, within a tracing span when tracing is enabled.
+
+        Raises:
+            HTTPError: Raised if ok_status_codes are passed and the response has a different status
+            DeadlineExceededError: Raised if the deadline passes before a response is received
+            requests.ConnectionError: Raised if the connection fails and retries are exhausted
+            requests.Timeout: Raised if the request times out and retries are exhausted
+        """
+        if retries is None:
+            retries = self._retries
+        tracer = tracing.get_tracer()
+        if tracer is None:
+            response = self._send_with_retries(method, url, timeout, deadline, headers, None, retries, **kwargs)
+            self._check_status(response, ok_status_codes)
+            return response
+
+        service, endpoint = split_service_url(url)
+        attributes = {
+            "http.request.method": method,
+            "url.full": url,
+            "osdu.service": service,
+            "osdu.endpoint": endpoint,
+            "osdu.data_partition": self._data_partition,
+        }
+        with tracer.span(f"{method} {service}/{endpoint}", "CLIENT", attributes) as span:
+            headers = dict(headers)
+            tracer.inject(span, headers)
+            response = self._send_with_retries(method, url, timeout, deadline, headers, span, retries, **kwargs)
+            span.set_attribute("http.response.status_code", response.status_code)
+            span.set_status("ERROR" if response.status_code >= 400 else "OK")
+            self._check_status(response, ok_status_codes)
+            return response
+
+    def _send_with_retries(
+        self,
+        method: str,
+        url: str,
+        timeout: Union[float, tuple],  # pylint: disable=consider-alternative-union-syntax
+        deadline: Deadline,
+        headers: dict,
+        span: tracing.Span,
+        retries: int,
+        **kwargs,
+    ) -> requests.Response:
+        """Send a request, retrying transient errors within the retries and deadline.
+
+        Raises:
+            DeadlineExceededError: Raised if the deadline passes before a response is received
+            requests.ConnectionError: Raised if the connection fails and retries are exhausted
+            requests.Timeout: Raised if the request times out and retries are exhausted
+        """
+        idempotent = method in IDEMPOTENT_METHODS
+        retry_status_codes = RETRY_STATUS_CODES if idempotent else NON_IDEMPOTENT_RETRY_STATUS_CODES
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            if span is not None:
+                span.set_attribute("osdu.retry_count", attempt)
+            call_timeout = self._call_timeout(timeout, deadline)
+            try:
+                response = self._send(
+                    method, url, attempt, headers=headers, timeout=call_timeout, **kwargs
+                )
+            except (requests.ConnectionError, requests.Timeout) as ex:
+                if deadline is not None and deadline.expired:
+                    raise DeadlineExceededError(f"Deadline exceeded calling {method} {url}") from ex
+                if attempt >= retries or not (idempotent or request_not_sent(ex)):
+                    raise
+                logger.debug("%s %s failed: %s", method, url, ex)
+                response = None
+
+            if response is not None and (
+                response.status_code not in retry_status_codes or attempt >= retries
+            ):
+                break
+            delay = retry_delay(attempt, response)
+            if deadline is not None and deadline.remaining() <= delay:
+                if response is not None:
+                    break
+                raise DeadlineExceededError(f"Deadline exceeded calling {method} {url}")
+            logger.debug("Retrying %s %s in %.2fs", method, url, delay)
+            time.sleep(delay)
+            attempt += 1
+        self._log_if_slow(method, url, attempt, response, time.perf_counter() - start)
+        return response
+
+    def _log_if_slow(
+        self, method: str, url: str, attempt: int, response: requests.Response, latency: float
+    ):
+        """Log a structured slow request record if latency exceeds the slow request threshold."""
+        if self._slow_request_threshold is None or latency <= self._slow_request_threshold:
+            return
+        record = {
+            "method": method,
+            "url": redact_url(url),
+            "data_partition": self._data_partition,
+            "status_code": response.status_code,
+            "latency": latency,
+            "retries": attempt,
+            "bytes_sent": _body_size(response.request.body),
+            "bytes_received": len(response.content or b""),
+            "caller": _caller_site(),
+        }
+        slow_request_logger.warning(
+            "Slow request %s %s took %.3fs from %s",
+            method, record["url"], latency, record["caller"],
+            extra={"osdu_slow_request": record},
+        )
+
+    @staticmethod
+    def _check_status(response: requests.Response, ok_status_codes: list):
+        """Check the response status is one of ok_status_codes, if they are given.
+
+        Raises:
+            HTTPError: Raised if the response has a status other than those in ok_status_codes
+        """
         if ok_status_codes is not None and response.status_code not in ok_status_codes:
             raise HTTPError(response=response)
+
+    def _call_timeout(
+        self, timeout: Union[float, tuple], deadline: Deadline  # pylint: disable=consider-alternative-union-syntax
+    ) -> Union[float, tuple]:  # pylint: disable=consider-alternative-union-syntax
+        """Timeout for the next attempt, limited by any deadline.
+
+        Raises:
+            DeadlineExceededError: Raised if the deadline has passed
+        """
+        if timeout is None:
+            timeout = self._timeout
+        if deadline is None:
+            return timeout
+        deadline.check()
+        return deadline.clip(timeout)
+
+    def _send(self, method: str, url: str, attempt: int, **kwargs) -> requests.Response:
+        """Send a single attempt of a request, emitting instrumentation events if needed.
+
+        Raises:
+            requests.RequestException: Raised if the request fails
+        """
+        if not instrumentation.has_listeners():
+            return self._send_attempt(method, url, **kwargs)
+
+        service, endpoint = split_service_url(url)
+        instrumentation.emit(
+            instrumentation.RequestStartEvent(method, url, service, endpoint, attempt)
+        )
+        start = time.perf_counter()
+        try:
+            response = self._send_attempt(method, url, **kwargs)
+        except requests.RequestException as ex:
+            instrumentation.emit(
+                instrumentation.RequestEndEvent(
+                    method, url, service, endpoint, attempt, None, time.perf_counter() - start,
+                    _body_size(kwargs.get("data")), 0, ex
+                )
+            )
+            raise
+        instrumentation.emit(
+            instrumentation.RequestEndEvent(
+                method, url, service, endpoint, attempt, response.status_code,
+                time.perf_counter() - start, _body_size(response.request.body),
+                len(response.content or b""), None, _phase_timings(response),
+            )
+        )
         return response
 
-    # endregion HTTP Actions
+    def _send_attempt(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a single attempt of a request, hedging it if enabled."""
+        self._check_fork()
+        if self._hedging is not None and self._hedging.should_hedge(method, url):
+            return self._hedging.execute(
+                lambda: self._session.request(method, url, **kwargs)
+            )
+        return self._session.request(method, url, **kwargs)
+
+
+def retry_delay(attempt: int, response: requests.Response = None) -> float:
+    """Delay before retrying a transient error, honouring any Retry-After header
+
+    Args:
+        attempt (int): number of the failed attempt, starting at 0
+        response (requests.Response, optional): the failed response, None if there was none
+
+    Returns:
+        float: seconds to wait
+    """
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is not None and retry_after.isdigit():
+            return min(float(retry_after), RETRY_BACKOFF_MAX)
+    return min(RETRY_BACKOFF_FACTOR * (2**attempt), RETRY_BACKOFF_MAX)
+
+
+def request_not_sent(error: requests.RequestException) -> bool:
+    """Whether a request failed before it was sent, so the server can't have applied it.
+
+    A read timeout or a dropped connection may happen after the server applied a write, so
+    retrying a non idempotent request then could apply it twice.
+
+    Args:
+        error (requests.RequestException): the connection error or timeout
+
+    Returns:
+        bool: True if the request can safely be sent again
+    """
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def _caller_site() -> str:
+    """Location of the first stack frame outside the osdu package, e.g. file.py:12 in main."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module != "osdu" and not module.startswith("osdu."):
+            return f"{frame.f_code.co_filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+def _phase_timings(response: requests.Response) -> instrumentation.PhaseTimings:
+    timings = getattr(response, "timings", None)
+    return timings if isinstance(timings, instrumentation.PhaseTimings) else None
+
+
+def _body_size(body) -> int:
+    """Size in bytes of a request body."""
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode("utf8"))
+    try:
+        return len(body)
+    except TypeError:  # e.g. a generator streaming the body
+        return 0
@@ -0,0 +1,79 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""Deadlines for budgeting time across retries, pages and batches."""
+
+import time
+from typing import Union
+
+from osdu.exceptions import DeadlineExceededError
+
+
+class Deadline:
+    """A point in time by which an operation should complete.
+
+    Pass the same deadline to every call making up a high level operation (e.g. all pages
+    of a cursor scan) so the time spent by earlier calls is deducted from later ones.
+    """
+
+    @property
+    def seconds(self) -> float:
+        """Total time budget
+
+        Returns:
+            float: time budget in seconds
+        """
+        return self._seconds
+
+    @property
+    def expired(self) -> bool:
+        """Whether the deadline has passed
+
+        Returns:
+            bool: True if no time remains
+        """
+        return self.remaining() <= 0
+
+    def __init__(self, seconds: float):
+        """Setup a deadline the given number of seconds from now
+
+        Args:
+            seconds (float): time budget in seconds
+        """
+        self._seconds = seconds
+        self._expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """Time remaining until the deadline
+
+        Returns:
+            float: remaining time in seconds, 0 if the deadline has passed
+        """
+        return max(0.0, self._expires_at - time.monotonic())
+
+    def check(self):
+        """Check there is time remaining
+
+        Raises:
+            DeadlineExceededError: Raised if the deadline has passed
+        """
+        if self.expired:
+            raise DeadlineExceededError(f"Deadline of {self._seconds}s exceeded")
+
+    def clip(self, timeout: Union[float, tuple, None]) -> Union[float, tuple]:  # noqa: E501 pylint: disable=consider-alternative-union-syntax
+        """Limit a requests style timeout to the remaining time
+
+        Args:
+            timeout (Union[float, tuple, None]): timeout in seconds, or (connect, read) tuple
+
+        Returns:
+            Union[float, tuple]: timeout not exceeding the remaining time
+        """
+        remaining = self.remaining()
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return tuple(remaining if t is None else min(t, remaining) for t in timeout)
+        return min(timeout, remaining)
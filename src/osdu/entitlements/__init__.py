@@ -4,6 +4,21 @@
 # license information.
 # -----------------------------------------------------------------------------
 # pylint: disable=C0114
+from ._acl import AclEvaluator
+from ._bulk import BulkItemResult, BulkReport
 from ._client import EntitlementsClient
+from ._graph import MembershipGraph
+from ._provision import ProvisionReport
+from ._reconcile import ReconcilePlan, ReconcileReport, read_desired_state
 
-__all__ = ["EntitlementsClient"]
+__all__ = [
+    "AclEvaluator",
+    "BulkItemResult",
+    "BulkReport",
+    "EntitlementsClient",
+    "MembershipGraph",
+    "ProvisionReport",
+    "ReconcilePlan",
+    "ReconcileReport",
+    "read_desired_state",
+]
@@ -0,0 +1,118 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""Evaluate record ACLs locally against cached entitlements groups."""
+
+import threading
+import time
+from collections.abc import Iterable
+
+from osdu import instrumentation
+
+from ._client import EntitlementsClient
+
+
+class AclEvaluator:
+    """Check record ACLs against the groups of an identity, cached for ttl seconds.
+
+    The groups of the client's own identity come from EntitlementsClient.list_groups, those
+    of another member from list_member_groups. Both include groups reached through nested
+    groups. A record can be viewed by members of any of its acl viewers or owners groups:
+
+        evaluator = AclEvaluator(entitlements_client, ttl=60)
+        visible = evaluator.filter_records(search_results, member="someone@contoso.com")
+    """
+
+    def __init__(self, client: EntitlementsClient, ttl: float = 300):
+        """Setup the evaluator, groups are fetched on first use for each identity
+
+        Args:
+            client (EntitlementsClient): client to fetch groups with
+            ttl (float): seconds before an identity's groups are fetched again. Defaults to 300.
+        """
+        self._client = client
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._groups = {}  # member -> (expires, frozenset of group emails)
+
+    def groups(self, member: str = None) -> frozenset:
+        """Emails of the groups an identity belongs to
+
+        Args:
+            member (str, optional): email of the identity. Defaults to the client's identity.
+
+        Returns:
+            frozenset: group emails
+        """
+        now = time.monotonic()
+        with self._lock:
+            cached = self._groups.get(member)
+        hit = cached is not None and now < cached[0]
+        instrumentation.emit_cache_event("acl_groups", hit)
+        if hit:
+            return cached[1]
+        if member is None:
+            response = self._client.list_groups()
+        else:
+            response = self._client.list_member_groups(member)
+        groups = frozenset(group["email"] for group in response.get("groups") or [])
+        with self._lock:
+            self._groups[member] = (now + self._ttl, groups)
+        return groups
+
+    def invalidate(self, member: str = None):
+        """Fetch the groups of an identity again on next use
+
+        Args:
+            member (str, optional): email of the identity. Defaults to the client's identity.
+        """
+        with self._lock:
+            self._groups.pop(member, None)
+
+    def can_access(self, acl: dict, member: str = None, owner: bool = False) -> bool:
+        """Whether an identity can view, or own, a record with the given acl
+
+        Args:
+            acl (dict): record acl with viewers and owners lists of group emails
+            member (str, optional): email of the identity. Defaults to the client's identity.
+            owner (bool): check owner rather than viewer access. Defaults to False.
+
+        Returns:
+            bool: True if access is granted
+        """
+        return _granted(self.groups(member), acl, owner)
+
+    def filter_records(self, records: Iterable, member: str = None, owner: bool = False) -> list:
+        """Records an identity can view, or own
+
+        The groups are looked up once for the batch and the result for each distinct acl is
+        reused, so records sharing acls cost a dict lookup each.
+
+        Args:
+            records (Iterable): records with an acl, e.g. search results
+            member (str, optional): email of the identity. Defaults to the client's identity.
+            owner (bool): require owner rather than viewer access. Defaults to False.
+
+        Returns:
+            list: the records access is granted to, in their original order
+        """
+        groups = self.groups(member)
+        decisions = {}
+        granted = []
+        for record in records:
+            acl = record.get("acl") or {}
+            key = (tuple(acl.get("viewers") or ()), tuple(acl.get("owners") or ()))
+            decision = decisions.get(key)
+            if decision is None:
+                decision = decisions[key] = _granted(groups, acl, owner)
+            if decision:
+                granted.append(record)
+        return granted
+
+
+def _granted(groups: frozenset, acl: dict, owner: bool) -> bool:
+    if not groups.isdisjoint(acl.get("owners") or ()):
+        return True
+    return not owner and not groups.isdisjoint(acl.get("viewers") or ())
@@ -0,0 +1,113 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""Run many entitlements calls concurrently, reporting the outcome of each."""
+
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+import requests
+
+from osdu._ratelimit import TokenBucket
+from osdu.client import RETRY_STATUS_CODES, retry_delay
+
+
+class BulkItemResult(NamedTuple):
+    """Outcome of one item of a bulk operation."""
+
+    item: tuple
+    """Arguments of the call, e.g. (member, group, role)"""
+    ok: bool
+    status_code: int
+    """Status of the last attempt, None if it failed without a response"""
+    error: Exception
+    """Error of the last attempt if it failed, None otherwise"""
+    attempts: int
+
+
+class BulkReport(NamedTuple):
+    """Outcome of a bulk operation, results are in the order of the items."""
+
+    results: list
+    elapsed: float
+
+    @property
+    def succeeded(self) -> list:
+        """Results of the items that succeeded"""
+        return [result for result in self.results if result.ok]
+
+    @property
+    def failed(self) -> list:
+        """Results of the items that failed"""
+        return [result for result in self.results if not result.ok]
+
+    @property
+    def items_per_s(self) -> float:
+        """Throughput of the operation"""
+        return len(self.results) / self.elapsed if self.elapsed else 0.0
+
+
+def run_bulk(
+    operation: Callable,
+    items: list,
+    accepted_status_codes: tuple = (),
+    max_workers: int = 8,
+    rate: float = None,
+    retries: int = 3,
+) -> BulkReport:
+    """Call operation with the arguments of each item concurrently
+
+    Args:
+        operation (Callable): function called as operation(*item, retries=0), so the client
+            doesn't retry as well and every attempt is counted by rate
+        items (list): argument tuples
+        accepted_status_codes (tuple): error statuses that count as success, e.g. 409 for a
+            member that already exists
+        max_workers (int): maximum number of concurrent calls. Defaults to 8.
+        rate (float): maximum calls per second, including retries. Defaults to no limit.
+        retries (int): retries of transient failures per item. Defaults to 3.
+
+    Returns:
+        BulkReport: outcome of each item
+    """
+    start = time.perf_counter()
+    limiter = TokenBucket(rate) if rate else None
+
+    def run_item(item: tuple) -> BulkItemResult:
+        return _run_item(operation, item, accepted_status_codes, limiter, retries)
+
+    with ThreadPoolExecutor(max_workers, thread_name_prefix="osdu-bulk") as executor:
+        results = list(executor.map(run_item, items))
+    return BulkReport(results, time.perf_counter() - start)
+
+
+def _run_item(
+    operation: Callable, item: tuple, accepted_status_codes: tuple, limiter: TokenBucket, retries: int
+) -> BulkItemResult:
+    attempt = 0
+    while True:
+        if limiter is not None:
+            limiter.acquire()
+        response = None
+        try:
+            operation(*item, retries=0)
+            return BulkItemResult(item, True, 200, None, attempt + 1)
+        except requests.HTTPError as ex:
+            response = ex.response
+            status_code = response.status_code if response is not None else None
+            if status_code in accepted_status_codes:
+                return BulkItemResult(item, True, status_code, None, attempt + 1)
+            error = ex
+            transient = status_code in RETRY_STATUS_CODES
+        except (requests.ConnectionError, requests.Timeout) as ex:
+            status_code, error, transient = None, ex, True
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            status_code, error, transient = None, ex, False
+        if not transient or attempt >= retries:
+            return BulkItemResult(item, False, status_code, error, attempt + 1)
+        time.sleep(retry_delay(attempt, response))
+        attempt += 1
@@ -5,28 +5,59 @@
 # -----------------------------------------------------------------------------
 """Entitlements client for working with the OSDU entitlements API."""
 
+import functools
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from typing import Union
+from urllib.parse import urlencode
+
+from requests import HTTPError
 
 from osdu.client import OsduClient
-from osdu.serviceclientbase import ServiceClientBase
+from osdu.serviceclientbase import ServiceClientBase, service_operation
+
+from ._bulk import BulkReport, run_bulk
+from ._index import MemberIndex
+from ._provision import ProvisionReport, membership_phases
+from ._reconcile import PHASES, ReconcilePlan, ReconcileReport, desired_groups, plan_reconcile
 
 VALID_ENTITLEMENTS_API_VERSIONS = [2]
 
 
 class EntitlementsClient(ServiceClientBase):
-    """A client for working with the OSDU Entitlements API."""
+    """A client for working with the OSDU Entitlements API.
+
+    get_member_groups answers which groups a member belongs to from a local reverse index,
+    built on first use by listing the members of every group concurrently. Members added or
+    removed through this client are applied to the index. With member_index_path the index
+    is loaded from that file when it is recent enough, and saved there after building or by
+    save_member_index, so the next process starts warm.
+    """
 
-    def __init__(self, client: OsduClient, service_version: Union[int, str] = "latest"):  # noqa: E501 pylint: disable=consider-alternative-union-syntax
+    def __init__(
+        self,
+        client: OsduClient,
+        service_version: Union[int, str] = "latest",  # pylint: disable=consider-alternative-union-syntax
+        member_index_path: str = None,
+        member_index_max_age: float = None,
+    ):
         """Setup the EntitlementsClient
 
         Args:
             client (OsduClient): client to use for connection
             service_version (Union[int, str], optional): service version (3 or 'latest') Defaults to 'latest'.
+            member_index_path (str, optional): file to persist the member index to.
+            member_index_max_age (float, optional): seconds after which a saved member index is
+                rebuilt instead of loaded. Defaults to no limit.
 
         Raises:
             ValueError: [description]
         """
         super().__init__(client, "entitlements", VALID_ENTITLEMENTS_API_VERSIONS, service_version)
+        self._member_index = MemberIndex()
+        self._member_index_path = member_index_path
+        self._member_index_max_age = member_index_max_age
 
     # def query():
     #     pass
@@ -34,6 +65,7 @@ class EntitlementsClient(ServiceClientBase):
     # def query_by_id():
     #     pass
 
+    @service_operation
     def is_healthy(self) -> bool:
         """Returns health status of the API
 
@@ -43,6 +75,7 @@ class EntitlementsClient(ServiceClientBase):
         response = self._client.get(self.api_url("health/readiness_check"))
         return response.status_code == 200
 
+    @service_operation
     def list_groups(self) -> dict:
         """List groups
 
@@ -52,24 +85,73 @@ class EntitlementsClient(ServiceClientBase):
         response_json = self._client.get_returning_json(self.api_url("groups"))
         return response_json
 
-    def list_group_members(self, group: str) -> dict:
+    @service_operation
+    def list_member_groups(self, member: str, group_type: str = "NONE") -> dict:
+        """List groups a member belongs to, including through nested groups
+
+        Args:
+            member (str): The email of the member.
+            group_type (str): Type of groups to list, NONE for all, DATA, USER or SERVICE.
+
+        Returns:
+            dict: containing the result
+        """
+        response_json = self._client.get_returning_json(
+            self.api_url(f"members/{member}/groups?type={group_type}")
+        )
+        return response_json
+
+    @service_operation
+    def list_group_members(self, group: str, role: str = None, limit: int = None, cursor: str = None) -> dict:
         """List members in a group
 
         Args:
             group (str): The email of the group.
+            role (str): Optional role (OWNER or MEMBER) to filter the members by.
+            limit (int): Optional maximum number of members to return.
+            cursor (str): Optional cursor from a previous response to get the next members.
 
         Returns:
             dict: containing the result
         """
-        response_json = self._client.get_returning_json(self.api_url(f"groups/{group}/members"))
+        params = {"role": role, "limit": limit, "cursor": cursor}
+        query = urlencode({name: value for name, value in params.items() if value is not None})
+        url = self.api_url(f"groups/{group}/members")
+        response_json = self._client.get_returning_json(f"{url}?{query}" if query else url)
         return response_json
 
-    def add_group(self, group: str, description: str = None) -> dict:
+    @service_operation
+    def iter_group_members(self, group: str, role: str = None, limit: int = 1000) -> Iterator[dict]:
+        """List members in a group lazily, a page of at most limit members at a time
+
+        Follows the cursor returned by the service until the members are exhausted, so only
+        one page is held in memory.
+
+        Args:
+            group (str): The email of the group.
+            role (str): Optional role (OWNER or MEMBER) to filter the members by on the server.
+            limit (int): Maximum number of members per request. Defaults to 1000.
+
+        Yields:
+            dict: each member, with its email and role
+        """
+        cursor = None
+        while True:
+            page = self.list_group_members(group, role, limit, cursor)
+            members = page.get("members") or []
+            yield from members
+            cursor = page.get("cursor")
+            if not cursor or not members:
+                return
+
+    @service_operation
+    def add_group(self, group: str, description: str = None, retries: int = None) -> dict:
         """Add a new group
 
         Args:
             group (str): The email of the group.
             description (str): Optional desctiption for the group.
+            retries (int): retries of transient errors overriding the client default.
 
         Returns:
             dict: containing the result
@@ -78,25 +160,30 @@ class EntitlementsClient(ServiceClientBase):
         if description is not None:
             request_data["description"] = description
         response_json = self._client.post_returning_json(
-            self.api_url("groups"), request_data, [200, 201]
+            self.api_url("groups"), request_data, [200, 201], retries=retries
         )
         return response_json
 
-    def delete_group(self, group: str):
+    @service_operation
+    def delete_group(self, group: str, retries: int = None):
         """Delete a group
 
         Args:
             group (str): The email of the group.
+            retries (int): retries of transient errors overriding the client default.
         """
-        _ = self._client.delete(self.api_url(f"groups/{group}"), [200, 204])
+        _ = self._client.delete(self.api_url(f"groups/{group}"), [200, 204], retries=retries)
+        self._member_index.remove_group(group)
 
-    def add_member_to_group(self, member: str, group: str, role: str) -> dict:
+    @service_operation
+    def add_member_to_group(self, member: str, group: str, role: str, retries: int = None) -> dict:
         """Add member to group
 
         Args:
             member (str): The email of the member to be added.
             group (str): The email of the group.
             role (str): The role in the group.
+            retries (int): retries of transient errors overriding the client default.
 
         Returns:
             dict: containing the result
@@ -106,15 +193,248 @@ class EntitlementsClient(ServiceClientBase):
             "role": role,
         }
         response_json = self._client.post_returning_json(
-            self.api_url(f"groups/{group}/members"), request_data
+            self.api_url(f"groups/{group}/members"), request_data, retries=retries
         )
+        self._member_index.add(member, group, role)
         return response_json
 
-    def remove_member_from_group(self, member: str, group: str):
+    @service_operation
+    def remove_member_from_group(self, member: str, group: str, retries: int = None):
         """Remove member from group
 
         Args:
             member (str): The email of the member to remove.
             group (str): The email of the group.
+            retries (int): retries of transient errors overriding the client default.
+        """
+        _ = self._client.delete(self.api_url(f"groups/{group}/members/{member}"), [204], retries=retries)
+        self._member_index.remove(member, group)
+
+    @service_operation
+    def add_members_to_groups(
+        self, members: Iterable, max_workers: int = 8, rate: float = None, retries: int = 3
+    ) -> BulkReport:
+        """Add members to groups concurrently
+
+        A member that is already in the group (409) counts as success. Transient failures
+        (429, 502-504, connection errors and timeouts) are retried with backoff, other failures
+        are reported in the result of that item rather than raised.
+
+            report = entitlements_client.add_members_to_groups(
+                [("someone@contoso.com", "data.welldb.viewers@opendes.contoso.com", "MEMBER")], rate=20
+            )
+            for result in report.failed:
+                print(result.item, result.status_code, result.error)
+
+        Args:
+            members (Iterable): (member, group, role) tuples
+            max_workers (int): maximum number of concurrent requests. Defaults to 8.
+            rate (float): maximum requests per second, including retries. Defaults to no limit.
+            retries (int): retries of transient failures per item. Defaults to 3.
+
+        Returns:
+            BulkReport: result of each item in the order given, and the elapsed time
+        """
+        items = [tuple(item) for item in members]
+        return run_bulk(self.add_member_to_group, items, (409,), max_workers, rate, retries)
+
+    @service_operation
+    def remove_members_from_groups(
+        self, members: Iterable, max_workers: int = 8, rate: float = None, retries: int = 3
+    ) -> BulkReport:
+        """Remove members from groups concurrently
+
+        A member that isn't in the group (404) counts as success. Failures are handled as by
+        add_members_to_groups.
+
+        Args:
+            members (Iterable): (member, group) tuples
+            max_workers (int): maximum number of concurrent requests. Defaults to 8.
+            rate (float): maximum requests per second, including retries. Defaults to no limit.
+            retries (int): retries of transient failures per item. Defaults to 3.
+
+        Returns:
+            BulkReport: result of each item in the order given, and the elapsed time
+        """
+        items = [tuple(item) for item in members]
+        return run_bulk(self.remove_member_from_group, items, (404,), max_workers, rate, retries)
+
+    @service_operation
+    def reconcile(
+        self,
+        desired: dict,
+        dry_run: bool = False,
+        prune_prefix: str = None,
+        ignore_members: Iterable = (),
+        max_workers: int = 8,
+        rate: float = None,
+        retries: int = 3,
+    ) -> ReconcileReport:
+        """Bring groups and their members to a desired state with as few calls as possible
+
+        The members of every desired group are fetched concurrently and compared with the
+        desired state (see read_desired_state for the document format). Then missing groups
+        are added, unwanted memberships removed, missing memberships added and pruned groups
+        deleted, in that order, with the calls of each phase made concurrently as by
+        add_members_to_groups. A member whose role differs is removed and added again.
+
+            report = entitlements_client.reconcile(
+                read_desired_state("groups.yaml"), dry_run=True, ignore_members=["reconciler@contoso.com"]
+            )
+            print(report.plan)
+
+        Args:
+            desired (dict): desired state document
+            dry_run (bool): only compute the plan. Defaults to False.
+            prune_prefix (str, optional): delete listed groups whose email starts with this
+                prefix if they aren't in the desired state. Defaults to deleting no groups.
+            ignore_members (Iterable, optional): members never added or removed, e.g. the
+                identity running the reconcile, which owns the groups it creates.
+            max_workers (int): maximum number of concurrent requests. Defaults to 8.
+            rate (float): maximum requests per second when applying. Defaults to no limit.
+            retries (int): retries of transient failures per call. Defaults to 3.
+
+        Returns:
+            ReconcileReport: the plan, outcome of each applied phase and timings
         """
-        _ = self._client.delete(self.api_url(f"groups/{group}/members/{member}"), [204])
+        start = time.perf_counter()
+        groups = desired_groups(desired)
+        current, prune = self._fetch_current_state(groups, prune_prefix, max_workers)
+        timings = {"fetch": time.perf_counter() - start}
+
+        start = time.perf_counter()
+        plan = plan_reconcile(current, groups, prune, ignore_members)
+        timings["plan"] = time.perf_counter() - start
+
+        results = {} if dry_run else self._apply_plan(plan, max_workers, rate, retries)
+        timings.update((phase, report.elapsed) for phase, report in results.items())
+        return ReconcileReport(plan, results, timings)
+
+    @service_operation
+    def provision_groups(
+        self, manifest: dict, max_workers: int = 8, rate: float = None, retries: int = 3
+    ) -> ProvisionReport:
+        """Create the groups of a manifest and add their members, including nested groups
+
+        The manifest has the format of a reconcile desired state document. All groups are
+        created concurrently first, then all memberships are added concurrently, so a nested
+        group is only assigned once both groups exist. Groups and members that already exist
+        count as success, so provisioning can be re-run after a partial failure. Memberships of
+        a group that couldn't be created are skipped. Nothing is removed, use reconcile for that.
+
+        Args:
+            manifest (dict): groups with their description and members
+            max_workers (int): maximum number of concurrent requests. Defaults to 8.
+            rate (float): maximum requests per second, including retries. Defaults to no limit.
+            retries (int): retries of transient failures per call. Defaults to 3.
+
+        Returns:
+            ProvisionReport: outcome of each call, skipped memberships and throughput
+        """
+        start = time.perf_counter()
+        groups = desired_groups(manifest)
+        creations = [(group.partition("@")[0], description) for group, (description, _) in groups.items()]
+        created = run_bulk(self.add_group, creations, (409,), max_workers, rate, retries)
+        failed_groups = {group for group, result in zip(groups, created.results) if not result.ok}
+        memberships, skipped = membership_phases(groups, failed_groups)
+        added = run_bulk(self.add_member_to_group, memberships, (409,), max_workers, rate, retries)
+        return ProvisionReport(created, added, skipped, time.perf_counter() - start)
+
+    @service_operation
+    def get_member_groups(self, member: str) -> dict:
+        """Groups a member directly belongs to, from the local member index
+
+        The index is loaded from member_index_path or built on first use. Use MembershipGraph
+        to also resolve nested groups.
+
+        Args:
+            member (str): The email of the member.
+
+        Returns:
+            dict: role of the member by group email
+        """
+        if not self._member_index.ready:
+            with self._member_index.build_lock:
+                # another thread may have built the index while this one waited
+                if not self._member_index.ready:
+                    self._load_or_build_member_index()
+        return self._member_index.groups_of(member)
+
+    @service_operation
+    def build_member_index(self, max_workers: int = 8) -> int:
+        """Build the member index by listing the members of every group concurrently, saving it
+        to member_index_path if set
+
+        Args:
+            max_workers (int): maximum number of concurrent requests. Defaults to 8.
+
+        Returns:
+            int: number of groups indexed
+        """
+        with self._member_index.build_lock:
+            built = time.time()
+            groups = [group["email"] for group in self.list_groups()["groups"]]
+            with ThreadPoolExecutor(max_workers, thread_name_prefix="osdu-member-index") as executor:
+                members = dict(zip(groups, executor.map(functools.partial(members_by_email, self), groups)))
+            self._member_index.replace(
+                {group: group_members for group, group_members in members.items() if group_members is not None},
+                built,
+            )
+            self.save_member_index()
+            return len(groups)
+
+    def save_member_index(self, path: str = None):
+        """Save the member index, including changes made through this client since it was built
+
+        Args:
+            path (str, optional): file to write. Defaults to member_index_path, nothing is saved
+                if neither is set.
+        """
+        path = path or self._member_index_path
+        if path and self._member_index.ready:
+            self._member_index.save(path)
+
+    def _load_or_build_member_index(self):
+        if self._member_index_path and self._member_index.load(self._member_index_path):
+            max_age = self._member_index_max_age
+            if max_age is None or time.time() - self._member_index.built < max_age:
+                return
+        self.build_member_index()
+
+    def _apply_plan(self, plan: ReconcilePlan, max_workers: int, rate: float, retries: int) -> dict:
+        """Make the calls of each phase of plan in order, returning the BulkReport of each"""
+        operations = {
+            "add_groups": (self.add_group, (409,)),
+            "remove_members": (self.remove_member_from_group, (404,)),
+            "add_members": (self.add_member_to_group, (409,)),
+            "delete_groups": (self.delete_group, (404,)),
+        }
+        results = {}
+        for phase in PHASES:
+            calls = getattr(plan, phase)
+            if calls:
+                operation, accepted_status_codes = operations[phase]
+                results[phase] = run_bulk(operation, calls, accepted_status_codes, max_workers, rate, retries)
+        return results
+
+    def _fetch_current_state(self, groups: Iterable, prune_prefix: str, max_workers: int) -> tuple:
+        """Members of the existing groups by email, and the listed groups matching prune_prefix"""
+        with ThreadPoolExecutor(max_workers, thread_name_prefix="osdu-reconcile") as executor:
+            listed = executor.submit(self.list_groups) if prune_prefix else None
+            members = dict(zip(groups, executor.map(functools.partial(members_by_email, self), groups)))
+            prune = []
+            if listed is not None:
+                prune = [group["email"] for group in listed.result()["groups"]]
+                prune = [group for group in prune if group.startswith(prune_prefix)]
+        current = {group: group_members for group, group_members in members.items() if group_members is not None}
+        return current, prune
+
+
+def members_by_email(client: EntitlementsClient, group: str) -> dict:
+    """Role of each member of group by email, following every page, None if the group doesn't exist"""
+    try:
+        return {member["email"]: member.get("role") for member in client.iter_group_members(group)}
+    except HTTPError as ex:
+        if ex.response is not None and ex.response.status_code == 404:
+            return None
+        raise
@@ -0,0 +1,234 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""Cached entitlements membership graph answering transitive membership queries locally."""
+
+import threading
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+
+from osdu import instrumentation
+
+from ._client import EntitlementsClient, members_by_email
+
+
+class MembershipGraph:  # pylint: disable=too-many-instance-attributes
+    """In memory graph of entitlements groups and their members.
+
+    The graph is built from EntitlementsClient.list_groups and the members of each group,
+    fetched concurrently. Members that are themselves groups (known groups, or emails in the
+    domain of a known group) are followed, so nested groups are resolved:
+
+        graph = MembershipGraph(entitlements_client, ttl=600)
+        graph.effective_groups("someone@contoso.com")
+        graph.effective_members("data.welldb.viewers@opendes.contoso.com")
+
+    Queries refresh the graph first if it is older than ttl. A refresh lists the groups again
+    but only fetches the members of groups that are new, invalidated or older than ttl, so
+    after changing a group call invalidate(group) to have just that group fetched.
+    """
+
+    def __init__(
+        self,
+        client: EntitlementsClient,
+        ttl: float = 300,
+        max_workers: int = 8,
+        groups: Iterable = None,
+    ):
+        """Setup the graph, it is fetched on first use or refresh
+
+        Args:
+            client (EntitlementsClient): client to fetch groups and members with
+            ttl (float): seconds before the groups and members are fetched again. Defaults to 300.
+            max_workers (int): maximum number of concurrent member requests. Defaults to 8.
+            groups (Iterable): emails of the groups to start from instead of those returned by
+                list_groups.
+        """
+        self._client = client
+        self._ttl = ttl
+        self._max_workers = max_workers
+        self._seeds = frozenset(groups) if groups is not None else None
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._roots = frozenset()
+        self._domains = set()
+        self._members = {}  # group -> {member: role}
+        self._parents = {}  # member -> set of groups it is a direct member of
+        self._fetched = {}  # group -> time.monotonic() its members were fetched
+        self._expires = 0.0
+        self._closures = {}
+
+    @property
+    def groups(self) -> frozenset:
+        """Emails of all groups in the graph"""
+        self._ensure_fresh()
+        with self._lock:
+            return frozenset(self._members)
+
+    def direct_members(self, group: str) -> dict:
+        """Direct members of a group
+
+        Args:
+            group (str): email of the group
+
+        Returns:
+            dict: role of each member by email, empty if the group is unknown
+        """
+        self._ensure_fresh()
+        with self._lock:
+            return dict(self._members.get(group, {}))
+
+    def effective_groups(self, member: str) -> frozenset:
+        """Groups a member belongs to directly or through nested groups
+
+        Args:
+            member (str): email of a user, service principal or group
+
+        Returns:
+            frozenset: emails of the groups
+        """
+        self._ensure_fresh()
+        return self._closure("up", member, self._parents)
+
+    def effective_members(self, group: str, include_groups: bool = False) -> frozenset:
+        """Members of a group directly or through nested groups
+
+        Args:
+            group (str): email of the group
+            include_groups (bool): also return the nested groups. Defaults to False.
+
+        Returns:
+            frozenset: emails of the members
+        """
+        self._ensure_fresh()
+        members = self._closure("down", group, self._members)
+        if include_groups:
+            return members
+        with self._lock:
+            return frozenset(member for member in members if member not in self._members)
+
+    def is_member(self, member: str, group: str) -> bool:
+        """Whether member belongs to group directly or through nested groups
+
+        Args:
+            member (str): email of a user, service principal or group
+            group (str): email of the group
+
+        Returns:
+            bool: True if member is an effective member of group
+        """
+        return group in self.effective_groups(member)
+
+    def invalidate(self, *groups: str):
+        """Have the next refresh fetch the members of groups, or of all groups if none are given
+
+        Args:
+            *groups (str): emails of the groups that changed
+        """
+        with self._lock:
+            for group in groups or list(self._fetched):
+                self._fetched.pop(group, None)
+            self._expires = 0.0
+
+    def refresh(self, force: bool = False) -> int:
+        """List the groups and fetch the members of those that are new, invalidated or expired
+
+        Args:
+            force (bool): fetch the members of every group. Defaults to False.
+
+        Returns:
+            int: number of groups whose members were fetched
+        """
+        with self._refresh_lock:
+            if force:
+                self.invalidate()
+            return self._refresh()
+
+    def _ensure_fresh(self):
+        fresh = time.monotonic() < self._expires
+        instrumentation.emit_cache_event("entitlements_graph", fresh)
+        if not fresh:
+            with self._refresh_lock:
+                # another thread may have refreshed while this one waited
+                if time.monotonic() >= self._expires:
+                    self._refresh()
+
+    def _refresh(self) -> int:
+        roots = self._seeds
+        if roots is None:
+            roots = frozenset(group["email"] for group in self._client.list_groups()["groups"])
+        with self._lock:
+            self._roots = roots
+            self._domains.update(group.partition("@")[2] for group in roots)
+            known = set(self._members) | set(roots)
+            now = time.monotonic()
+            stale = {group for group in known if now - self._fetched.get(group, -self._ttl) >= self._ttl}
+
+        fetched = 0
+        with ThreadPoolExecutor(self._max_workers, thread_name_prefix="osdu-graph") as executor:
+            while stale:
+                results = list(executor.map(self._fetch_members, stale))
+                fetched += len(stale)
+                with self._lock:
+                    stale = self._apply(results)
+
+        with self._lock:
+            self._prune()
+            self._closures.clear()
+            self._expires = min(self._fetched.values(), default=time.monotonic()) + self._ttl
+        return fetched
+
+    def _fetch_members(self, group: str) -> tuple:
+        """Members of group as {email: role}, None if the group doesn't exist"""
+        return group, members_by_email(self._client, group), time.monotonic()
+
+    def _apply(self, results: list) -> set:
+        """Store fetched members, returning newly discovered nested groups"""
+        discovered = set()
+        for group, members, fetched in results:
+            for member in self._members.pop(group, {}):
+                self._parents.get(member, set()).discard(group)
+            if members is None:
+                self._fetched.pop(group, None)
+                continue
+            self._members[group] = members
+            self._fetched[group] = fetched
+            for member in members:
+                self._parents.setdefault(member, set()).add(group)
+                if member.partition("@")[2] in self._domains and member not in self._fetched:
+                    discovered.add(member)
+        return discovered - {group for group, _, _ in results}
+
+    def _prune(self):
+        """Drop groups no longer reachable from the roots"""
+        reachable = set()
+        pending = [group for group in self._roots if group in self._members]
+        while pending:
+            group = pending.pop()
+            if group not in reachable:
+                reachable.add(group)
+                pending.extend(member for member in self._members[group] if member in self._members)
+        for group in set(self._members) - reachable:
+            for member in self._members.pop(group):
+                self._parents.get(member, set()).discard(group)
+            self._fetched.pop(group, None)
+        self._parents = {member: groups for member, groups in self._parents.items() if groups}
+
+    def _closure(self, direction: str, start: str, edges: dict) -> frozenset:
+        """Nodes reachable from start following edges, memoized until the next refresh"""
+        with self._lock:
+            key = (direction, start)
+            result = self._closures.get(key)
+            if result is None:
+                seen = set()
+                pending = list(edges.get(start, ()))
+                while pending:
+                    node = pending.pop()
+                    if node not in seen:
+                        seen.add(node)
+                        pending.extend(edges.get(node, ()))
+                result = self._closures[key] = frozenset(seen)
+            return result
@@ -0,0 +1,136 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""Reverse index of the groups each member belongs to, kept by EntitlementsClient."""
+
+import json
+import os
+import threading
+
+INDEX_VERSION = 1
+
+
+class MemberIndex:
+    """Thread safe index of the groups each member directly belongs to."""
+
+    def __init__(self):
+        """Setup an empty index, it isn't ready until replaced or loaded"""
+        self._lock = threading.Lock()
+        self._build_lock = threading.RLock()
+        self._groups = None  # group -> {member: role}
+        self._member_groups = {}  # member -> {group: role}
+        self.built = None
+        """Epoch seconds when the index was built, None if it hasn't been"""
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        del state["_build_lock"]
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._build_lock = threading.RLock()
+
+    @property
+    def ready(self) -> bool:
+        """Whether the index has been built or loaded"""
+        return self._groups is not None
+
+    @property
+    def build_lock(self) -> threading.RLock:
+        """Lock held while the index is loaded or built, so only one thread sweeps the groups"""
+        return self._build_lock
+
+    def replace(self, groups: dict, built: float):
+        """Replace the index contents
+
+        Args:
+            groups (dict): {member: role} of each group by group email
+            built (float): epoch seconds when the members were listed
+        """
+        member_groups = {}
+        for group, members in groups.items():
+            for member, role in members.items():
+                member_groups.setdefault(member, {})[group] = role
+        with self._lock:
+            self._groups = groups
+            self._member_groups = member_groups
+            self.built = built
+
+    def groups_of(self, member: str) -> dict:
+        """Groups member directly belongs to
+
+        Args:
+            member (str): email of the member
+
+        Returns:
+            dict: role by group email
+        """
+        with self._lock:
+            return dict(self._member_groups.get(member, {}))
+
+    def add(self, member: str, group: str, role: str):
+        """Record member being added to group, if the index is ready"""
+        with self._lock:
+            if self._groups is not None:
+                self._groups.setdefault(group, {})[member] = role
+                self._member_groups.setdefault(member, {})[group] = role
+
+    def remove(self, member: str, group: str):
+        """Record member being removed from group, if the index is ready"""
+        with self._lock:
+            if self._groups is not None:
+                self._groups.get(group, {}).pop(member, None)
+                self._drop_member_group(member, group)
+
+    def remove_group(self, group: str):
+        """Record group being deleted, if the index is ready"""
+        with self._lock:
+            if self._groups is not None:
+                for member in self._groups.pop(group, {}):
+                    self._drop_member_group(member, group)
+                for member in self._member_groups.pop(group, {}):
+                    self._groups.get(member, {}).pop(group, None)
+
+    def _drop_member_group(self, member: str, group: str):
+        groups = self._member_groups.get(member)
+        if groups is not None:
+            groups.pop(group, None)
+            if not groups:
+                del self._member_groups[member]
+
+    def save(self, path: str):
+        """Write the index to a json file, replacing it atomically
+
+        Args:
+            path (str): path of the file to write
+        """
+        with self._lock:
+            data = json.dumps({"version": INDEX_VERSION, "built": self.built, "groups": self._groups})
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf8") as file:
+            file.write(data)
+        os.replace(temp_path, path)
+
+    def load(self, path: str) -> bool:
+        """Replace the index contents with those saved to path
+
+        Args:
+            path (str): path of a file written by save
+
+        Returns:
+            bool: False if the file doesn't exist or was written by an incompatible version
+        """
+        try:
+            with open(path, encoding="utf8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return False
+        if data.get("version") != INDEX_VERSION:
+            return False
+        self.replace(data["groups"], data["built"])
+        return True
@@ -0,0 +1,58 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""Report of provisioning groups and their memberships from a manifest."""
+
+from typing import NamedTuple
+
+from ._bulk import BulkReport
+
+
+class ProvisionReport(NamedTuple):
+    """Outcome of provisioning groups from a manifest."""
+
+    groups: BulkReport
+    """Outcome of creating each group"""
+    members: BulkReport
+    """Outcome of adding each membership, including nested groups"""
+    skipped: list
+    """(member, group, role) memberships not attempted because a group couldn't be created"""
+    elapsed: float
+
+    @property
+    def failed(self) -> list:
+        """BulkItemResult of every call that failed"""
+        return self.groups.failed + self.members.failed
+
+    @property
+    def groups_per_s(self) -> float:
+        """Groups created per second"""
+        return self.groups.items_per_s
+
+    @property
+    def calls_per_s(self) -> float:
+        """Calls made per second over the whole provisioning"""
+        calls = len(self.groups.results) + len(self.members.results)
+        return calls / self.elapsed if self.elapsed else 0.0
+
+
+def membership_phases(groups: dict, failed_groups: set) -> tuple:
+    """Split the memberships of a manifest into those to add and those to skip
+
+    Args:
+        groups (dict): (description, {member: role}) by group email, from desired_groups
+        failed_groups (set): emails of the groups that couldn't be created
+
+    Returns:
+        tuple: (member, group, role) lists of memberships to add and to skip
+    """
+    ready, skipped = [], []
+    for group, (_, members) in groups.items():
+        for member, role in members.items():
+            if group in failed_groups or member in failed_groups:
+                skipped.append((member, group, role))
+            else:
+                ready.append((member, group, role))
+    return ready, skipped
@@ -0,0 +1,134 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""Plan the entitlements calls needed to bring groups to a desired state.
+
+A desired state document lists groups by email with an optional description and their
+members. Members are a mapping of email to role, or a list of emails with the MEMBER role:
+
+    groups:
+      data.welldb.viewers@opendes.contoso.com:
+        description: Well database viewers
+        members:
+          reconciler@contoso.com: OWNER
+          data.welldb.owners@opendes.contoso.com: MEMBER
+      data.welldb.owners@opendes.contoso.com:
+        members: [someone@contoso.com]
+"""
+
+import json
+from collections.abc import Iterable
+from typing import NamedTuple
+
+DEFAULT_ROLE = "MEMBER"
+
+PHASES = ("add_groups", "remove_members", "add_members", "delete_groups")
+"""Order the changes are applied in, each phase's calls run concurrently."""
+
+
+class ReconcilePlan(NamedTuple):
+    """Calls needed to reach the desired state, as argument tuples."""
+
+    add_groups: list
+    """(name, description) of groups to create"""
+    remove_members: list
+    """(member, group) memberships to remove, including those whose role changes"""
+    add_members: list
+    """(member, group, role) memberships to add"""
+    delete_groups: list
+    """(group,) groups to delete"""
+
+    @property
+    def changes(self) -> int:
+        """Total number of calls"""
+        return sum(len(getattr(self, phase)) for phase in PHASES)
+
+
+class ReconcileReport(NamedTuple):
+    """Outcome of a reconcile."""
+
+    plan: ReconcilePlan
+    results: dict
+    """BulkReport of each phase applied, empty for a dry run"""
+    timings: dict
+    """Seconds spent fetching the current state, planning and applying each phase"""
+
+    @property
+    def failed(self) -> list:
+        """BulkItemResult of every call that failed"""
+        return [result for report in self.results.values() for result in report.failed]
+
+
+def read_desired_state(path: str) -> dict:
+    """Read a desired state document from a json or yaml file
+
+    Args:
+        path (str): path of the file, yaml unless it ends with .json
+
+    Returns:
+        dict: the desired state
+
+    Raises:
+        ImportError: Raised if the file is yaml and PyYAML isn't installed
+    """
+    with open(path, encoding="utf8") as file:
+        if path.endswith(".json"):
+            return json.load(file)
+        try:
+            import yaml  # pylint: disable=import-outside-toplevel
+        except ImportError as ex:
+            raise ImportError("Reading yaml requires PyYAML, pip install pyyaml") from ex
+        return yaml.safe_load(file)
+
+
+def desired_groups(desired: dict) -> dict:
+    """Normalise the groups of a desired state document
+
+    Args:
+        desired (dict): desired state document
+
+    Returns:
+        dict: (description, {member: role}) by group email
+    """
+    groups = {}
+    for group, spec in (desired.get("groups") or {}).items():
+        spec = spec or {}
+        members = spec.get("members") or {}
+        if not isinstance(members, dict):
+            members = dict.fromkeys(members, DEFAULT_ROLE)
+        groups[group] = (spec.get("description"), {member: role.upper() for member, role in members.items()})
+    return groups
+
+
+def plan_reconcile(
+    current: dict, desired: dict, prune: Iterable = (), ignore_members: Iterable = ()
+) -> ReconcilePlan:
+    """Compute the calls that bring the current groups to the desired state
+
+    Args:
+        current (dict): {member: role} of each existing group by email
+        desired (dict): (description, {member: role}) by group email, from desired_groups
+        prune (Iterable): emails of existing groups to delete if they aren't desired
+        ignore_members (Iterable): members never added or removed, e.g. the caller, who
+            becomes owner of the groups it creates
+
+    Returns:
+        ReconcilePlan: calls to make
+    """
+    ignore_members = set(ignore_members)
+    plan = ReconcilePlan([], [], [], [])
+    for group, (description, members) in desired.items():
+        existing = current.get(group)
+        if existing is None:
+            plan.add_groups.append((group.partition("@")[0], description))
+            existing = {}
+        for member, role in existing.items():
+            if member not in ignore_members and members.get(member) != role:
+                plan.remove_members.append((member, group))
+        for member, role in members.items():
+            if member not in ignore_members and existing.get(member) != role:
+                plan.add_members.append((member, group, role))
+    plan.delete_groups.extend((group,) for group in sorted(set(prune) - set(desired)))
+    return plan
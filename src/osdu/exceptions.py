@@ -0,0 +1,14 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""Exceptions raised by the OSDU SDK."""
+
+
+class DeadlineExceededError(TimeoutError):
+    """The time budget for an operation ran out before it completed."""
+
+    def __init__(self, message: str = "Deadline exceeded"):
+        self.message = "Deadline exceeded" if message is None else str(message)
+        super().__init__(self.message)
@@ -0,0 +1,311 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""Request hedging for idempotent calls.
+
+A hedged request is sent a second time if the first attempt hasn't answered within a
+delay derived from recently observed latencies. Both attempts are sent from bounded thread
+pools so the caller can return as soon as either answers. The first successful response is
+used, an error or throttling response only if both attempts fail.
+"""
+
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEDGE_POST_PATHS = ("/query",)
+"""Search queries without a cursor, query_with_cursor moves the server side scroll state"""
+
+
+class HedgingPolicy:  # pylint: disable=too-many-instance-attributes
+    """Policy controlling when a duplicate (hedged) request is sent.
+
+    The hedge delay is the configured percentile of the latencies observed in a sliding
+    window. The number of hedges is capped by a budget that grows by max_hedge_ratio for
+    every request, so at most that fraction of requests send a duplicate over time.
+
+    A policy is thread safe and can be shared between clients.
+    """
+
+    @property
+    def percentile(self) -> float:
+        """Latency percentile used as hedge delay
+
+        Returns:
+            float: percentile (0-100)
+        """
+        return self._percentile
+
+    @property
+    def max_hedge_ratio(self) -> float:
+        """Maximum fraction of requests that may be hedged
+
+        Returns:
+            float: maximum hedge ratio
+        """
+        return self._max_hedge_ratio
+
+    @property
+    def requests(self) -> int:
+        """Number of requests executed through the policy
+
+        Returns:
+            int: number of requests
+        """
+        return self._requests
+
+    @property
+    def hedges(self) -> int:
+        """Number of hedged (duplicate) requests sent
+
+        Returns:
+            int: number of hedges
+        """
+        return self._hedges
+
+    @property
+    def hedge_wins(self) -> int:
+        """Number of times the hedged request answered first
+
+        Returns:
+            int: number of hedge wins
+        """
+        return self._hedge_wins
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        max_hedge_ratio: float = 0.1,
+        initial_delay: float = 0.1,
+        min_delay: float = 0.005,
+        window: int = 1000,
+        min_samples: int = 20,
+        max_workers: int = 16,
+        max_attempts: int = 20,
+        hedge_post_paths: tuple = DEFAULT_HEDGE_POST_PATHS,
+    ):
+        """Setup the hedging policy
+
+        Args:
+            percentile (float): latency percentile used as hedge delay. Defaults to 95.
+            max_hedge_ratio (float): maximum fraction of requests that may be hedged.
+                Defaults to 0.1.
+            initial_delay (float): hedge delay in seconds until min_samples latencies
+                have been observed. Defaults to 0.1.
+            min_delay (float): lower bound for the hedge delay in seconds. Defaults to 0.005.
+            window (int): number of recent latencies to base the delay on. Defaults to 1000.
+            min_samples (int): number of latencies needed before using the percentile.
+                Defaults to 20.
+            max_workers (int): maximum number of concurrent hedged attempts, no hedge is sent
+                while all are busy. Defaults to 16.
+            max_attempts (int): maximum number of concurrent first attempts sent from pool
+                threads, further calls are sent on the calling thread without hedging. Defaults
+                to 20, twice the connections OsduClient pools per host by default, as more
+                concurrent attempts would only open connections the pool then discards.
+            hedge_post_paths (tuple): url path endings of idempotent POST requests that may
+                be hedged. Defaults to the search query endpoints.
+
+        Raises:
+            ValueError: Raised if percentile or max_hedge_ratio are out of range
+        """
+        if not 0 < percentile <= 100:
+            raise ValueError("percentile should be between 0 and 100")
+        if not 0 <= max_hedge_ratio <= 1:
+            raise ValueError("max_hedge_ratio should be between 0 and 1")
+
+        self._percentile = percentile
+        self._max_hedge_ratio = max_hedge_ratio
+        self._initial_delay = initial_delay
+        self._min_delay = min_delay
+        self._min_samples = min_samples
+        self._max_workers = max_workers
+        self._max_attempts = max_attempts
+        self._hedge_post_paths = tuple(hedge_post_paths)
+
+        self._latencies = deque(maxlen=window)
+        self._budget = 0.0
+        self._requests = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+        self._reset_after_fork()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        del state["_executor"]
+        del state["_attempt_executor"]
+        del state["_hedge_slots"]
+        del state["_attempt_slots"]
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._reset_after_fork()
+
+    def _reset_after_fork(self):
+        """Replace the lock, executors and their free slots, a forked child has neither their
+        threads nor any thread holding the lock"""
+        self._lock = threading.Lock()
+        self._executor = None
+        self._attempt_executor = None
+        self._hedge_slots = threading.BoundedSemaphore(self._max_workers)
+        self._attempt_slots = threading.BoundedSemaphore(self._max_attempts)
+        self._pid = os.getpid()
+
+    def should_hedge(self, method: str, url: str) -> bool:
+        """Whether a request is idempotent and so may be hedged
+
+        Args:
+            method (str): http method
+            url (str): request url
+
+        Returns:
+            bool: True if the request may be hedged
+        """
+        if method == "GET":
+            return True
+        if method == "POST":
+            return urlparse(url).path.rstrip("/").endswith(self._hedge_post_paths)
+        return False
+
+    def delay(self) -> float:
+        """Current hedge delay, based upon recently observed latencies
+
+        Returns:
+            float: delay in seconds before a hedge is sent
+        """
+        with self._lock:
+            if len(self._latencies) < self._min_samples:
+                return max(self._initial_delay, self._min_delay)
+            latencies = sorted(self._latencies)
+        index = min(len(latencies) - 1, int(len(latencies) * self._percentile / 100))
+        return max(latencies[index], self._min_delay)
+
+    def record_latency(self, seconds: float):
+        """Record the latency of a single attempt
+
+        Args:
+            seconds (float): attempt latency in seconds
+        """
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def execute(self, send: Callable):
+        """Execute send, hedging it with a duplicate call if it is slow to answer.
+
+        Both attempts run on pool threads so the caller can return as soon as either
+        succeeds. The response that loses the race is closed once it finishes. While
+        max_attempts calls are in flight send is called on the calling thread without
+        hedging, and no hedge is sent while max_workers hedges are.
+
+        Args:
+            send (Callable): function performing the request and returning the response
+
+        Returns:
+            The first successful result, otherwise the result of the first attempt
+
+        Raises:
+            Exception: Any exception raised by the first attempt if no attempt succeeded
+        """
+        if self._pid != os.getpid():
+            self._reset_after_fork()
+        with self._lock:
+            self._requests += 1
+            self._budget = min(self._budget + self._max_hedge_ratio, 1.0 + self._max_hedge_ratio)
+
+        if not self._attempt_slots.acquire(blocking=False):  # pylint: disable=consider-using-with
+            # every attempt thread is busy, don't queue behind them
+            return self._timed(send)
+        first = self._submit(self._get_attempt_executor(), self._attempt_slots, send)
+        done, _ = wait([first], timeout=self.delay())
+        if done or not self._take_hedge():
+            return first.result()
+
+        logger.debug("Sending hedged request")
+        hedge = self._submit(self._get_executor(), self._hedge_slots, send)
+        pending = {first, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in (first, hedge):
+                if future in done and future.exception() is None and _succeeded(future.result()):
+                    if future is hedge:
+                        with self._lock:
+                            self._hedge_wins += 1
+                    loser = first if future is hedge else hedge
+                    loser.add_done_callback(_close_result)
+                    return future.result()
+        # neither attempt succeeded so report the original outcome
+        hedge.add_done_callback(_close_result)
+        return first.result()
+
+    def _take_hedge(self) -> bool:
+        """Take a hedge from the budget and a free hedge thread, a hedge that would wait for a
+        thread is skipped"""
+        if not self._hedge_slots.acquire(blocking=False):  # pylint: disable=consider-using-with
+            return False
+        with self._lock:
+            if self._budget >= 1.0:
+                self._budget -= 1.0
+                self._hedges += 1
+                return True
+        self._hedge_slots.release()
+        return False
+
+    def _submit(self, executor: ThreadPoolExecutor, slots: threading.BoundedSemaphore, send: Callable) -> Future:
+        """Send on a pool thread, freeing the slot taken for it once it finishes"""
+        future = executor.submit(contextvars.copy_context().run, self._timed, send)
+        future.add_done_callback(lambda _: slots.release())
+        return future
+
+    def _timed(self, send: Callable):
+        start = time.perf_counter()
+        result = send()
+        self.record_latency(time.perf_counter() - start)
+        return result
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self._max_workers, thread_name_prefix="osdu-hedge"
+                    )
+        return self._executor
+
+    def _get_attempt_executor(self) -> ThreadPoolExecutor:
+        """Pool for first attempts, separate from the hedges so callers aren't limited to
+        max_workers"""
+        if self._attempt_executor is None:
+            with self._lock:
+                if self._attempt_executor is None:
+                    self._attempt_executor = ThreadPoolExecutor(
+                        max_workers=self._max_attempts, thread_name_prefix="osdu-attempt"
+                    )
+        return self._attempt_executor
+
+
+def _succeeded(result) -> bool:
+    """Whether a result can win the race, server errors and throttling can't"""
+    status_code = getattr(result, "status_code", None)
+    return status_code is None or not (status_code == 429 or status_code >= 500)
+
+
+def _close(result):
+    if hasattr(result, "close"):
+        result.close()
+
+
+def _close_result(future):
+    """Release the connection of a response nobody is going to read."""
+    if future.exception() is None:
+        _close(future.result())
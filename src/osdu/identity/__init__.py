@@ -3,19 +3,37 @@
 # Licensed under the MIT License. See License.txt in the project root for
 # license information.
 # -----------------------------------------------------------------------------
-# pylint: disable=C0114
-from ._credential import (
-    OsduBaseCredential,
-    OsduEnvironmentCredential,
-    OsduMsalInteractiveCredential,
-    OsduMsalNonInteractiveCredential,
-    OsduTokenCredential,
-)
+"""Credentials for authenticating with OSDU, imported on first use."""
+
+from typing import TYPE_CHECKING
+
+from . import _credential
+
+if TYPE_CHECKING:
+    from ._credential import (
+        OsduBaseCredential,
+        OsduEnvironmentCredential,
+        OsduMsalInteractiveCredential,
+        OsduMsalNonInteractiveCredential,
+        OsduTokenCredential,
+    )
 
 __all__ = [
     "OsduBaseCredential",
     "OsduEnvironmentCredential",
     "OsduTokenCredential",
     "OsduMsalInteractiveCredential",
-    "OsduMsalNonInteractiveCredential"
+    "OsduMsalNonInteractiveCredential",
 ]
+
+
+def __getattr__(name: str):
+    if name not in __all__:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(_credential, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(__all__))
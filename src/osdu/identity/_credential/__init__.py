@@ -3,17 +3,43 @@
 # Licensed under the MIT License. See License.txt in the project root for
 # license information.
 # -----------------------------------------------------------------------------
-# pylint: disable=C0114
-from .base import OsduBaseCredential
-from .environment import OsduEnvironmentCredential
-from .msal_interactive import OsduMsalInteractiveCredential
-from .msal_non_interactive import OsduMsalNonInteractiveCredential
-from .token import OsduTokenCredential
+"""Credential classes, each imported on first use so msal is only loaded by the msal credentials."""
+
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .base import OsduBaseCredential
+    from .environment import OsduEnvironmentCredential
+    from .msal_interactive import OsduMsalInteractiveCredential
+    from .msal_non_interactive import OsduMsalNonInteractiveCredential
+    from .token import OsduTokenCredential
+
+_MODULES = {
+    "OsduBaseCredential": ".base",
+    "OsduEnvironmentCredential": ".environment",
+    "OsduTokenCredential": ".token",
+    "OsduMsalInteractiveCredential": ".msal_interactive",
+    "OsduMsalNonInteractiveCredential": ".msal_non_interactive",
+}
 
 __all__ = [
     "OsduBaseCredential",
     "OsduEnvironmentCredential",
     "OsduTokenCredential",
     "OsduMsalInteractiveCredential",
-    "OsduMsalNonInteractiveCredential"
+    "OsduMsalNonInteractiveCredential",
 ]
+
+
+def __getattr__(name: str):
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(__all__))
@@ -5,8 +5,11 @@
 # -----------------------------------------------------------------------------
 """Base credential for authentication with OSDU."""
 
+import time
 from abc import ABC, abstractmethod
 
+from osdu import instrumentation
+
 
 # pylint: disable=too-few-public-methods
 class OsduBaseCredential(ABC):
@@ -17,3 +20,17 @@ class OsduBaseCredential(ABC):
     @abstractmethod
     def get_token(self, **kwargs) -> str:
         """Get access token, trying to refresh if needed."""
+
+    def _emit_token_event(self, start: float, cache_hit: bool):
+        """Emit a TokenEvent if there are instrumentation listeners.
+
+        Args:
+            start (float): time.perf_counter() when getting the token started
+            cache_hit (bool): whether a cached token was used
+        """
+        if instrumentation.has_listeners():
+            instrumentation.emit(
+                instrumentation.TokenEvent(
+                    type(self).__name__, time.perf_counter() - start, cache_hit
+                )
+            )
@@ -12,7 +12,6 @@ from osdu.identity.consts import EnvironmentVariables
 from osdu.identity.exceptions import CredentialUnavailableError
 
 from .base import OsduBaseCredential
-from .msal_interactive import OsduMsalInteractiveCredential
 from .token import OsduTokenCredential
 
 _logger = logging.getLogger(__name__)
@@ -68,6 +67,11 @@ class OsduEnvironmentCredential(OsduBaseCredential):
             os.environ.get(self._expand_environment_name(v)) is not None
             for v in EnvironmentVariables.MSAL_INTERACTIVE_VARS
         ):
+            # imported here so msal is only loaded when it is used
+            from .msal_interactive import (  # pylint: disable=import-outside-toplevel
+                OsduMsalInteractiveCredential,
+            )
+
             self._credential = OsduMsalInteractiveCredential(
                 client_id=os.environ[self._expand_environment_name(EnvironmentVariables.CLIENT_ID)],
                 authority=os.environ[self._expand_environment_name(EnvironmentVariables.AUTHORITY)],
@@ -7,6 +7,7 @@
 
 import logging
 import os
+import time
 
 import msal
 
@@ -78,7 +79,9 @@ class OsduMsalInteractiveCredential(OsduBaseCredential):
         Check expiration date and return access_token.
         """
         # if datetime.now().timestamp() > self.__access_token_expire_date:
-        self.refresh_access_token()
+        start = time.perf_counter()
+        result = self.refresh_access_token()
+        self._emit_token_event(start, result.get("token_source") == "cache")
         return self.__access_token
 
     def _refresh_access_token(self) -> dict:
@@ -6,15 +6,37 @@
 """Base client for authentication and communicating with OSDU."""
 
 import logging
+import os
+import threading
+import time
+import weakref
+from collections.abc import Callable
 
-from msal import ConfidentialClientApplication
+from msal import ConfidentialClientApplication, SerializableTokenCache, TokenCache
 from .base import OsduBaseCredential
 
 logger = logging.getLogger(__name__)
 
+_CREDENTIAL_TYPES = (
+    TokenCache.CredentialType.ACCESS_TOKEN,
+    TokenCache.CredentialType.REFRESH_TOKEN,
+    TokenCache.CredentialType.ID_TOKEN,
+    TokenCache.CredentialType.ACCOUNT,
+    TokenCache.CredentialType.APP_METADATA,
+)
+
+_credentials = weakref.WeakSet()
+_credentials_lock = threading.Lock()
+
 
 class OsduMsalNonInteractiveCredential(OsduBaseCredential):
-    """Get token based client for connecting with OSDU."""
+    """Get token based client for connecting with OSDU.
+
+    When pickled, or used in a forked child process, the msal client is recreated by
+    client_factory with a token cache holding the tokens of the original client. Without a
+    client_factory it is built from the client id, secret and authority, so other msal options
+    of a given client are lost, which is logged as a warning.
+    """
 
     @property
     def client_id(self) -> str:
@@ -59,33 +81,85 @@ class OsduMsalNonInteractiveCredential(OsduBaseCredential):
         Returns:
             ConfidentialClientApplication: object
         """
-        return self._msal_confidential_client
+        return self._get_client()
 
     def __init__(self,
                  client_id: str,
                  client_secret: str,
                  authority: str,
                  scopes: str,
-                 client: ConfidentialClientApplication):
+                 client: ConfidentialClientApplication,
+                 client_factory: Callable = None):
         """Setup the new client
 
         Args:
             client_id (str): client id for connecting
             authority (str): authority url
             scopes (str): scopes to request
+            client_factory (Callable): called with a token cache to recreate the msal client
+                after pickling or forking, must be picklable to pickle the credential
+                (default None - build it from client id, secret and authority)
         """
         super().__init__()
         self._msal_confidential_client = client
+        self._client_factory = client_factory
+        self._custom_client = client is not None
         self._client_id = client_id
         self._client_secret = client_secret
         self._authority = authority
         self._scopes = scopes
+        self._token_cache_state = None
+        self._pid = os.getpid()
+        _track(self)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        # the msal client holds locks and an http session, keep just its tokens
+        client = state.pop("_msal_confidential_client")
+        if client is not None:
+            state["_token_cache_state"] = _cache_state(client.token_cache)
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._msal_confidential_client = None
+        self._pid = os.getpid()
+        _track(self)
+
+    def _get_client(self) -> ConfidentialClientApplication:
+        """The msal client, recreated if this is a forked child process or was unpickled."""
+        if self._pid != os.getpid():
+            # the token cache state was saved before forking, a parent thread may have held
+            # the cache lock so it isn't taken here
+            self._msal_confidential_client = None
+            self._pid = os.getpid()
+        if self._msal_confidential_client is None:
+            cache = SerializableTokenCache()
+            cache.deserialize(self._token_cache_state)
+            self._token_cache_state = None
+            if self._client_factory is not None:
+                self._msal_confidential_client = self._client_factory(cache)
+            else:
+                if self._custom_client:
+                    logger.warning(
+                        "Recreating the msal client from client id, secret and authority, other options "
+                        "of the given client are dropped, pass client_factory to keep them"
+                    )
+                self._msal_confidential_client = ConfidentialClientApplication(
+                    self._client_id,
+                    client_credential=self._client_secret,
+                    authority=self._authority,
+                    token_cache=cache,
+                )
+        return self._msal_confidential_client
 
     def get_token(self, **kwargs) -> str:   # pylint: disable=inconsistent-return-statements
         """
         return access_token.
         """
+        start = time.perf_counter()
         token = self._get_token()
+        self._emit_token_event(start, token.get("token_source") == "cache")
         if 'access_token' in token:
             return token['access_token']
 
@@ -95,7 +169,44 @@ class OsduMsalNonInteractiveCredential(OsduBaseCredential):
          Returns:
             dict: Dictionary representing the returned token
         """
-        result = self._msal_confidential_client.acquire_token_silent([self._scopes], account=None)
+        client = self._get_client()
+        result = client.acquire_token_silent([self._scopes], account=None)
         if result:
             return result
-        return self._msal_confidential_client.acquire_token_for_client([self._scopes])
+        return client.acquire_token_for_client([self._scopes])
+
+    def _before_fork(self):
+        """Save the token cache state for the child process while no other thread can hold the
+        cache lock in the child"""
+        client = self._msal_confidential_client
+        if client is not None:
+            self._token_cache_state = _cache_state(client.token_cache)
+
+
+def _track(credential: OsduMsalNonInteractiveCredential):
+    """Save the credential's token cache state before the process forks, for as long as the
+    credential exists"""
+    with _credentials_lock:
+        _credentials.add(credential)
+
+
+def _before_fork():
+    with _credentials_lock:
+        credentials = list(_credentials)
+    for credential in credentials:
+        credential._before_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(before=_before_fork)
+
+
+def _cache_state(cache: TokenCache) -> str:
+    """Serialized contents of an msal token cache of any type"""
+    if isinstance(cache, SerializableTokenCache):
+        return cache.serialize()
+    copy = SerializableTokenCache()
+    for credential_type in _CREDENTIAL_TYPES:
+        for entry in list(cache.search(credential_type)):
+            copy.modify(credential_type, entry, entry)
+    return copy.serialize()
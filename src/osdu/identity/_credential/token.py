@@ -6,7 +6,7 @@
 """Base client for authentication and communicating with OSDU."""
 
 import logging
-from datetime import datetime
+import time
 from json import loads
 from urllib.error import HTTPError
 from urllib.parse import urlencode
@@ -85,8 +85,11 @@ class OsduTokenCredential(OsduBaseCredential):
         """
         Check expiration date and return access_token.
         """
-        if datetime.now().timestamp() > self.__access_token_expire_date:
+        start = time.perf_counter()
+        cache_hit = time.time() <= self.__access_token_expire_date
+        if not cache_hit:
             self.refresh_access_token()
+        self._emit_token_event(start, cache_hit)
         return self.__access_token
 
     def _refresh_access_token(self) -> dict:
@@ -134,7 +137,7 @@ class OsduTokenCredential(OsduBaseCredential):
         if "access_token" in result:
             # self.__id_token = result["id_token"]
             self.__access_token = result["access_token"]
-            self.__access_token_expire_date = datetime.now().timestamp() + result["expires_in"]
+            self.__access_token_expire_date = time.time() + result["expires_in"]
 
             # logger.info("Token is refreshed.")
         else:
@@ -0,0 +1,393 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""Instrumentation hooks for OsduClient and the credentials.
+
+Register a listener to receive events as requests are made, tokens acquired and caches used:
+
+    aggregator = HistogramAggregator()
+    add_listener(aggregator)
+    ...
+    print(aggregator.snapshot())
+
+Events are only created when at least one listener is registered, so instrumentation costs
+next to nothing when it isn't used. Listeners are called synchronously on the thread making
+the request so should be quick, exceptions raised by listeners are logged and ignored.
+"""
+
+import bisect
+import logging
+import threading
+from collections.abc import Callable
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+
+class RequestStartEvent(NamedTuple):
+    """An http request attempt is about to be sent"""
+
+    method: str
+    url: str
+    service: str
+    endpoint: str
+    attempt: int
+
+
+class RequestEndEvent(NamedTuple):
+    """An http request attempt completed, successfully or not"""
+
+    method: str
+    url: str
+    service: str
+    endpoint: str
+    attempt: int
+    status_code: int
+    """Http status code, None if no response was received"""
+    latency: float
+    """Latency in seconds"""
+    bytes_sent: int
+    bytes_received: int
+    error: BaseException = None
+    timings: "PhaseTimings" = None
+    """Phase breakdown if the client records phases and a response was received"""
+
+
+class PhaseTimings(NamedTuple):
+    """Time in seconds spent in each phase of a request, see OsduClient record_phases
+
+    dns, connect and tls are 0 when an existing connection was reused.
+    """
+
+    dns: float
+    connect: float
+    tls: float
+    ttfb: float
+    """Time from the connection being ready until the response headers were received"""
+    transfer: float
+    """Time to receive the response body"""
+    total: float
+    connection_reused: bool
+
+
+PHASES = ("dns", "connect", "tls", "ttfb", "transfer")
+"""Names of the request phases in PhaseTimings"""
+
+
+class TokenEvent(NamedTuple):
+    """A credential returned an access token"""
+
+    credential: str
+    """Name of the credential class"""
+    duration: float
+    """Time taken in seconds"""
+    cache_hit: bool
+    """True if a cached token was used, False if it was acquired or refreshed"""
+
+
+class CacheEvent(NamedTuple):
+    """A cache was looked up"""
+
+    cache: str
+    """Name of the cache"""
+    hit: bool
+
+
+_listeners = ()
+_listeners_lock = threading.Lock()
+
+
+def add_listener(listener: Callable):
+    """Register a listener to be called with every event
+
+    Args:
+        listener (Callable): function taking a single event argument
+    """
+    global _listeners  # pylint: disable=global-statement
+    with _listeners_lock:
+        _listeners = _listeners + (listener,)
+
+
+def remove_listener(listener: Callable):
+    """Unregister a listener
+
+    Args:
+        listener (Callable): previously registered listener
+    """
+    global _listeners  # pylint: disable=global-statement
+    with _listeners_lock:
+        _listeners = tuple(existing for existing in _listeners if existing is not listener)
+
+
+def has_listeners() -> bool:
+    """Whether any listeners are registered, check this before creating events
+
+    Returns:
+        bool: True if there are listeners
+    """
+    return bool(_listeners)
+
+
+def emit(event: NamedTuple):
+    """Send an event to all registered listeners
+
+    Args:
+        event (NamedTuple): the event
+    """
+    for listener in _listeners:
+        try:
+            listener(event)
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.exception("Instrumentation listener %r failed", listener)
+
+
+def emit_cache_event(cache: str, hit: bool):
+    """Emit a CacheEvent if there are listeners
+
+    Args:
+        cache (str): name of the cache
+        hit (bool): whether the lookup was a hit
+    """
+    if _listeners:
+        emit(CacheEvent(cache, hit))
+
+
+# region histograms
+
+DEFAULT_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+"""Default histogram bucket upper bounds in seconds."""
+
+
+class Histogram:
+    """A fixed bucket histogram, counts[i] is the number of values <= buckets[i].
+
+    The last count is for values greater than the largest bucket. Not thread safe.
+    """
+
+    @property
+    def buckets(self) -> tuple:
+        """Bucket upper bounds
+
+        Returns:
+            tuple: bucket upper bounds
+        """
+        return self._buckets
+
+    @property
+    def counts(self) -> list:
+        """Number of values in each bucket, not cumulative
+
+        Returns:
+            list: counts per bucket plus one for values above the largest bucket
+        """
+        return self._counts
+
+    @property
+    def count(self) -> int:
+        """Total number of values
+
+        Returns:
+            int: number of values
+        """
+        return self._count
+
+    @property
+    def sum(self) -> float:
+        """Sum of all values
+
+        Returns:
+            float: sum of the values
+        """
+        return self._sum
+
+    def __init__(self, buckets: tuple = DEFAULT_LATENCY_BUCKETS):
+        """Setup the histogram
+
+        Args:
+            buckets (tuple): sorted bucket upper bounds
+        """
+        self._buckets = tuple(buckets)
+        self._counts = [0] * (len(self._buckets) + 1)
+        self._count = 0
+        self._sum = 0.0
+
+    def observe(self, value: float):
+        """Add a value
+
+        Args:
+            value (float): value to add
+        """
+        self._counts[bisect.bisect_left(self._buckets, value)] += 1
+        self._count += 1
+        self._sum += value
+
+    def percentile(self, pct: float) -> float:
+        """Estimate a percentile as the upper bound of the bucket it falls in
+
+        Args:
+            pct (float): percentile (0-100)
+
+        Returns:
+            float: estimated value, None if empty or above the largest bucket
+        """
+        if not self._count:
+            return None
+        rank = self._count * pct / 100
+        cumulative = 0
+        for index, bucket_count in enumerate(self._counts[:-1]):
+            cumulative += bucket_count
+            if cumulative >= rank:
+                return self._buckets[index]
+        return None
+
+    def to_dict(self) -> dict:
+        """Summary of the histogram
+
+        Returns:
+            dict: count, sum, mean, p50, p90, p99 and buckets
+        """
+        return {
+            "count": self._count,
+            "sum": self._sum,
+            "mean": self._sum / self._count if self._count else None,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "buckets": dict(zip([*self._buckets, "+Inf"], self._counts)),
+        }
+
+
+class _EndpointStats:
+    """Aggregated request statistics for a single service endpoint."""
+
+    def __init__(self, buckets: tuple):
+        self.latency = Histogram(buckets)
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.retries = 0
+        self.errors = 0
+        self.status_codes = {}
+        self.phases = {phase: Histogram(buckets) for phase in PHASES}
+        self.connections_reused = 0
+        self.connections_new = 0
+
+    def add_timings(self, timings: PhaseTimings):
+        for phase in PHASES:
+            self.phases[phase].observe(getattr(timings, phase))
+        if timings.connection_reused:
+            self.connections_reused += 1
+        else:
+            self.connections_new += 1
+
+    def to_dict(self) -> dict:
+        result = {
+            "latency": self.latency.to_dict(),
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "retries": self.retries,
+            "errors": self.errors,
+            "status_codes": dict(self.status_codes),
+        }
+        if self.connections_reused or self.connections_new:
+            result["phases"] = {phase: histogram.to_dict() for phase, histogram in self.phases.items()}
+            result["connections_reused"] = self.connections_reused
+            result["connections_new"] = self.connections_new
+        return result
+
+
+class HistogramAggregator:
+    """Listener aggregating events into histograms per service and endpoint.
+
+    Register with add_listener(), then call snapshot() for the statistics so far.
+    """
+
+    def __init__(self, buckets: tuple = DEFAULT_LATENCY_BUCKETS):
+        """Setup the aggregator
+
+        Args:
+            buckets (tuple): latency bucket upper bounds in seconds
+        """
+        self._buckets = buckets
+        self._lock = threading.Lock()
+        self._requests = {}
+        self._tokens = {}
+        self._caches = {}
+
+    def __call__(self, event: NamedTuple):
+        """Aggregate an event
+
+        Args:
+            event (NamedTuple): the event
+        """
+        with self._lock:
+            if isinstance(event, RequestEndEvent):
+                self._add_request(event)
+            elif isinstance(event, TokenEvent):
+                stats = self._tokens.get(event.credential)
+                if stats is None:
+                    stats = self._tokens[event.credential] = {
+                        "duration": Histogram(self._buckets), "cache_hits": 0, "cache_misses": 0
+                    }
+                stats["duration"].observe(event.duration)
+                stats["cache_hits" if event.cache_hit else "cache_misses"] += 1
+            elif isinstance(event, CacheEvent):
+                hits, misses = self._caches.get(event.cache, (0, 0))
+                self._caches[event.cache] = (hits + 1, misses) if event.hit else (hits, misses + 1)
+
+    def _add_request(self, event: RequestEndEvent):
+        key = (event.service, event.endpoint)
+        stats = self._requests.get(key)
+        if stats is None:
+            stats = self._requests[key] = _EndpointStats(self._buckets)
+        stats.latency.observe(event.latency)
+        stats.bytes_sent += event.bytes_sent
+        stats.bytes_received += event.bytes_received
+        if event.attempt > 0:
+            stats.retries += 1
+        if event.error is not None:
+            stats.errors += 1
+        else:
+            stats.status_codes[event.status_code] = stats.status_codes.get(event.status_code, 0) + 1
+        if event.timings is not None:
+            stats.add_timings(event.timings)
+
+    def snapshot(self) -> dict:
+        """Get the aggregated statistics
+
+        Returns:
+            dict: statistics for requests by service and endpoint, tokens by credential and
+            caches by name
+        """
+        with self._lock:
+            requests = {}
+            for (service, endpoint), stats in self._requests.items():
+                requests.setdefault(service, {})[endpoint] = stats.to_dict()
+            return {
+                "requests": requests,
+                "tokens": {
+                    credential: {
+                        "duration": stats["duration"].to_dict(),
+                        "cache_hits": stats["cache_hits"],
+                        "cache_misses": stats["cache_misses"],
+                    }
+                    for credential, stats in self._tokens.items()
+                },
+                "caches": {
+                    cache: {"hits": hits, "misses": misses}
+                    for cache, (hits, misses) in self._caches.items()
+                },
+            }
+
+    def reset(self):
+        """Clear all aggregated statistics"""
+        with self._lock:
+            self._requests.clear()
+            self._tokens.clear()
+            self._caches.clear()
+
+
+# endregion histograms
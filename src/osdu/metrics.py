@@ -0,0 +1,379 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""Prometheus style metrics for OsduClient requests, tokens and caches.
+
+MetricsRegistry is an instrumentation listener, register it to start collecting:
+
+    registry = MetricsRegistry()
+    instrumentation.add_listener(registry)
+    registry.start_http_server(9464)  # optional, or use registry.snapshot()
+
+Metrics:
+    osdu_requests_total{service,endpoint,method,status}
+        Counter of request attempts, status is the http status code or "error" if no
+        response was received.
+    osdu_request_duration_seconds{service,endpoint}
+        Histogram of request attempt latency.
+    osdu_request_retries_total{service,endpoint}
+        Counter of request attempts that were retries.
+    osdu_request_sent_bytes_total{service,endpoint}
+        Counter of request body bytes sent.
+    osdu_request_received_bytes_total{service,endpoint}
+        Counter of response body bytes received.
+    osdu_request_phase_seconds{service,endpoint,phase}
+        Histogram of time spent per request phase (dns, connect, tls, ttfb or transfer), only
+        for clients created with record_phases=True.
+    osdu_request_connections_total{service,endpoint,reused}
+        Counter of requests by whether a pooled connection was reused ("true" or "false"),
+        only for clients created with record_phases=True.
+    osdu_token_requests_total{credential,result}
+        Counter of access token requests, result is "cache_hit" or "refresh".
+    osdu_token_duration_seconds{credential}
+        Histogram of time taken to get an access token.
+    osdu_cache_lookups_total{cache,result}
+        Counter of cache lookups, result is "hit" or "miss". The hit ratio of a cache is
+        hit / (hit + miss).
+
+Endpoints have resource identifiers replaced by {id} to keep the number of series bounded.
+Updates are recorded in per thread shards so the request path never waits on a lock, reads
+sum the shards.
+"""
+
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import NamedTuple
+
+from osdu.instrumentation import (
+    DEFAULT_LATENCY_BUCKETS,
+    PHASES,
+    CacheEvent,
+    PhaseTimings,
+    RequestEndEvent,
+    TokenEvent,
+)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _ShardedValues:
+    """Numeric values keyed by label tuple, each thread updating its own shard without locking.
+
+    Shards of threads that have finished are folded into a base total when a shard is added
+    or the values are read, so short lived threads don't grow the list of shards.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []  # (thread, shard)
+        self._base = {}
+        self._lock = threading.Lock()
+
+    def add(self, key: tuple, amount: float):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._fold_finished()
+                self._shards.append((threading.current_thread(), shard))
+        shard[key] = shard.get(key, 0) + amount
+
+    def totals(self) -> dict:
+        with self._lock:
+            self._fold_finished()
+            totals = dict(self._base)
+            shards = [shard for _, shard in self._shards]
+        for shard in shards:
+            for key, value in shard.copy().items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def _fold_finished(self):
+        """Add the shards of finished threads to the base total, called holding the lock"""
+        running = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                running.append((thread, shard))
+                continue
+            for key, value in shard.items():
+                self._base[key] = self._base.get(key, 0) + value
+        self._shards = running
+
+
+class Counter:
+    """A monotonically increasing counter with labels."""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple):
+        """Setup the counter
+
+        Args:
+            name (str): metric name
+            documentation (str): help text
+            labelnames (tuple): names of the labels
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = _ShardedValues()
+
+    def inc(self, labels: tuple, amount: float = 1):
+        """Increment the counter
+
+        Args:
+            labels (tuple): label values in the order of labelnames
+            amount (float): amount to add. Defaults to 1.
+        """
+        self._values.add(labels, amount)
+
+    def collect(self) -> list:
+        """Current values
+
+        Returns:
+            list: dicts with labels and value
+        """
+        return [
+            {"labels": dict(zip(self.labelnames, labels)), "value": value}
+            for labels, value in sorted(self._values.totals().items())
+        ]
+
+
+class Histogram:
+    """A fixed bucket histogram with labels."""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple,
+        buckets: tuple = DEFAULT_LATENCY_BUCKETS,
+    ):
+        """Setup the histogram
+
+        Args:
+            name (str): metric name
+            documentation (str): help text
+            labelnames (tuple): names of the labels
+            buckets (tuple): sorted bucket upper bounds
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._values = _ShardedValues()
+
+    def observe(self, labels: tuple, value: float):
+        """Add a value
+
+        Args:
+            labels (tuple): label values in the order of labelnames
+            value (float): value to add
+        """
+        self._values.add((labels, bisect.bisect_left(self.buckets, value)), 1)
+        self._values.add((labels, "sum"), value)
+
+    def collect(self) -> list:
+        """Current values
+
+        Returns:
+            list: dicts with labels, count, sum and cumulative bucket counts
+        """
+        series = {}
+        for (labels, key), value in self._values.totals().items():
+            item = series.get(labels)
+            if item is None:
+                item = series[labels] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0}
+            if key == "sum":
+                item["sum"] = value
+            else:
+                item["counts"][key] = value
+
+        samples = []
+        for labels, item in sorted(series.items()):
+            cumulative, buckets = 0, {}
+            for bucket, count in zip([*self.buckets, "+Inf"], item["counts"]):
+                cumulative += count
+                buckets[bucket] = cumulative
+            samples.append(
+                {
+                    "labels": dict(zip(self.labelnames, labels)),
+                    "count": cumulative,
+                    "sum": item["sum"],
+                    "buckets": buckets,
+                }
+            )
+        return samples
+
+
+class MetricsRegistry:
+    """Instrumentation listener maintaining the SDK metrics.
+
+    Register with instrumentation.add_listener(), then read with snapshot() or
+    render_prometheus(), or serve them with start_http_server().
+    """
+
+    def __init__(self, buckets: tuple = DEFAULT_LATENCY_BUCKETS):
+        """Setup the registry
+
+        Args:
+            buckets (tuple): latency bucket upper bounds in seconds
+        """
+        endpoint = ("service", "endpoint")
+        self.requests = Counter(
+            "osdu_requests_total", "Request attempts.", endpoint + ("method", "status")
+        )
+        self.request_duration = Histogram(
+            "osdu_request_duration_seconds", "Request attempt latency.", endpoint, buckets
+        )
+        self.retries = Counter("osdu_request_retries_total", "Request retry attempts.", endpoint)
+        self.sent_bytes = Counter(
+            "osdu_request_sent_bytes_total", "Request body bytes sent.", endpoint
+        )
+        self.received_bytes = Counter(
+            "osdu_request_received_bytes_total", "Response body bytes received.", endpoint
+        )
+        self.request_phases = Histogram(
+            "osdu_request_phase_seconds", "Time spent per request phase.", endpoint + ("phase",),
+            buckets,
+        )
+        self.connections = Counter(
+            "osdu_request_connections_total", "Requests by connection reuse.", endpoint + ("reused",)
+        )
+        self.token_requests = Counter(
+            "osdu_token_requests_total", "Access token requests.", ("credential", "result")
+        )
+        self.token_duration = Histogram(
+            "osdu_token_duration_seconds", "Time to get an access token.", ("credential",), buckets
+        )
+        self.cache_lookups = Counter(
+            "osdu_cache_lookups_total", "Cache lookups.", ("cache", "result")
+        )
+
+    @property
+    def metrics(self) -> list:
+        """All metrics in the registry
+
+        Returns:
+            list: metrics
+        """
+        return [
+            self.requests,
+            self.request_duration,
+            self.retries,
+            self.sent_bytes,
+            self.received_bytes,
+            self.request_phases,
+            self.connections,
+            self.token_requests,
+            self.token_duration,
+            self.cache_lookups,
+        ]
+
+    def __call__(self, event: NamedTuple):
+        """Update the metrics from an instrumentation event
+
+        Args:
+            event (NamedTuple): the event
+        """
+        if isinstance(event, RequestEndEvent):
+            endpoint = (event.service, event.endpoint)
+            status = "error" if event.status_code is None else str(event.status_code)
+            self.requests.inc(endpoint + (event.method, status))
+            self.request_duration.observe(endpoint, event.latency)
+            if event.attempt > 0:
+                self.retries.inc(endpoint)
+            if event.bytes_sent:
+                self.sent_bytes.inc(endpoint, event.bytes_sent)
+            if event.bytes_received:
+                self.received_bytes.inc(endpoint, event.bytes_received)
+            if event.timings is not None:
+                self._add_timings(endpoint, event.timings)
+        elif isinstance(event, TokenEvent):
+            result = "cache_hit" if event.cache_hit else "refresh"
+            self.token_requests.inc((event.credential, result))
+            self.token_duration.observe((event.credential,), event.duration)
+        elif isinstance(event, CacheEvent):
+            self.cache_lookups.inc((event.cache, "hit" if event.hit else "miss"))
+
+    def _add_timings(self, endpoint: tuple, timings: PhaseTimings):
+        for phase in PHASES:
+            self.request_phases.observe(endpoint + (phase,), getattr(timings, phase))
+        self.connections.inc(endpoint + ("true" if timings.connection_reused else "false",))
+
+    def snapshot(self) -> dict:
+        """Current value of all metrics
+
+        Returns:
+            dict: samples by metric name
+        """
+        return {metric.name: metric.collect() for metric in self.metrics}
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format
+
+        Returns:
+            str: metrics text
+        """
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.metric_type}")
+            for sample in metric.collect():
+                labels = sample["labels"]
+                if metric.metric_type == "counter":
+                    lines.append(f"{metric.name}{_format_labels(labels)} {sample['value']}")
+                    continue
+                for bucket, count in sample["buckets"].items():
+                    bucket_labels = _format_labels({**labels, "le": str(bucket)})
+                    lines.append(f"{metric.name}_bucket{bucket_labels} {count}")
+                lines.append(f"{metric.name}_sum{_format_labels(labels)} {sample['sum']}")
+                lines.append(f"{metric.name}_count{_format_labels(labels)} {sample['count']}")
+        return "\n".join(lines) + "\n"
+
+    def start_http_server(self, port: int, address: str = "") -> ThreadingHTTPServer:
+        """Serve the metrics at /metrics from a daemon thread
+
+        Args:
+            port (int): port to listen on, 0 to pick a free port
+            address (str): address to bind to. Defaults to all interfaces.
+
+        Returns:
+            ThreadingHTTPServer: the server, call shutdown() to stop it
+        """
+        registry = self
+
+        class _MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):  # pylint: disable=invalid-name
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode("utf8")
+                self.send_response(200)
+                self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):  # noqa: A002
+                pass
+
+        server = ThreadingHTTPServer((address, port), _MetricsHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def _escape_label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in labels.items()) + "}"
@@ -0,0 +1,267 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""Run CPU heavy record processing on all cores while records are streamed from OSDU.
+
+Records are read from each source (e.g. SearchClient.iter_query_records) in its own I/O
+thread and grouped into batches, which are passed to a transform in a process pool. The
+transform's results are written to a sink in the main thread.
+
+    def transform(records: list) -> list:
+        return [to_row(record) for record in records]
+
+    with JsonLinesSink("rows.jsonl") as sink:
+        runner = PipelineRunner(transform, sink, batch_size=500)
+        stats = runner.run(search_client.iter_query_records(kind, limit=1000))
+
+The transform must be picklable, i.e. a module level function, and so must the records and
+results. At most max_pending batches are submitted to the pool but not yet written, counting
+finished batches held back to write results in order, and up to max_pending more are read
+ahead of the pool. Reading stops while the pool or the sink is behind, so memory use stays
+bounded.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Callable, Iterable
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, wait
+from typing import NamedTuple
+
+from osdu._concurrent import END, ReadError, batches, fill
+
+
+class PipelineStats(NamedTuple):
+    """Summary of a pipeline run."""
+
+    records_read: int
+    batches: int
+    results_written: int
+    elapsed: float
+    """Seconds taken by the whole run"""
+
+
+class Sink(ABC):
+    """Destination for the results of a pipeline, written from the main thread."""
+
+    @abstractmethod
+    def write(self, results: list):
+        """Write the results of one batch
+
+        Args:
+            results (list): results returned by the transform
+        """
+
+    def close(self):
+        """Release any resources held by the sink"""
+
+    def __enter__(self) -> "Sink":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class ListSink(Sink):
+    """Collect results in a list."""
+
+    def __init__(self):
+        """Setup the sink"""
+        self.results = []
+
+    def write(self, results: list):
+        """Append the results
+
+        Args:
+            results (list): results returned by the transform
+        """
+        self.results.extend(results)
+
+
+class CallbackSink(Sink):
+    """Pass each batch of results to a function."""
+
+    def __init__(self, callback: Callable):
+        """Setup the sink
+
+        Args:
+            callback (Callable): function called with the list of results of each batch
+        """
+        self._callback = callback
+
+    def write(self, results: list):
+        """Call the callback with the results
+
+        Args:
+            results (list): results returned by the transform
+        """
+        self._callback(results)
+
+
+class JsonLinesSink(Sink):
+    """Write each result as a line of json to a file."""
+
+    def __init__(self, path: str):
+        """Setup the sink, truncating any existing file
+
+        Args:
+            path (str): path of the file to write
+        """
+        self._file = open(path, "w", encoding="utf8")  # pylint: disable=consider-using-with
+
+    def write(self, results: list):
+        """Write the results
+
+        Args:
+            results (list): json serializable results returned by the transform
+        """
+        self._file.writelines(json.dumps(result) + "\n" for result in results)
+
+    def close(self):
+        """Close the file"""
+        self._file.close()
+
+
+class PipelineRunner:
+    """Transform records from one or more sources in a process pool, writing the results to a sink."""
+
+    def __init__(
+        self,
+        transform: Callable,
+        sink: Sink,
+        batch_size: int = 1000,
+        max_workers: int = None,
+        max_pending: int = None,
+        ordered: bool = True,
+        executor: Executor = None,
+    ):
+        """Setup the runner
+
+        Args:
+            transform (Callable): picklable function taking a list of records and returning a
+                list of results
+            sink (Sink): where results are written
+            batch_size (int): number of records passed to each transform call. Defaults to 1000.
+            max_workers (int): number of worker processes. Defaults to the number of CPUs.
+            max_pending (int): maximum number of batches submitted to the pool but not yet
+                written, counting finished batches held back to keep the order, and of batches
+                read ahead of the pool. Defaults to twice the number of workers.
+            ordered (bool): write results in the order their batches were read, otherwise as
+                soon as each batch is done. Defaults to True.
+            executor (Executor): executor to run transforms in instead of a new process pool per
+                run, e.g. a pool that is reused or a ThreadPoolExecutor for transforms that
+                release the GIL.
+
+        Raises:
+            ValueError: Raised if batch_size or max_pending is less than 1
+        """
+        self._max_workers = max_workers or os.cpu_count() or 1
+        self._max_pending = max_pending or 2 * self._max_workers
+        if batch_size < 1 or self._max_pending < 1:
+            raise ValueError("batch_size and max_pending must be at least 1")
+        self._transform = transform
+        self._sink = sink
+        self._batch_size = batch_size
+        self._ordered = ordered
+        self._executor = executor
+
+    def run(self, *sources: Iterable) -> PipelineStats:
+        """Read, transform and write all records of the sources
+
+        With several sources their batches are interleaved in the order they are read.
+
+        Args:
+            *sources (Iterable): iterables of records, each read in its own thread
+
+        Returns:
+            PipelineStats: counts and elapsed time
+
+        Raises:
+            Exception: Any exception raised by a source, the transform or the sink. Remaining
+                batches are then cancelled.
+        """
+        start = time.perf_counter()
+        read = queue.Queue(self._max_pending)
+        stop = threading.Event()
+        executor = self._executor or self._start_pool()
+        pending = deque()
+        try:
+            for source in sources:
+                threading.Thread(
+                    target=fill,
+                    args=(batches(source, self._batch_size), read, stop),
+                    name="osdu-pipeline-reader",
+                    daemon=True,
+                ).start()
+            records, batch_count, written = self._dispatch(executor, read, len(sources), pending)
+        finally:
+            stop.set()
+            for future in pending:
+                future.cancel()
+            if self._executor is None:
+                executor.shutdown(cancel_futures=True)
+        return PipelineStats(records, batch_count, written, time.perf_counter() - start)
+
+    def _start_pool(self) -> ProcessPoolExecutor:
+        """Process pool with its workers started before any reader thread exists
+
+        With the fork start method the workers are all started by the first submit. Forking
+        while reader threads run could leave a worker with a lock held by one of them.
+        """
+        executor = ProcessPoolExecutor(self._max_workers)
+        executor.submit(os.getpid).result()
+        return executor
+
+    def _dispatch(self, executor: Executor, read: queue.Queue, readers: int, pending: deque) -> tuple:
+        """Submit batches until all readers are done, writing results as they finish.
+
+        Returns:
+            tuple: records read, batches and results written
+        """
+        records = batch_count = written = 0
+        while readers:
+            batch = read.get()
+            if batch is END:
+                readers -= 1
+                continue
+            if isinstance(batch, ReadError):
+                raise batch.error
+            while len(pending) >= self._max_pending:
+                written += self._write_done(pending, block=True)
+            pending.append(executor.submit(self._transform, batch))
+            records += len(batch)
+            batch_count += 1
+            written += self._write_done(pending, block=False)
+        while pending:
+            written += self._write_done(pending, block=True)
+        return records, batch_count, written
+
+    def _write_done(self, pending: deque, block: bool) -> int:
+        """Write the results of finished batches, waiting for at least one if block is set.
+
+        Returns:
+            int: number of results written
+        """
+        if self._ordered:
+            written = 0
+            while pending and (block or pending[0].done()):
+                written += self._write(pending.popleft().result())
+                block = False
+            return written
+
+        done, _ = wait(pending, timeout=None if block else 0, return_when=FIRST_COMPLETED)
+        written = 0
+        for future in done:
+            pending.remove(future)
+            written += self._write(future.result())
+        return written
+
+    def _write(self, results: list) -> int:
+        self._sink.write(results)
+        return len(results)
@@ -0,0 +1,173 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""Sampled profiling of service client operations.
+
+Once a profiler is set, 1 in every sample_rate service client operations (e.g.
+SearchClient.query) is run under cProfile and/or tracemalloc and the profile written to a
+directory:
+
+    set_profiler(SampledProfiler("/tmp/osdu-profiles", sample_rate=100, memory=True))
+
+CPU profiles are written as <operation>-<time>-<pid>-<n>.prof, open them with pstats or
+snakeviz. Memory profiles are tracemalloc snapshots written as .tracemalloc, load them with
+tracemalloc.Snapshot.load(). Only one operation is profiled at a time, tracemalloc sees
+allocations from all threads while it runs. Generator operations such as
+SearchClient.iter_query_records are not profiled.
+"""
+
+import itertools
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import cProfile
+    import tracemalloc
+
+logger = logging.getLogger(__name__)
+
+_UNSAFE_FILENAME = re.compile(r"[^\w.-]")
+
+
+class SampledProfiler:
+    """Profiles 1 in every sample_rate calls, writing the profiles to a directory."""
+
+    @property
+    def directory(self) -> str:
+        """Directory the profiles are written to
+
+        Returns:
+            str: directory path
+        """
+        return self._directory
+
+    @property
+    def sample_rate(self) -> int:
+        """One in this many calls is profiled
+
+        Returns:
+            int: sample rate
+        """
+        return self._sample_rate
+
+    @property
+    def profiles_written(self) -> int:
+        """Number of profiled calls written so far
+
+        Returns:
+            int: number of profiled calls
+        """
+        return self._profiles_written
+
+    def __init__(self, directory: str, sample_rate: int = 100, cpu: bool = True, memory: bool = False):
+        """Setup the profiler
+
+        Args:
+            directory (str): directory to write profiles to, created if missing
+            sample_rate (int): profile 1 in every sample_rate calls. Defaults to 100.
+            cpu (bool): write cProfile profiles. Defaults to True.
+            memory (bool): write tracemalloc snapshots. Defaults to False.
+
+        Raises:
+            ValueError: Raised if sample_rate is less than 1
+        """
+        if sample_rate < 1:
+            raise ValueError("sample_rate should be at least 1")
+        self._directory = directory
+        self._sample_rate = sample_rate
+        self._cpu = cpu
+        self._memory = memory
+        self._calls = itertools.count()
+        self._profiles_written = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def should_sample(self) -> bool:
+        """Count a call and decide whether to profile it
+
+        Returns:
+            bool: True for 1 in every sample_rate calls
+        """
+        return next(self._calls) % self._sample_rate == 0
+
+    @contextmanager
+    def profile(self, name: str):
+        """Context manager profiling the body and writing the profile when done.
+
+        The body runs unprofiled if another call is already being profiled.
+
+        Args:
+            name (str): name of the operation, used in the file names
+
+        Yields:
+            None
+        """
+        if not self._lock.acquire(blocking=False):
+            yield
+            return
+        # imported here so they are only loaded when profiling is enabled
+        import cProfile  # pylint: disable=import-outside-toplevel
+        import tracemalloc  # pylint: disable=import-outside-toplevel
+
+        try:
+            start_tracemalloc = self._memory and not tracemalloc.is_tracing()
+            if start_tracemalloc:
+                tracemalloc.start()
+            profiler = cProfile.Profile() if self._cpu else None
+            if profiler is not None:
+                profiler.enable()
+            try:
+                yield
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+                snapshot = tracemalloc.take_snapshot() if self._memory else None
+                if start_tracemalloc:
+                    tracemalloc.stop()
+                self._write(name, profiler, snapshot)
+        finally:
+            self._lock.release()
+
+    def _write(self, name: str, profiler: "cProfile.Profile", snapshot: "tracemalloc.Snapshot"):
+        self._profiles_written += 1
+        base = os.path.join(
+            self._directory,
+            f"{_UNSAFE_FILENAME.sub('_', name)}-{time.strftime('%Y%m%dT%H%M%S')}"
+            f"-{os.getpid()}-{self._profiles_written}",
+        )
+        try:
+            if profiler is not None:
+                profiler.dump_stats(base + ".prof")
+            if snapshot is not None:
+                snapshot.dump(base + ".tracemalloc")
+        except OSError:
+            logger.exception("Failed to write profile %s", base)
+
+
+_profiler = None
+
+
+def set_profiler(profiler: SampledProfiler):
+    """Enable sampled profiling using profiler, or disable it by passing None
+
+    Args:
+        profiler (SampledProfiler): profiler to use
+    """
+    global _profiler  # pylint: disable=global-statement
+    _profiler = profiler
+
+
+def get_profiler() -> SampledProfiler:
+    """The profiler in use
+
+    Returns:
+        SampledProfiler: current profiler, None if profiling is disabled
+    """
+    return _profiler
@@ -5,10 +5,12 @@
 # -----------------------------------------------------------------------------
 """Search client for working with the OSDU search API."""
 
+from collections.abc import Iterator
 from typing import Union
 
 from osdu.client import OsduClient
-from osdu.serviceclientbase import ServiceClientBase
+from osdu.deadline import Deadline
+from osdu.serviceclientbase import ServiceClientBase, service_operation
 
 VALID_SEARCH_API_VERSIONS = [2]
 
@@ -20,7 +22,6 @@ class SearchClient(ServiceClientBase):
     # https://github.com/Azure/azure-sdk-for-python/blob/3fe8964c8831c9ce91c4a4bc0dadcbc525b74220/sdk/keyvault/azure-keyvault-certificates/azure/keyvault/certificates/_shared/client_base.py#L34
     # TO DO Model, or string / dict based API calls!
     # TO DO Async v non async calls
-    # TO DO Cursor / paging support.
     """A client for working with the OSDU Search API."""
 
     def __init__(self, client: OsduClient, service_version: Union[int, str] = "latest"):  # noqa:E501 pylint: disable=consider-alternative-union-syntax
@@ -41,6 +42,7 @@ class SearchClient(ServiceClientBase):
     # def query_by_id():
     #     pass
 
+    @service_operation
     def is_healthy(self) -> bool:
         """Returns health status of the API
 
@@ -50,6 +52,7 @@ class SearchClient(ServiceClientBase):
         response = self._client.get(self.api_url("health/readiness_check"))
         return response.status_code == 200
 
+    @service_operation
     def query_all_aggregated(self) -> dict:
         """Returns a list of all kinds including number of records
 
@@ -60,6 +63,7 @@ class SearchClient(ServiceClientBase):
         response_json = self._client.post_returning_json(self.api_url("query"), request_data)
         return response_json
 
+    @service_operation
     def query(
         self, kind: str = None, identifier: str = None, query: str = None, limit: int = None
     ) -> dict:
@@ -96,6 +100,7 @@ class SearchClient(ServiceClientBase):
         response_json = self._client.post_returning_json(self.api_url("query"), request_data)
         return response_json
 
+    @service_operation
     def query_by_id(self, identifier: str, limit: int = None) -> dict:
         """Returns a list of all kinds including number of records
 
@@ -117,6 +122,7 @@ class SearchClient(ServiceClientBase):
         response_json = self._client.post_returning_json(self.api_url("query"), request_data)
         return response_json
 
+    @service_operation
     def query_by_kind(self, kind: str, limit: int = None) -> dict:
         """Returns a list of all records for the given kind
 
@@ -134,3 +140,94 @@ class SearchClient(ServiceClientBase):
 
         response_json = self._client.post_returning_json(self.api_url("query"), request_data)
         return response_json
+
+    @service_operation
+    def query_with_cursor(
+        self,
+        kind: str = None,
+        query: str = None,
+        limit: int = None,
+        cursor: str = None,
+        returned_fields: list = None,
+        deadline: Deadline = None,
+    ) -> dict:
+        """Query a single page of records using a cursor
+
+        Args:
+            kind (str): kind to query for
+            query (str): a specific query
+            limit (int): maximum number of records in the page
+            cursor (str): cursor returned by the previous page, None for the first page
+            returned_fields (list): fields to return for each record
+            deadline (Deadline): deadline for the call
+
+        Returns:
+            dict: containing the result, including the cursor for the next page
+        """
+        request_data = {"kind": "*:*:*:*" if kind is None else kind}
+        if query is not None:
+            request_data["query"] = query
+        if limit is not None:
+            request_data["limit"] = limit
+        if cursor is not None:
+            request_data["cursor"] = cursor
+        if returned_fields is not None:
+            request_data["returnedFields"] = returned_fields
+
+        response_json = self._client.post_returning_json(
+            self.api_url("query_with_cursor"), request_data, deadline=deadline
+        )
+        return response_json
+
+    @service_operation
+    def iter_query_pages(
+        self,
+        kind: str = None,
+        query: str = None,
+        limit: int = None,
+        returned_fields: list = None,
+        deadline: Deadline = None,
+    ) -> Iterator[dict]:
+        """Query all pages of records, following the cursor until the results are exhausted.
+
+        Args:
+            kind (str): kind to query for
+            query (str): a specific query
+            limit (int): maximum number of records per page
+            returned_fields (list): fields to return for each record
+            deadline (Deadline): deadline for the whole scan, shared by all pages
+
+        Yields:
+            dict: the result of each page
+        """
+        cursor = None
+        while True:
+            page = self.query_with_cursor(kind, query, limit, cursor, returned_fields, deadline)
+            yield page
+            cursor = page.get("cursor")
+            if not cursor or not page.get("results"):
+                return
+
+    @service_operation
+    def iter_query_records(
+        self,
+        kind: str = None,
+        query: str = None,
+        limit: int = None,
+        returned_fields: list = None,
+        deadline: Deadline = None,
+    ) -> Iterator[dict]:
+        """Query all records, following the cursor until the results are exhausted.
+
+        Args:
+            kind (str): kind to query for
+            query (str): a specific query
+            limit (int): maximum number of records per page
+            returned_fields (list): fields to return for each record
+            deadline (Deadline): deadline for the whole scan, shared by all pages
+
+        Yields:
+            dict: each record
+        """
+        for page in self.iter_query_pages(kind, query, limit, returned_fields, deadline):
+            yield from page.get("results", [])
@@ -5,10 +5,99 @@
 # -----------------------------------------------------------------------------
 """Base client for working with the OSDU file API."""
 
+import functools
+import inspect
+from collections.abc import Callable, Iterator
 from typing import Union
 
+from osdu import profiling, tracing
 from osdu.client import OsduClient
 
+_DONE = object()
+
+
+def service_operation(func: Callable) -> Callable:
+    """Decorator for service client operations, tracing and sampling calls for profiling when
+    either is enabled.
+
+    Generator operations are traced from the first item until they are exhausted or closed,
+    they aren't profiled. A private generator, e.g. _get_records, is traced with the name of
+    the public method returning it.
+
+    Args:
+        func (Callable): service client method
+
+    Returns:
+        Callable: wrapped method
+    """
+    is_generator = inspect.isgeneratorfunction(func)
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        tracer = tracing.get_tracer()
+        profiler = profiling.get_profiler()
+        if tracer is None and profiler is None:
+            return func(self, *args, **kwargs)
+        # a private generator behind a public method checking its arguments has the public name
+        name = f"{self.service_name}.{func.__name__.lstrip('_')}"
+        if is_generator:
+            if tracer is None:
+                return func(self, *args, **kwargs)
+            return _traced_generator(
+                tracer, name, _span_attributes(self), func(self, *args, **kwargs)
+            )
+        if profiler is not None and profiler.should_sample():
+            with profiler.profile(name):
+                return _traced_call(tracer, name, self, func, args, kwargs)
+        return _traced_call(tracer, name, self, func, args, kwargs)
+
+    return wrapper
+
+
+def _span_attributes(service_client: "ServiceClientBase") -> dict:
+    return {
+        "osdu.service": service_client.service_name,
+        "osdu.service_version": str(service_client.service_version),
+        "osdu.data_partition": service_client._client.data_partition,
+    }
+
+
+def _traced_call(
+    tracer: tracing.Tracer, name: str, service_client: "ServiceClientBase", func: Callable, args, kwargs
+):
+    """Call func within a span if tracing is enabled."""
+    if tracer is None:
+        return func(service_client, *args, **kwargs)
+    with tracer.span(name, attributes=_span_attributes(service_client)) as span:
+        result = func(service_client, *args, **kwargs)
+        span.set_status("OK")
+        return result
+
+
+def _traced_generator(tracer: tracing.Tracer, name: str, attributes: dict, generator: Iterator):
+    """Iterate generator within a span, the span is only current while the generator runs."""
+    span = tracer.start_span(name, attributes=attributes)
+    try:
+        while True:
+            token = tracer.activate(span)
+            try:
+                item = next(generator, _DONE)
+            finally:
+                tracer.deactivate(token)
+            if item is _DONE:
+                break
+            yield item
+        span.set_status("OK")
+    except GeneratorExit:
+        generator.close()
+        span.set_status("OK")
+        raise
+    except Exception as ex:
+        span.record_exception(ex)
+        raise
+    finally:
+        tracer.end_span(span)
+
 
 class ServiceClientBase:
     """Abstract base service client class for connecting with OSDU.
@@ -0,0 +1,27 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+# pylint: disable=C0114
+from ._client import (
+    MAX_BATCH_SIZE,
+    MAX_PUT_BYTES,
+    MAX_PUT_RECORDS,
+    PutRecordResult,
+    PutReport,
+    RecordBatch,
+    StorageClient,
+)
+from ._join import search_and_fetch
+
+__all__ = [
+    "MAX_BATCH_SIZE",
+    "MAX_PUT_BYTES",
+    "MAX_PUT_RECORDS",
+    "PutRecordResult",
+    "PutReport",
+    "RecordBatch",
+    "StorageClient",
+    "search_and_fetch",
+]
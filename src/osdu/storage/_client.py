@@ -0,0 +1,389 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""Storage client for working with the OSDU storage API."""
+
+import json
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from typing import NamedTuple, Union
+from urllib.parse import quote
+
+import requests
+
+from osdu._concurrent import batches, bounded_map
+from osdu.client import (
+    NON_IDEMPOTENT_RETRY_STATUS_CODES,
+    RETRY_STATUS_CODES,
+    OsduClient,
+    request_not_sent,
+    retry_delay,
+)
+from osdu.deadline import Deadline
+from osdu.serviceclientbase import ServiceClientBase, service_operation
+
+VALID_STORAGE_API_VERSIONS = [2]
+MAX_BATCH_SIZE = 100
+"""Maximum number of ids the storage service accepts in one query/records call"""
+MAX_PUT_RECORDS = 500
+"""Maximum number of records the storage service accepts in one put"""
+MAX_PUT_BYTES = 4 * 1024 * 1024
+"""Default maximum size of the body of one put"""
+SPLIT_STATUS_CODES = (400, 413)
+"""Statuses of a put rejected because of some of its records or its size, retried in halves"""
+
+
+class RecordBatch(NamedTuple):
+    """Outcome of fetching a batch of records."""
+
+    records: list
+    invalid_records: list
+    """Ids that weren't found or the caller isn't authorized to read"""
+    retry_records: list
+    """Ids the service failed to fetch, still failing after retries"""
+
+
+class PutRecordResult(NamedTuple):
+    """Outcome of putting one record."""
+
+    id: str
+    """Id of the record, generated by the service for a record without one"""
+    version: int
+    """Version created, None if the put failed or the service skipped an unchanged record"""
+    error: Exception
+    """Error of the last call including the record if it failed, None otherwise"""
+
+    @property
+    def ok(self) -> bool:
+        """Whether the record was stored"""
+        return self.error is None
+
+
+class PutReport(NamedTuple):
+    """Outcome of putting many records, results are in the order of the records."""
+
+    results: list
+    calls: int
+    """Calls made, including retries and those putting halves of rejected chunks"""
+    bytes_sent: int
+    elapsed: float
+
+    @property
+    def succeeded(self) -> list:
+        """Results of the records stored"""
+        return [result for result in self.results if result.ok]
+
+    @property
+    def failed(self) -> list:
+        """Results of the records that couldn't be stored"""
+        return [result for result in self.results if not result.ok]
+
+    @property
+    def records_per_s(self) -> float:
+        """Records put per second"""
+        return len(self.results) / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def bytes_per_s(self) -> float:
+        """Request bytes sent per second"""
+        return self.bytes_sent / self.elapsed if self.elapsed else 0.0
+
+
+class StorageClient(ServiceClientBase):
+    """A client for working with the OSDU Storage API."""
+
+    def __init__(self, client: OsduClient, service_version: Union[int, str] = "latest"):  # noqa:E501 pylint: disable=consider-alternative-union-syntax
+        """Setup the StorageClient
+
+        Args:
+            client (OsduClient): client to use for connection
+            service_version (Union[int, str], optional): service version (2 or 'latest') Defaults to 'latest'.
+
+        Raises:
+            ValueError: if the service version isn't supported
+        """
+        super().__init__(client, "storage", VALID_STORAGE_API_VERSIONS, service_version)
+
+    @service_operation
+    def is_healthy(self) -> bool:
+        """Returns health status of the API
+
+        Returns:
+            bool: health status of the API
+        """
+        response = self._client.get(self.api_url("liveness_check"))
+        return response.status_code == 200
+
+    @service_operation
+    def get_record(self, record_id: str, deadline: Deadline = None) -> dict:
+        """Get the latest version of a record
+
+        Args:
+            record_id (str): id of the record
+            deadline (Deadline): deadline for the call
+
+        Returns:
+            dict: the record
+        """
+        url = self.api_url(f"records/{quote(record_id, safe='')}")
+        return self._client.get_returning_json(url, deadline=deadline)
+
+    @service_operation
+    def query_records(self, ids: list, deadline: Deadline = None) -> dict:
+        """Get the latest version of up to MAX_BATCH_SIZE records in one call
+
+        Args:
+            ids (list): ids of the records
+            deadline (Deadline): deadline for the call
+
+        Returns:
+            dict: containing the records, invalidRecords and retryRecords
+        """
+        request_data = {"records": list(ids)}
+        return self._client.post_returning_json(self.api_url("query/records"), request_data, deadline=deadline)
+
+    def get_records(
+        self,
+        ids: Iterable,
+        batch_size: int = MAX_BATCH_SIZE,
+        max_workers: int = 8,
+        ordered: bool = True,
+        retries: int = 3,
+        deadline: Deadline = None,
+    ) -> Iterator[RecordBatch]:
+        """Get the latest version of many records, fetching batches of ids concurrently.
+
+        Ids are taken from the iterable in a background thread as batches complete, so a lazy
+        iterable isn't read ahead by more than twice max_workers batches:
+
+            for batch in storage_client.get_records(ids):
+                process(batch.records)
+
+        Args:
+            ids (Iterable): ids of the records
+            batch_size (int): ids per call, at most MAX_BATCH_SIZE. Defaults to MAX_BATCH_SIZE.
+            max_workers (int): maximum number of concurrent calls. Defaults to 8.
+            ordered (bool): yield batches in the order of the ids rather than as they complete.
+                Defaults to True.
+            retries (int): calls retrying the ids the service returns as retryRecords. Defaults to 3.
+            deadline (Deadline): deadline shared by all calls
+
+        Raises:
+            ValueError: if batch_size or max_workers is out of range, when called
+            DeadlineExceededError: if the deadline passes before the records are fetched
+
+        Returns:
+            Iterator[RecordBatch]: the records, and ids not returned, of each batch
+        """
+        if not 0 < batch_size <= MAX_BATCH_SIZE:
+            raise ValueError(f"batch_size should be between 1 and {MAX_BATCH_SIZE}")
+        if max_workers < 1:
+            raise ValueError("max_workers should be at least 1")
+        return self._get_records(ids, batch_size, max_workers, ordered, retries, deadline)
+
+    @service_operation
+    def _get_records(
+        self, ids: Iterable, batch_size: int, max_workers: int, ordered: bool, retries: int, deadline: Deadline
+    ) -> Iterator[RecordBatch]:
+        def fetch(batch: list) -> RecordBatch:
+            return self._fetch_batch(batch, retries, deadline)
+
+        yield from bounded_map(
+            fetch, batches(ids, batch_size), max_workers, ordered, thread_name_prefix="osdu-storage"
+        )
+
+    @service_operation
+    def put_records(
+        self,
+        records: Iterable,
+        max_records: int = MAX_PUT_RECORDS,
+        max_bytes: int = MAX_PUT_BYTES,
+        max_workers: int = 8,
+        max_in_flight: int = None,
+        retries: int = 3,
+        max_split_calls: int = 64,
+    ) -> PutReport:
+        """Create or update many records, putting chunks of records concurrently.
+
+        Records are serialized once and grouped into chunks of at most max_records records
+        and max_bytes bytes. A chunk rejected with 400 or 413, e.g. because one record is
+        invalid or the body is too large, is split in two and each rejected half split again
+        until the failing records are isolated, so bad records don't fail the others. At most
+        max_split_calls calls are made splitting a chunk, after which the records not yet
+        isolated fail, e.g. when an invalid legal tag is shared by every record. Throttling,
+        server errors and connection errors are retried with backoff, honouring Retry-After.
+        The service may have stored the records of a put that timed out or failed with 502 or
+        504, so records without an id, which would be created again, fail instead of being
+        retried then. Records are read from the iterable as chunks complete, so they can come
+        from a lazy source:
+
+            report = storage_client.put_records(read_records("wells.jsonl"), max_workers=16)
+            for result in report.failed:
+                print(result.id, result.error)
+
+        Args:
+            records (Iterable): records to put
+            max_records (int): records per call, at most MAX_PUT_RECORDS. Defaults to MAX_PUT_RECORDS.
+            max_bytes (int): maximum body size per call, a larger record is put on its own.
+                Defaults to MAX_PUT_BYTES.
+            max_workers (int): maximum number of concurrent calls. Defaults to 8.
+            max_in_flight (int): maximum chunks submitted but not yet completed. Defaults to twice
+                max_workers.
+            retries (int): retries of a chunk failing with a transient error. Defaults to 3.
+            max_split_calls (int): maximum calls splitting a rejected chunk. Defaults to 64.
+
+        Raises:
+            ValueError: if max_records is out of range
+
+        Returns:
+            PutReport: id and version of each record
+        """
+        if not 0 < max_records <= MAX_PUT_RECORDS:
+            raise ValueError(f"max_records should be between 1 and {MAX_PUT_RECORDS}")
+        start = time.perf_counter()
+        results, calls, bytes_sent = [], 0, 0
+
+        def put_chunk(chunk: list) -> tuple:
+            return self._put_chunk(chunk, retries, max_split_calls)
+
+        for chunk_results, chunk_calls, chunk_bytes in bounded_map(
+            put_chunk,
+            _put_chunks(records, max_records, max_bytes),
+            max_workers,
+            max_pending=max_in_flight,
+            thread_name_prefix="osdu-storage-put",
+        ):
+            results.extend(chunk_results)
+            calls += chunk_calls
+            bytes_sent += chunk_bytes
+        return PutReport(results, calls, bytes_sent, time.perf_counter() - start)
+
+    def _put_chunk(self, chunk: list, retries: int, split_calls: int, attempt: int = 0) -> tuple:
+        """Put (record, encoded record) pairs, splitting the chunk in up to split_calls calls if
+        it is rejected and retrying transient errors. The client doesn't retry as well, so
+        retries is the whole budget of the chunk.
+
+        Returns:
+            tuple: PutRecordResult of each record, calls made and bytes sent
+        """
+        body = "[" + ",".join(encoded for _, encoded in chunk) + "]"
+        try:
+            response = self._client.put_returning_json(
+                self.api_url("records"), body, ok_status_codes=[200, 201], retries=0
+            )
+        except requests.HTTPError as ex:
+            status_code = ex.response.status_code if ex.response is not None else None
+            if status_code in SPLIT_STATUS_CODES:
+                if split_calls <= 0 or len(chunk) == 1:
+                    return _put_failed(chunk, ex), 1, len(body)
+                results, calls, sent = self._put_split(chunk, ex, retries, split_calls)
+                return results, calls + 1, sent + len(body)
+            if status_code not in RETRY_STATUS_CODES:
+                return _put_failed(chunk, ex), 1, len(body)
+            error, failed_response = ex, ex.response
+        except (requests.ConnectionError, requests.Timeout) as ex:
+            error, failed_response = ex, None
+        else:
+            return _put_results(chunk, response), 1, len(body)
+
+        if attempt >= retries:
+            return _put_failed(chunk, error), 1, len(body)
+        time.sleep(retry_delay(attempt, failed_response))
+        if _refused(failed_response) or (failed_response is None and request_not_sent(error)):
+            results, calls, sent = self._put_chunk(chunk, retries, split_calls, attempt + 1)
+        else:
+            results, calls, sent = self._put_identified(chunk, error, retries, split_calls, attempt + 1)
+        return results, calls + 1, sent + len(body)
+
+    def _put_split(self, chunk: list, error: Exception, retries: int, split_calls: int) -> tuple:
+        """Put the halves of a chunk rejected with error, splitting rejected parts again down to
+        single records. Parts are put breadth first, so the calls are spread over the chunk, and
+        once split_calls calls are made the parts left fail with the rejection they got."""
+        results = [None] * len(chunk)
+        parts = deque([(0, chunk, error)])
+        calls = sent = 0
+        while parts:
+            offset, part, part_error = parts.popleft()
+            if len(part) == 1 or calls >= split_calls:
+                results[offset:offset + len(part)] = _put_failed(part, part_error)
+                continue
+            middle = len(part) // 2
+            for half_offset, half in ((offset, part[:middle]), (offset + middle, part[middle:])):
+                half_results, half_calls, half_sent = self._put_chunk(half, retries, 0)
+                calls, sent = calls + half_calls, sent + half_sent
+                if _rejected(half_results):
+                    parts.append((half_offset, half, half_results[0].error))
+                else:
+                    results[half_offset:half_offset + len(half)] = half_results
+        return results, calls, sent
+
+    def _put_identified(self, chunk: list, error: Exception, retries: int, split_calls: int, attempt: int) -> tuple:
+        """Put the records of a chunk that have an id again, after a put that may have been
+        applied. Records without an id fail with error, putting them again could duplicate them."""
+        identified = [pair for pair in chunk if pair[0].get("id")]
+        retried, calls, sent = self._put_chunk(identified, retries, split_calls, attempt) if identified else ([], 0, 0)
+        retried = iter(retried)
+        results = [next(retried) if record.get("id") else PutRecordResult(None, None, error) for record, _ in chunk]
+        return results, calls, sent
+
+    def _fetch_batch(self, ids: list, retries: int, deadline: Deadline = None) -> RecordBatch:
+        records, invalid_records = [], []
+        attempt = 0
+        while True:
+            response = self.query_records(ids, deadline)
+            records.extend(response.get("records") or [])
+            invalid_records.extend(response.get("invalidRecords") or [])
+            ids = response.get("retryRecords") or []
+            if not ids or attempt >= retries:
+                return RecordBatch(records, invalid_records, ids)
+            time.sleep(retry_delay(attempt))
+            attempt += 1
+
+
+def _put_chunks(records: Iterable, max_records: int, max_bytes: int) -> Iterator[list]:
+    """Chunks of (record, encoded record) pairs within the count and size limits"""
+    chunk, size = [], 2
+    for record in records:
+        # ascii json, so the length is the size in bytes
+        encoded = json.dumps(record, separators=(",", ":"))
+        if chunk and (len(chunk) >= max_records or size + len(encoded) + 1 > max_bytes):
+            yield chunk
+            chunk, size = [], 2
+        chunk.append((record, encoded))
+        size += len(encoded) + 1
+    if chunk:
+        yield chunk
+
+
+def _put_failed(chunk: list, error: Exception) -> list:
+    return [PutRecordResult(record.get("id"), None, error) for record, _ in chunk]
+
+
+def _refused(response: requests.Response) -> bool:
+    """Whether the service refused a put without applying it, unlike a 502 or 504"""
+    return response is not None and response.status_code in NON_IDEMPOTENT_RETRY_STATUS_CODES
+
+
+def _rejected(results: list) -> bool:
+    """Whether a put failed because of some of its records or its size, which splitting could
+    resolve"""
+    error = results[0].error if results else None
+    response = getattr(error, "response", None)
+    return isinstance(error, requests.HTTPError) and response is not None and response.status_code in SPLIT_STATUS_CODES
+
+
+def _put_results(chunk: list, response: dict) -> list:
+    versions = {}
+    for id_version in response.get("recordIdVersions") or []:
+        record_id, _, version = id_version.rpartition(":")
+        versions[record_id] = int(version)
+    given = {record.get("id") for record, _ in chunk}
+    generated = iter([record_id for record_id in response.get("recordIds") or [] if record_id not in given])
+    results = []
+    for record, _ in chunk:
+        record_id = record.get("id") or next(generated, None)
+        results.append(PutRecordResult(record_id, versions.get(record_id), None))
+    return results
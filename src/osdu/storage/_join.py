@@ -0,0 +1,69 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""Search for record ids and fetch the full records from storage in one pipeline."""
+
+from collections.abc import Iterable, Iterator
+
+from osdu._concurrent import prefetch
+from osdu.deadline import Deadline
+from osdu.search import SearchClient
+
+from ._client import MAX_BATCH_SIZE, RecordBatch, StorageClient
+
+
+def search_and_fetch(  # pylint: disable=too-many-arguments
+    search_client: SearchClient,
+    storage_client: StorageClient,
+    kind: str = None,
+    query: str = None,
+    page_size: int = 1000,
+    batch_size: int = MAX_BATCH_SIZE,
+    max_workers: int = 8,
+    max_pending_pages: int = 2,
+    ordered: bool = True,
+    deadline: Deadline = None,
+) -> Iterator[RecordBatch]:
+    """Search for records and fetch the full records of the results from storage.
+
+    Search pages are read in a background thread, only returning the ids, while the ids of
+    pages already read are fetched in concurrent storage batches. Batches are yielded while
+    waiting for the next search page. At most max_pending_pages
+    pages wait to be fetched and twice max_workers batches are in flight, so memory stays
+    bounded when storage is slower than search:
+
+        for batch in search_and_fetch(search_client, storage_client, "osdu:wks:master-data--Well:1.0.0"):
+            process(batch.records)
+
+    Args:
+        search_client (SearchClient): client to search with
+        storage_client (StorageClient): client to fetch the records with
+        kind (str): kind to query for
+        query (str): a specific query
+        page_size (int): maximum number of ids per search page. Defaults to 1000.
+        batch_size (int): ids per storage call, at most MAX_BATCH_SIZE. Defaults to MAX_BATCH_SIZE.
+        max_workers (int): maximum number of concurrent storage calls. Defaults to 8.
+        max_pending_pages (int): maximum search pages read ahead of the storage calls. Defaults to 2.
+        ordered (bool): yield batches in search order rather than as they complete. Defaults to True.
+        deadline (Deadline): deadline shared by all search pages and storage calls
+
+    Yields:
+        RecordBatch: the records, and ids not returned, of each storage batch
+    """
+    pages = prefetch(
+        search_client.iter_query_pages(kind, query, page_size, ["id"], deadline),
+        max_pending_pages,
+        thread_name="osdu-search-pages",
+    )
+    # get_records reads and closes the pages in its reader thread
+    yield from storage_client.get_records(
+        _page_ids(pages), batch_size, max_workers, ordered, deadline=deadline
+    )
+
+
+def _page_ids(pages: Iterable) -> Iterator[str]:
+    for page in pages:
+        for result in page.get("results") or []:
+            yield result["id"]
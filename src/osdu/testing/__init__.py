@@ -0,0 +1,35 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""Fake OSDU services for testing and load testing without a live OSDU instance."""
+from ._auth import (
+    FAKE_AUTHORITY_BASE,
+    FakeAuthorityHttpClient,
+    StaticTokenCredential,
+    fake_token_response,
+)
+from ._dataset import FakeEntitlements, FakeStorage, SyntheticDataset
+from ._latency import bimodal_latency, constant_latency, lognormal_latency, uniform_latency
+from ._replay import record_session, replay_session, timing_path
+from ._server import FakeOsduServer, Faults
+
+__all__ = [
+    "FAKE_AUTHORITY_BASE",
+    "FakeAuthorityHttpClient",
+    "FakeEntitlements",
+    "FakeOsduServer",
+    "FakeStorage",
+    "Faults",
+    "StaticTokenCredential",
+    "SyntheticDataset",
+    "bimodal_latency",
+    "constant_latency",
+    "fake_token_response",
+    "lognormal_latency",
+    "record_session",
+    "replay_session",
+    "timing_path",
+    "uniform_latency",
+]
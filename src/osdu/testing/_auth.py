@@ -0,0 +1,133 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""Credentials and token responses for use with the fake OSDU server."""
+
+import base64
+import json
+import time
+
+import requests
+
+from osdu.identity import OsduBaseCredential
+
+FAKE_AUTHORITY_BASE = "https://login.fake"
+"""Authority host to give msal, FakeAuthorityHttpClient sends its requests to the fake server.
+
+msal only accepts https authorities so it can't be pointed at the fake server directly.
+"""
+
+
+class StaticTokenCredential(OsduBaseCredential):
+    """Credential returning a fixed token."""
+
+    def __init__(self, token: str = "token"):
+        """Setup the credential
+
+        Args:
+            token (str): token to return. Defaults to "token".
+        """
+        super().__init__()
+        self._token = token
+
+    def get_token(self, **kwargs) -> str:
+        """Get the token
+
+        Returns:
+            str: the token
+        """
+        return self._token
+
+
+class FakeAuthorityHttpClient:
+    """msal http_client sending requests for FAKE_AUTHORITY_BASE to a fake server, e.g.
+
+    msal.ConfidentialClientApplication(
+        "client", client_credential="secret", authority=FAKE_AUTHORITY_BASE + "/tenant",
+        http_client=FakeAuthorityHttpClient(server.url), instance_discovery=False)
+    """
+
+    def __init__(self, server_url: str):
+        """Setup the client
+
+        Args:
+            server_url (str): url of the fake server
+        """
+        self._server_url = server_url
+        self._session = requests.Session()
+
+    def _url(self, url: str) -> str:
+        return url.replace(FAKE_AUTHORITY_BASE, self._server_url)
+
+    def post(self, url, params=None, data=None, headers=None, **kwargs):
+        """Send a POST"""
+        return self._session.post(self._url(url), params=params, data=data, headers=headers, **kwargs)
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        """Send a GET"""
+        return self._session.get(self._url(url), params=params, headers=headers, **kwargs)
+
+    def close(self):
+        """Close the session"""
+        self._session.close()
+
+
+def _encode(value: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode("utf8")).decode("ascii").rstrip("=")
+
+
+def fake_token_response(tenant: str = "tenant", app_only: bool = False) -> dict:
+    """Token endpoint response accepted by msal and OsduTokenCredential
+
+    Args:
+        tenant (str): tenant the token is issued for
+        app_only (bool): response to a client credentials request, which has no account
+
+    Returns:
+        dict: token response
+    """
+    response = {
+        "access_token": "token",
+        "token_type": "Bearer",
+        "expires_in": 3600,
+        "scope": "scope",
+    }
+    if app_only:
+        return response
+    now = int(time.time())
+    claims = {
+        "iss": f"{FAKE_AUTHORITY_BASE}/{tenant}/v2.0",
+        "sub": "user",
+        "aud": "client",
+        "oid": "user",
+        "tid": tenant,
+        "preferred_username": "user@contoso.com",
+        "exp": now + 3600,
+        "iat": now,
+    }
+    return {
+        **response,
+        "refresh_token": "refresh",
+        "id_token": f"{_encode({'alg': 'none'})}.{_encode(claims)}.",
+        "client_info": _encode({"uid": "user", "utid": tenant}),
+    }
+
+
+def openid_configuration(tenant: str) -> dict:
+    """OpenID configuration of the fake authority
+
+    Args:
+        tenant (str): tenant in the authority url
+
+    Returns:
+        dict: openid configuration
+    """
+    authority = f"{FAKE_AUTHORITY_BASE}/{tenant}"
+    return {
+        "issuer": authority + "/v2.0",
+        "authorization_endpoint": authority + "/oauth2/v2.0/authorize",
+        "token_endpoint": authority + "/oauth2/v2.0/token",
+        "device_authorization_endpoint": authority + "/oauth2/v2.0/devicecode",
+    }
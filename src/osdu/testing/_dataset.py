@@ -0,0 +1,314 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""Synthetic data served by the fake OSDU server."""
+
+import fnmatch
+import itertools
+import json
+import re
+import threading
+
+DEFAULT_KINDS = ("osdu:wks:master-data--Well:1.0.0", "osdu:wks:master-data--Wellbore:1.0.0")
+
+_ID_QUERY = re.compile(r'^id:\("?(?P<id>[^"]+)"?\)$')
+
+
+class SyntheticDataset:
+    """Search records spread evenly over kinds, each with a data payload of about record_size bytes.
+
+    Records are encoded once up front so serving them costs little time in the test process.
+    """
+
+    @property
+    def kinds(self) -> tuple:
+        """Kinds in the dataset
+
+        Returns:
+            tuple: kinds
+        """
+        return self._kinds
+
+    @property
+    def records(self) -> list:
+        """Records in the dataset, not to be modified
+
+        Returns:
+            list: records
+        """
+        return self._records
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __init__(self, records: int = 1000, record_size: int = 256, kinds: tuple = DEFAULT_KINDS):
+        """Setup the dataset
+
+        Args:
+            records (int): number of records. Defaults to 1000.
+            record_size (int): approximate size of each record's data in bytes. Defaults to 256.
+            kinds (tuple): kinds to spread the records over.
+        """
+        self._kinds = tuple(kinds)
+        self._records = []
+        self._encoded = []
+        for index in range(records):
+            kind = self._kinds[index % len(self._kinds)]
+            entity = kind.split(":")[2]
+            record = {
+                "id": f"opendes:{entity}:{index}",
+                "kind": kind,
+                "data": {"FacilityName": f"{entity} {index}", "Description": "x" * record_size},
+            }
+            self._records.append(record)
+            self._encoded.append(json.dumps(record).encode("utf8"))
+
+    def _matches(self, kind: str, query: str) -> list:
+        """Indexes of the records matching kind and query"""
+        match = _ID_QUERY.match(query.strip()) if query and query.strip() != "*" else None
+        indexes = range(len(self._records))
+        if kind and kind != "*:*:*:*":
+            indexes = [i for i in indexes if fnmatch.fnmatchcase(self._records[i]["kind"], kind)]
+        if match is not None:
+            indexes = [i for i in indexes if self._records[i]["id"] == match.group("id")]
+        return indexes
+
+    def search(self, request: dict, offset: int = None) -> tuple:
+        """Run a search request
+
+        Args:
+            request (dict): search request body
+            offset (int): offset overriding the request offset, e.g. from a cursor
+
+        Returns:
+            tuple: (encoded results, total count, next offset or None)
+        """
+        indexes = self._matches(request.get("kind"), request.get("query"))
+        start = request.get("offset", 0) if offset is None else offset
+        end = start + request.get("limit", 10)
+        page = indexes[start:end]
+        returned_fields = request.get("returnedFields")
+        if returned_fields:
+            results = [
+                json.dumps(_select_fields(self._records[i], returned_fields)).encode("utf8")
+                for i in page
+            ]
+        else:
+            results = [self._encoded[i] for i in page]
+        return b"[" + b",".join(results) + b"]", len(indexes), end if end < len(indexes) else None
+
+    def aggregate(self, request: dict) -> list:
+        """Count matching records by kind
+
+        Args:
+            request (dict): search request body
+
+        Returns:
+            list: aggregations as returned by the search service
+        """
+        counts = {}
+        for index in self._matches(request.get("kind"), request.get("query")):
+            kind = self._records[index]["kind"]
+            counts[kind] = counts.get(kind, 0) + 1
+        return [{"key": kind, "count": count} for kind, count in counts.items()]
+
+
+def _select_fields(record: dict, fields: list) -> dict:
+    selected = {}
+    for field in fields:
+        if field.startswith("data."):
+            name = field[len("data."):]
+            if name in record["data"]:
+                selected.setdefault("data", {})[name] = record["data"][name]
+        elif field in record:
+            selected[field] = record[field]
+    return selected
+
+
+class FakeEntitlements:
+    """Thread safe in memory entitlements groups and members.
+
+    Members are paged when a limit is given, with the offset of the next page as cursor.
+    """
+
+    def __init__(self, groups: int = 50, members_per_group: int = 20, domain: str = "opendes.contoso.com"):
+        """Setup the groups
+
+        Args:
+            groups (int): number of groups. Defaults to 50.
+            members_per_group (int): number of members in each group. Defaults to 20.
+            domain (str): domain of the group emails. Defaults to opendes.contoso.com.
+        """
+        self._domain = domain
+        self._lock = threading.Lock()
+        self._groups = {}
+        for index in range(groups):
+            group = self._new_group(f"data.fake{index}.viewers", "synthetic group")
+            group["members"] = {
+                f"user{member}@contoso.com": "OWNER" if member == 0 else "MEMBER"
+                for member in range(members_per_group)
+            }
+
+    def _new_group(self, name: str, description: str) -> dict:
+        group = {
+            "name": name,
+            "description": description,
+            "email": f"{name}@{self._domain}",
+            "members": {},
+        }
+        self._groups[group["email"]] = group
+        return group
+
+    @staticmethod
+    def _describe(group: dict) -> dict:
+        return {key: group[key] for key in ("name", "description", "email")}
+
+    def list_groups(self) -> tuple:
+        with self._lock:
+            return 200, {"groups": [self._describe(group) for group in self._groups.values()]}
+
+    def member_groups(self, member: str) -> tuple:
+        """Groups member belongs to directly or through nested groups"""
+        with self._lock:
+            found = set()
+            pending = [member]
+            while pending:
+                email = pending.pop()
+                for group in self._groups.values():
+                    if email in group["members"] and group["email"] not in found:
+                        found.add(group["email"])
+                        pending.append(group["email"])
+            groups = [self._describe(self._groups[email]) for email in sorted(found)]
+        return 200, {"desId": member, "memberEmail": member, "groups": groups}
+
+    def add_group(self, request: dict) -> tuple:
+        with self._lock:
+            if f"{request.get('name')}@{self._domain}" in self._groups:
+                return 409, {"code": 409, "reason": "Conflict", "message": "Group already exists"}
+            group = self._new_group(request.get("name"), request.get("description", ""))
+            return 201, self._describe(group)
+
+    def delete_group(self, email: str) -> tuple:
+        with self._lock:
+            if self._groups.pop(email, None) is None:
+                return 404, {"code": 404, "reason": "Not Found", "message": "Group not found"}
+            return 204, None
+
+    def list_members(self, email: str, role: str = None, limit: int = None, cursor: str = None) -> tuple:
+        with self._lock:
+            group = self._groups.get(email)
+            if group is None:
+                return 404, {"code": 404, "reason": "Not Found", "message": "Group not found"}
+            members = [
+                {"email": member, "role": member_role}
+                for member, member_role in group["members"].items()
+                if role is None or member_role == role.upper()
+            ]
+        if limit is None:
+            return 200, {"members": members}
+        offset = int(cursor or 0)
+        response = {"members": members[offset:offset + limit]}
+        if offset + limit < len(members):
+            response["cursor"] = str(offset + limit)
+        return 200, response
+
+    def add_member(self, email: str, request: dict) -> tuple:
+        with self._lock:
+            group = self._groups.get(email)
+            if group is None:
+                return 404, {"code": 404, "reason": "Not Found", "message": "Group not found"}
+            if request.get("email") in group["members"]:
+                return 409, {"code": 409, "reason": "Conflict", "message": "Member already exists"}
+            group["members"][request.get("email")] = request.get("role", "MEMBER")
+            return 200, {"email": request.get("email"), "role": request.get("role", "MEMBER")}
+
+    def remove_member(self, email: str, member: str) -> tuple:
+        with self._lock:
+            group = self._groups.get(email)
+            if group is None or group["members"].pop(member, None) is None:
+                return 404, {"code": 404, "reason": "Not Found", "message": "Member not found"}
+            return 204, None
+
+
+class FakeStorage:
+    """Thread safe in memory storage records with versions.
+
+    Batch queries of more than max_batch_size ids are rejected with 400 as by the storage
+    service. Ids added to retry_ids are returned in retryRecords once, as for a transient
+    failure fetching them. Puts of more than max_put_records records, or of records missing
+    a kind, acl or legal, are rejected with 400.
+    """
+
+    def __init__(
+        self,
+        dataset: SyntheticDataset = None,
+        max_batch_size: int = 100,
+        max_put_records: int = 500,
+        max_request_bytes: int = None,
+    ):
+        """Setup the records
+
+        Args:
+            dataset (SyntheticDataset): records to start with, at version 1. Defaults to none.
+            max_batch_size (int): maximum ids per batch query. Defaults to 100.
+            max_put_records (int): maximum records per put. Defaults to 500.
+            max_request_bytes (int): larger put bodies are rejected with 413. Defaults to no limit.
+        """
+        self.max_batch_size = max_batch_size
+        self.max_put_records = max_put_records
+        self.max_request_bytes = max_request_bytes
+        self.retry_ids = set()
+        self._lock = threading.Lock()
+        self._generated_ids = itertools.count()
+        self._records = {}
+        for record in dataset.records if dataset is not None else ():
+            self._records[record["id"]] = {**record, "version": 1}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._records)
+
+    def get_record(self, record_id: str) -> tuple:
+        with self._lock:
+            record = self._records.get(record_id)
+        if record is None:
+            return 404, {"code": 404, "reason": "Record not found", "message": f"{record_id} not found"}
+        return 200, record
+
+    def query_records(self, request: dict) -> tuple:
+        ids = request.get("records") or []
+        if len(ids) > self.max_batch_size:
+            message = f"At most {self.max_batch_size} records can be fetched at once"
+            return 400, {"code": 400, "reason": "Bad Request", "message": message}
+        records, invalid, retry = [], [], []
+        with self._lock:
+            for record_id in ids:
+                if record_id in self.retry_ids:
+                    self.retry_ids.discard(record_id)
+                    retry.append(record_id)
+                elif record_id in self._records:
+                    records.append(self._records[record_id])
+                else:
+                    invalid.append(record_id)
+        return 200, {"records": records, "invalidRecords": invalid, "retryRecords": retry}
+
+    def put_records(self, records: list) -> tuple:
+        if len(records) > self.max_put_records:
+            message = f"At most {self.max_put_records} records can be put at once"
+            return 400, {"code": 400, "reason": "Bad Request", "message": message}
+        for index, record in enumerate(records):
+            missing = [field for field in ("kind", "acl", "legal") if not record.get(field)]
+            if missing:
+                message = f"Record {index} is missing {', '.join(missing)}"
+                return 400, {"code": 400, "reason": "Validation error", "message": message}
+        ids, versions = [], []
+        with self._lock:
+            for record in records:
+                record_id = record.get("id") or f"opendes:generated:{next(self._generated_ids)}"
+                version = self._records.get(record_id, {}).get("version", 0) + 1
+                self._records[record_id] = {**record, "id": record_id, "version": version}
+                ids.append(record_id)
+                versions.append(f"{record_id}:{version}")
+        return 201, {"recordCount": len(ids), "recordIds": ids, "recordIdVersions": versions, "skippedRecordIds": []}
@@ -0,0 +1,74 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""Latency distributions for the fake OSDU server.
+
+Each function returns a callable taking no arguments and returning a latency in seconds.
+Pass a seed for repeatable sequences.
+"""
+
+import math
+import random
+from collections.abc import Callable
+
+
+def constant_latency(seconds: float) -> Callable:
+    """The same latency for every request
+
+    Args:
+        seconds (float): latency in seconds
+
+    Returns:
+        Callable: latency function
+    """
+    return lambda: seconds
+
+
+def uniform_latency(low: float, high: float, seed: int = None) -> Callable:
+    """Latency uniformly distributed between low and high
+
+    Args:
+        low (float): minimum latency in seconds
+        high (float): maximum latency in seconds
+        seed (int): random seed
+
+    Returns:
+        Callable: latency function
+    """
+    rng = random.Random(seed)
+    return lambda: rng.uniform(low, high)
+
+
+def lognormal_latency(median: float, sigma: float = 0.5, seed: int = None) -> Callable:
+    """Log-normally distributed latency, the long tailed shape typical of real services
+
+    Args:
+        median (float): median latency in seconds
+        sigma (float): standard deviation of the underlying normal distribution, larger
+            values give a longer tail. Defaults to 0.5.
+        seed (int): random seed
+
+    Returns:
+        Callable: latency function
+    """
+    rng = random.Random(seed)
+    mu = math.log(median)
+    return lambda: rng.lognormvariate(mu, sigma)
+
+
+def bimodal_latency(fast: float, slow: float, slow_fraction: float, seed: int = None) -> Callable:
+    """Mostly fast latency with a fraction of slow requests, e.g. from a struggling node
+
+    Args:
+        fast (float): latency of most requests in seconds, jittered down to half
+        slow (float): latency of slow requests in seconds
+        slow_fraction (float): fraction of requests that are slow (0-1)
+        seed (int): random seed
+
+    Returns:
+        Callable: latency function
+    """
+    rng = random.Random(seed)
+    return lambda: slow if rng.random() < slow_fraction else rng.uniform(fast / 2, fast)
@@ -0,0 +1,149 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""Record an OSDU session to a vcrpy cassette and replay it with its original timing.
+
+vcrpy doesn't keep the time each interaction took, so recording writes a timing sidecar
+next to the cassette holding the latency of each interaction. Replay sleeps for that
+latency multiplied by latency_scale before returning each response, so 1 reproduces the
+original timing, 0.5 halves it and 0 replays as fast as possible to measure the SDK's
+own overhead.
+
+Only OSDU API requests are recorded and the Authorization header is removed, so a
+cassette holds no credentials. Replay with a credential that doesn't call an identity
+provider, such as StaticTokenCredential.
+"""
+
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+TIMING_VERSION = 1
+
+_DEFAULT_VCR_OPTIONS = {
+    "serializer": "json",
+    "filter_headers": ["authorization"],
+    "decode_compressed_response": True,
+}
+
+
+def timing_path(cassette_path: str) -> str:
+    """Path of the timing sidecar for a cassette
+
+    Args:
+        cassette_path (str): path of the cassette
+
+    Returns:
+        str: path of the timing sidecar
+    """
+    return cassette_path + ".timing.json"
+
+
+def _vcr(**options):
+    try:
+        import vcr  # pylint: disable=import-outside-toplevel
+    except ImportError as ex:
+        raise ImportError("Recording and replaying sessions requires vcrpy, pip install vcrpy") from ex
+    return vcr.VCR(**{**_DEFAULT_VCR_OPTIONS, **options})
+
+
+def _api_requests_only(request):
+    return request if "/api/" in request.path else None
+
+
+@contextmanager
+def record_session(path: str, **vcr_options) -> Iterator:
+    """Record the OSDU API requests made within the context, overwriting any existing cassette
+
+        with record_session("cassettes/scan.json"):
+            list(search_client.iter_query_records(kind, limit=1000))
+
+    Args:
+        path (str): path of the cassette to write
+        **vcr_options: further options for vcr.VCR, e.g. filter_query_parameters
+
+    Yields:
+        vcr.cassette.Cassette: the cassette being recorded
+
+    Raises:
+        ImportError: Raised if vcrpy isn't installed
+    """
+    recorder = _vcr(before_record_request=_api_requests_only, record_mode="all", **vcr_options)
+    for existing in (path, timing_path(path)):
+        if os.path.exists(existing):
+            os.remove(existing)
+
+    latencies = []
+    lock = threading.Lock()
+    local = threading.local()
+    with recorder.use_cassette(path) as cassette:
+        can_play_response_for = cassette.can_play_response_for
+        append = cassette.append
+
+        def start_request(request):
+            # called just before vcrpy sends the real request
+            local.start = time.perf_counter()
+            return can_play_response_for(request)
+
+        def end_request(request, response):
+            latency = time.perf_counter() - local.start
+            with lock:
+                count = len(cassette.data)
+                append(request, response)
+                if len(cassette.data) > count:
+                    latencies.append(latency)
+
+        cassette.can_play_response_for = start_request
+        cassette.append = end_request
+        yield cassette
+
+    with open(timing_path(path), "w", encoding="utf8") as file:
+        json.dump({"version": TIMING_VERSION, "latencies": latencies}, file)
+
+
+@contextmanager
+def replay_session(path: str, latency_scale: float = 1.0, **vcr_options) -> Iterator:
+    """Replay a recorded cassette for requests made within the context. Requests not in the
+    cassette raise vcr.errors.CannotOverwriteExistingCassetteException.
+
+    Matching requests are answered in recorded order, so a cursor scan of the same kind replays
+    page by page.
+
+    Args:
+        path (str): path of a cassette written by record_session
+        latency_scale (float): multiplier of the recorded latency to wait before each
+            response, 0 for no waiting. Defaults to 1, the original timing.
+        **vcr_options: further options for vcr.VCR, e.g. match_on
+
+    Yields:
+        vcr.cassette.Cassette: the cassette being played
+
+    Raises:
+        ImportError: Raised if vcrpy isn't installed
+        FileNotFoundError: Raised if the timing sidecar is missing and latency_scale isn't 0
+    """
+    latencies = []
+    if latency_scale:
+        with open(timing_path(path), encoding="utf8") as file:
+            latencies = json.load(file)["latencies"]
+
+    player = _vcr(record_mode="none", **vcr_options)
+    with player.use_cassette(path) as cassette:
+        if latencies:
+            indexes = {id(response): index for index, (_, response) in enumerate(cassette.data)}
+            play_response = cassette.play_response
+
+            def delayed_play_response(request):
+                response = play_response(request)
+                index = indexes.get(id(response))
+                if index is not None and index < len(latencies):
+                    time.sleep(latencies[index] * latency_scale)
+                return response
+
+            cassette.play_response = delayed_play_response
+        yield cassette
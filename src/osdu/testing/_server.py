@@ -0,0 +1,360 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""In-process fake OSDU server with latency and fault injection."""
+
+import json
+import random
+import re
+import threading
+import time
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Union
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from osdu._url import split_service_url
+from osdu.testing._auth import fake_token_response, openid_configuration
+from osdu.testing._dataset import FakeEntitlements, FakeStorage, SyntheticDataset
+
+
+class Faults:
+    """Faults injected into OSDU API responses, the token endpoints are never faulted."""
+
+    def __init__(
+        self,
+        status_429_rate: float = 0.0,
+        status_503_rate: float = 0.0,
+        retry_after: int = None,
+        drip_chunk_size: int = 0,
+        drip_interval: float = 0.0,
+        seed: int = None,
+    ):
+        """Setup the faults
+
+        Args:
+            status_429_rate (float): fraction of requests answered with 429 Too Many Requests
+            status_503_rate (float): fraction of requests answered with 503 Service Unavailable
+            retry_after (int): Retry-After header in seconds sent with 429 and 503 responses
+            drip_chunk_size (int): if set, response bodies are sent in chunks of this many bytes
+            drip_interval (float): seconds to wait between body chunks
+            seed (int): random seed for choosing which requests fail
+        """
+        self.status_429_rate = status_429_rate
+        self.status_503_rate = status_503_rate
+        self.retry_after = retry_after
+        self.drip_chunk_size = drip_chunk_size
+        self.drip_interval = drip_interval
+        self._rng = random.Random(seed)
+
+    def error_status(self) -> int:
+        """Decide whether a request fails
+
+        Returns:
+            int: status code to fail the request with, None to answer normally
+        """
+        draw = self._rng.random()
+        if draw < self.status_429_rate:
+            return 429
+        if draw < self.status_429_rate + self.status_503_rate:
+            return 503
+        return None
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+class FakeOsduServer:
+    """In-process http server implementing the OSDU search, storage, entitlements and token endpoints.
+
+    Search (query, query_with_cursor and kind aggregations) runs over a SyntheticDataset,
+    storage records are kept in a FakeStorage starting with the same records, entitlements
+    groups and members are kept in a FakeEntitlements and can be modified.
+    Refresh token requests are answered at /token and msal requests for an authority at
+    FAKE_AUTHORITY_BASE/<tenant> when msal uses a FakeAuthorityHttpClient.
+
+        with FakeOsduServer(latency=lognormal_latency(0.01), faults=Faults(0.05)) as server:
+            client = OsduClient(server.url, "opendes", StaticTokenCredential(), retries=3)
+            ...
+    """
+
+    @property
+    def url(self) -> str:
+        """Base url of the running server
+
+        Returns:
+            str: server url
+        """
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def dataset(self) -> SyntheticDataset:
+        """Search records served
+
+        Returns:
+            SyntheticDataset: the dataset
+        """
+        return self._dataset
+
+    @property
+    def entitlements(self) -> FakeEntitlements:
+        """Entitlements groups and members
+
+        Returns:
+            FakeEntitlements: the groups
+        """
+        return self._entitlements
+
+    @property
+    def storage(self) -> FakeStorage:
+        """Storage records
+
+        Returns:
+            FakeStorage: the records
+        """
+        return self._storage
+
+    @property
+    def request_counts(self) -> dict:
+        """Number of requests received by (method, service, endpoint), ids in the endpoint
+        replaced by {id}
+
+        Returns:
+            dict: request counts
+        """
+        with self._lock:
+            return dict(self._request_counts)
+
+    def __init__(
+        self,
+        dataset: SyntheticDataset = None,
+        entitlements: FakeEntitlements = None,
+        latency: Union[float, Callable] = 0,  # pylint: disable=consider-alternative-union-syntax
+        faults: Faults = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        storage: FakeStorage = None,
+    ):
+        """Setup the server, it is started by start() or entering it as a context manager
+
+        Args:
+            dataset (SyntheticDataset): search records. Defaults to 1000 records.
+            entitlements (FakeEntitlements): groups. Defaults to 50 groups of 20 members.
+            latency (Union[float, Callable]): latency in seconds added to each request, or a
+                function returning one such as lognormal_latency(). Defaults to 0.
+            faults (Faults): faults to inject, may be replaced while running. Defaults to none.
+            host (str): address to listen on. Defaults to 127.0.0.1.
+            port (int): port to listen on. Defaults to 0, any free port.
+            storage (FakeStorage): storage records. Defaults to the records of dataset.
+        """
+        self._dataset = SyntheticDataset() if dataset is None else dataset
+        self._entitlements = FakeEntitlements() if entitlements is None else entitlements
+        self._storage = FakeStorage(self._dataset) if storage is None else storage
+        self.latency = latency
+        self.faults = Faults() if faults is None else faults
+        self._address = (host, port)
+        self._server = None
+        self._lock = threading.Lock()
+        self._request_counts = {}
+        self._routes = self._create_routes()
+
+    def start(self) -> "FakeOsduServer":
+        """Start serving from a daemon thread
+
+        Returns:
+            FakeOsduServer: self
+        """
+        self._server = _Server(self._address, self._create_handler())
+        threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+        ).start()
+        return self
+
+    def stop(self):
+        """Stop the server"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeOsduServer":
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    # region routes
+
+    def _create_routes(self) -> list:
+        api = r"^/api/(?P<service>[^/]+)/v\d+/"
+        entitlements = r"^/api/entitlements/v\d+/groups"
+        storage = r"^/api/storage/v\d+/"
+        return [
+            ("POST", re.compile(storage + r"query/records$"), self._query_records, True),
+            ("GET", re.compile(storage + r"records/(?P<id>[^/]+)$"), self._get_record, True),
+            ("PUT", re.compile(storage + r"records$"), self._put_records, True),
+            ("POST", re.compile(api + r"query$"), self._query, True),
+            ("POST", re.compile(api + r"query_with_cursor$"), self._query_with_cursor, True),
+            ("GET", re.compile(api + r"(health/)?(readiness_check|liveness_check|info)$"), self._health, True),
+            ("GET", re.compile(entitlements + r"$"), self._list_groups, True),
+            ("POST", re.compile(entitlements + r"$"), self._add_group, True),
+            ("DELETE", re.compile(entitlements + r"/(?P<group>[^/]+)$"), self._delete_group, True),
+            ("GET", re.compile(entitlements + r"/(?P<group>[^/]+)/members$"), self._list_members, True),
+            ("POST", re.compile(entitlements + r"/(?P<group>[^/]+)/members$"), self._add_member, True),
+            (
+                "DELETE",
+                re.compile(entitlements + r"/(?P<group>[^/]+)/members/(?P<member>[^/]+)$"),
+                self._remove_member,
+                True,
+            ),
+            (
+                "GET",
+                re.compile(r"^/api/entitlements/v\d+/members/(?P<member>[^/]+)/groups$"),
+                self._member_groups,
+                True,
+            ),
+            ("POST", re.compile(r"^/token$"), self._token, False),
+            ("GET", re.compile(r"^/(?P<tenant>[^/]+)/v2.0/.well-known/openid-configuration$"), self._openid, False),
+            ("POST", re.compile(r"^/(?P<tenant>[^/]+)/oauth2/v2.0/token$"), self._token, False),
+        ]
+
+    def _query(self, _, body: bytes, __) -> tuple:
+        request = json.loads(body)
+        if request.get("aggregateBy"):
+            aggregations = self._dataset.aggregate(request)
+            total = sum(aggregation["count"] for aggregation in aggregations)
+            return 200, {"results": [], "aggregations": aggregations, "totalCount": total}
+        results, total, _ = self._dataset.search(request)
+        return 200, b'{"results":%s,"aggregations":null,"totalCount":%d}' % (results, total)
+
+    def _query_with_cursor(self, _, body: bytes, __) -> tuple:
+        request = json.loads(body)
+        cursor = request.get("cursor")
+        if cursor is not None and not str(cursor).isdigit():
+            return 400, {"code": 400, "reason": "Bad Request", "message": "Invalid cursor"}
+        results, total, next_offset = self._dataset.search(request, int(cursor or 0))
+        next_cursor = json.dumps(None if next_offset is None else str(next_offset)).encode("utf8")
+        return 200, b'{"cursor":%s,"results":%s,"totalCount":%d}' % (next_cursor, results, total)
+
+    def _query_records(self, _, body: bytes, __) -> tuple:
+        return self._storage.query_records(json.loads(body))
+
+    def _get_record(self, match: re.Match, *_) -> tuple:
+        return self._storage.get_record(unquote(match.group("id")))
+
+    def _put_records(self, _, body: bytes, __) -> tuple:
+        max_request_bytes = self._storage.max_request_bytes
+        if max_request_bytes is not None and len(body) > max_request_bytes:
+            return 413, {"code": 413, "reason": "Payload Too Large", "message": f"{len(body)} bytes"}
+        return self._storage.put_records(json.loads(body))
+
+    def _health(self, *_) -> tuple:
+        return 200, b"OK"
+
+    def _list_groups(self, *_) -> tuple:
+        return self._entitlements.list_groups()
+
+    def _add_group(self, _, body: bytes, __) -> tuple:
+        return self._entitlements.add_group(json.loads(body))
+
+    def _delete_group(self, match: re.Match, *_) -> tuple:
+        return self._entitlements.delete_group(unquote(match.group("group")))
+
+    def _list_members(self, match: re.Match, _, query: dict) -> tuple:
+        role, limit, cursor = (query.get(name, [None])[0] for name in ("role", "limit", "cursor"))
+        if cursor is not None and not cursor.isdigit():
+            return 400, {"code": 400, "reason": "Bad Request", "message": "Invalid cursor"}
+        return self._entitlements.list_members(
+            unquote(match.group("group")), role, int(limit) if limit else None, cursor
+        )
+
+    def _member_groups(self, match: re.Match, *_) -> tuple:
+        return self._entitlements.member_groups(unquote(match.group("member")))
+
+    def _add_member(self, match: re.Match, body: bytes, _) -> tuple:
+        return self._entitlements.add_member(unquote(match.group("group")), json.loads(body))
+
+    def _remove_member(self, match: re.Match, *_) -> tuple:
+        return self._entitlements.remove_member(
+            unquote(match.group("group")), unquote(match.group("member"))
+        )
+
+    def _token(self, _, body: bytes, __) -> tuple:
+        return 200, fake_token_response(app_only=b"grant_type=client_credentials" in body)
+
+    def _openid(self, match: re.Match, *_) -> tuple:
+        return 200, openid_configuration(match.group("tenant"))
+
+    # endregion routes
+
+    def _count(self, method: str, path: str):
+        service, endpoint = split_service_url("http://fake" + path)
+        key = (method, service, endpoint)
+        with self._lock:
+            self._request_counts[key] = self._request_counts.get(key, 0) + 1
+
+    def _respond(self, method: str, url: str, body: bytes) -> tuple:
+        """Route a request, returning (status, headers, body bytes, faults to apply)"""
+        parts = urlsplit(url)
+        self._count(method, parts.path)
+        latency = self.latency() if callable(self.latency) else self.latency
+        if latency:
+            time.sleep(latency)
+
+        for route_method, pattern, handler, faulted in self._routes:
+            match = pattern.match(parts.path)
+            if route_method != method or match is None:
+                continue
+            faults = self.faults if faulted else None
+            status = faults.error_status() if faults is not None else None
+            if status is not None:
+                headers = {} if faults.retry_after is None else {"Retry-After": str(faults.retry_after)}
+                return status, headers, json.dumps({"code": status, "message": "Injected fault"}).encode(), faults
+            status, response = handler(match, body, parse_qs(parts.query))
+            if isinstance(response, dict):
+                response = json.dumps(response).encode("utf8")
+            return status, {}, response or b"", faults
+        return 404, {}, b'{"code": 404, "message": "Not found"}', None
+
+    def _create_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """Fake OSDU request handler"""
+
+            protocol_version = "HTTP/1.1"
+            # headers and body are written separately, avoid waiting on delayed acks
+            disable_nagle_algorithm = True
+
+            def _answer(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                status, headers, response, faults = fake._respond(
+                    self.command, self.path, body
+                )
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(response)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if faults is None or not faults.drip_chunk_size:
+                    self.wfile.write(response)
+                    return
+                try:
+                    for start in range(0, len(response), faults.drip_chunk_size):
+                        self.wfile.write(response[start:start + faults.drip_chunk_size])
+                        self.wfile.flush()
+                        time.sleep(faults.drip_interval)
+                except ConnectionError:
+                    # the client gave up waiting, as intended
+                    self.close_connection = True
+
+            do_GET = do_POST = do_PUT = do_DELETE = _answer
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
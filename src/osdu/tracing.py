@@ -0,0 +1,438 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+"""OpenTelemetry compatible tracing of OsduClient and service client calls.
+
+Tracing is disabled until a tracer is set, and costs nothing but a check per call while it is:
+
+    set_tracer(Tracer(FileSpanExporter("spans.jsonl")))
+
+Service client operations (e.g. SearchClient.query) create a span, with a child span per
+http request made by OsduClient. Requests carry W3C traceparent and correlation-id headers
+so the SDK spans join up with the OSDU service side.
+
+To send spans to an OpenTelemetry pipeline instead, install opentelemetry-api and use
+set_tracer(OpenTelemetryTracer()).
+"""
+
+import contextvars
+import json
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+
+_current_span = contextvars.ContextVar("osdu_current_span", default=None)
+
+
+class Span:
+    """A timed operation within a trace, using OpenTelemetry naming for its fields."""
+
+    @property
+    def name(self) -> str:
+        """Name of the span
+
+        Returns:
+            str: span name
+        """
+        return self._name
+
+    @property
+    def trace_id(self) -> str:
+        """Trace id as 32 hex characters
+
+        Returns:
+            str: trace id
+        """
+        return self._trace_id
+
+    @property
+    def span_id(self) -> str:
+        """Span id as 16 hex characters
+
+        Returns:
+            str: span id
+        """
+        return self._span_id
+
+    @property
+    def parent_span_id(self) -> str:
+        """Span id of the parent, None for a root span
+
+        Returns:
+            str: parent span id
+        """
+        return self._parent_span_id
+
+    @property
+    def attributes(self) -> dict:
+        """Span attributes
+
+        Returns:
+            dict: attributes
+        """
+        return self._attributes
+
+    @property
+    def status(self) -> str:
+        """Status of the span, UNSET, OK or ERROR
+
+        Returns:
+            str: status
+        """
+        return self._status
+
+    @property
+    def traceparent(self) -> str:
+        """W3C traceparent header value identifying this span
+
+        Returns:
+            str: traceparent header value
+        """
+        return f"00-{self._trace_id}-{self._span_id}-01"
+
+    def __init__(self, name: str, parent: "Span" = None, kind: str = "INTERNAL", attributes: dict = None):
+        """Setup and start a new span
+
+        Args:
+            name (str): name of the span
+            parent (Span): parent span, None to start a new trace
+            kind (str): span kind, INTERNAL or CLIENT
+            attributes (dict): initial attributes
+        """
+        self._name = name
+        self._kind = kind
+        self._trace_id = parent.trace_id if parent is not None else secrets.token_hex(16)
+        self._span_id = secrets.token_hex(8)
+        self._parent_span_id = parent.span_id if parent is not None else None
+        self._attributes = dict(attributes) if attributes else {}
+        self._status = "UNSET"
+        self._status_description = None
+        self._events = []
+        self._start_time = time.time_ns()
+        self._end_time = None
+
+    def set_attribute(self, key: str, value):
+        """Set an attribute
+
+        Args:
+            key (str): attribute name
+            value (object): attribute value
+        """
+        self._attributes[key] = value
+
+    def set_status(self, status: str, description: str = None):
+        """Set the span status
+
+        Args:
+            status (str): OK or ERROR
+            description (str): optional description, e.g. the error message
+        """
+        self._status = status
+        self._status_description = description
+
+    def record_exception(self, exception: BaseException):
+        """Record an exception event and mark the span as failed
+
+        Args:
+            exception (BaseException): the exception
+        """
+        self._events.append(
+            {
+                "name": "exception",
+                "time_unix_nano": time.time_ns(),
+                "attributes": {
+                    "exception.type": type(exception).__name__,
+                    "exception.message": str(exception),
+                },
+            }
+        )
+        self.set_status("ERROR", str(exception))
+
+    def end(self):
+        """End the span"""
+        if self._end_time is None:
+            self._end_time = time.time_ns()
+
+    def to_dict(self) -> dict:
+        """The span in OpenTelemetry JSON format
+
+        Returns:
+            dict: span
+        """
+        return {
+            "trace_id": self._trace_id,
+            "span_id": self._span_id,
+            "parent_span_id": self._parent_span_id,
+            "name": self._name,
+            "kind": self._kind,
+            "start_time_unix_nano": self._start_time,
+            "end_time_unix_nano": self._end_time,
+            "attributes": self._attributes,
+            "events": self._events,
+            "status": {"code": self._status, "description": self._status_description},
+        }
+
+
+class InMemorySpanExporter:
+    """Exporter keeping finished spans in memory, mainly useful for testing."""
+
+    @property
+    def spans(self) -> list:
+        """Finished spans
+
+        Returns:
+            list: spans in the order they finished
+        """
+        return list(self._spans)
+
+    def __init__(self):
+        """Setup the exporter"""
+        self._spans = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        """Export a finished span
+
+        Args:
+            span (Span): the span
+        """
+        with self._lock:
+            self._spans.append(span)
+
+    def clear(self):
+        """Remove all spans"""
+        with self._lock:
+            self._spans.clear()
+
+
+class FileSpanExporter:
+    """Exporter appending finished spans to a file as JSON lines, for offline use."""
+
+    @property
+    def path(self) -> str:
+        """Path of the file spans are written to
+
+        Returns:
+            str: file path
+        """
+        return self._path
+
+    def __init__(self, path: str):
+        """Setup the exporter
+
+        Args:
+            path (str): file to append spans to
+        """
+        self._path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        """Export a finished span
+
+        Args:
+            span (Span): the span
+        """
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self._lock:
+            with open(self._path, "a", encoding="utf8") as file:
+                file.write(line)
+
+
+class Tracer:
+    """Tracer creating spans and passing them to an exporter once finished."""
+
+    def __init__(self, exporter):
+        """Setup the tracer
+
+        Args:
+            exporter: exporter with an export(span) method, e.g. FileSpanExporter
+        """
+        self._exporter = exporter
+
+    def start_span(self, name: str, kind: str = "INTERNAL", attributes: dict = None) -> Span:
+        """Start a span, child of the current span, without making it current.
+
+        Args:
+            name (str): span name
+            kind (str): span kind, INTERNAL or CLIENT
+            attributes (dict): initial attributes
+
+        Returns:
+            Span: the started span, call end_span() once it is done
+        """
+        return Span(name, _current_span.get(), kind, attributes)
+
+    def end_span(self, span: Span):
+        """End and export a span started with start_span()
+
+        Args:
+            span (Span): the span
+        """
+        span.end()
+        self._exporter.export(span)
+
+    @contextmanager
+    def span(self, name: str, kind: str = "INTERNAL", attributes: dict = None):
+        """Context manager running the body within a new current span.
+
+        Exceptions are recorded on the span and re-raised.
+
+        Args:
+            name (str): span name
+            kind (str): span kind, INTERNAL or CLIENT
+            attributes (dict): initial attributes
+
+        Yields:
+            Span: the span
+        """
+        span = self.start_span(name, kind, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as ex:
+            span.record_exception(ex)
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end_span(span)
+
+    def activate(self, span: Span) -> contextvars.Token:
+        """Make span the current span, e.g. while resuming a generator
+
+        Args:
+            span (Span): the span
+
+        Returns:
+            contextvars.Token: token to pass to deactivate()
+        """
+        return _current_span.set(span)
+
+    def deactivate(self, token: contextvars.Token):
+        """Restore the span that was current before activate()
+
+        Args:
+            token (contextvars.Token): token returned by activate()
+        """
+        _current_span.reset(token)
+
+    def inject(self, span: Span, headers: dict):
+        """Add trace propagation headers identifying span
+
+        Args:
+            span (Span): the span
+            headers (dict): headers to add to
+        """
+        headers["traceparent"] = span.traceparent
+        headers.setdefault("correlation-id", span.trace_id)
+
+
+class OpenTelemetryTracer(Tracer):
+    """Tracer creating spans with the OpenTelemetry API (requires opentelemetry-api)."""
+
+    def __init__(self, tracer_provider=None):  # pylint: disable=super-init-not-called
+        """Setup the tracer
+
+        Args:
+            tracer_provider: OpenTelemetry tracer provider, defaults to the global provider
+
+        Raises:
+            ImportError: Raised if opentelemetry-api isn't installed
+        """
+        try:
+            from opentelemetry import (  # pylint: disable=import-outside-toplevel
+                context,
+                propagate,
+                trace,
+            )
+        except ImportError as ex:
+            raise ImportError(
+                "OpenTelemetryTracer requires opentelemetry-api, pip install opentelemetry-api"
+            ) from ex
+        self._context = context
+        self._propagate = propagate
+        self._trace = trace
+        self._tracer = trace.get_tracer("osdu", tracer_provider=tracer_provider)
+
+    def start_span(self, name: str, kind: str = "INTERNAL", attributes: dict = None):
+        return _OpenTelemetrySpan(
+            self._tracer.start_span(
+                name, kind=getattr(self._trace.SpanKind, kind), attributes=attributes
+            ),
+            self._trace,
+        )
+
+    def end_span(self, span):
+        span.end()
+
+    @contextmanager
+    def span(self, name: str, kind: str = "INTERNAL", attributes: dict = None):
+        span = self.start_span(name, kind, attributes)
+        token = self.activate(span)
+        try:
+            yield span
+        except BaseException as ex:
+            span.record_exception(ex)
+            raise
+        finally:
+            self.deactivate(token)
+            self.end_span(span)
+
+    def activate(self, span):
+        return self._context.attach(self._trace.set_span_in_context(span.otel_span))
+
+    def deactivate(self, token):
+        self._context.detach(token)
+
+    def inject(self, span, headers: dict):
+        self._propagate.inject(headers, context=self._trace.set_span_in_context(span.otel_span))
+        headers.setdefault("correlation-id", span.trace_id)
+
+
+class _OpenTelemetrySpan:
+    """Wrapper giving an OpenTelemetry span the same interface as Span."""
+
+    def __init__(self, otel_span, trace_module):
+        self.otel_span = otel_span
+        self._trace = trace_module
+
+    @property
+    def trace_id(self) -> str:
+        return format(self.otel_span.get_span_context().trace_id, "032x")
+
+    def set_attribute(self, key: str, value):
+        self.otel_span.set_attribute(key, value)
+
+    def set_status(self, status: str, description: str = None):
+        self.otel_span.set_status(getattr(self._trace.StatusCode, status), description)
+
+    def record_exception(self, exception: BaseException):
+        self.otel_span.record_exception(exception)
+        self.set_status("ERROR", str(exception))
+
+    def end(self):
+        self.otel_span.end()
+
+
+_tracer = None
+
+
+def set_tracer(tracer: Tracer):
+    """Enable tracing using tracer, or disable it by passing None
+
+    Args:
+        tracer (Tracer): tracer to use
+    """
+    global _tracer  # pylint: disable=global-statement
+    _tracer = tracer
+
+
+def get_tracer() -> Tracer:
+    """The tracer in use
+
+    Returns:
+        Tracer: current tracer, None if tracing is disabled
+    """
+    return _tracer
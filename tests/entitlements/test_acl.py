@@ -0,0 +1,90 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+
+"""Test cases for local ACL evaluation"""
+
+import time
+from unittest.case import TestCase
+
+from nose2.tools import params
+
+from osdu.client import OsduClient
+from osdu.entitlements import AclEvaluator, EntitlementsClient
+from osdu.testing import FakeEntitlements, FakeOsduServer, StaticTokenCredential, SyntheticDataset
+
+GROUP0, GROUP1, GROUP2 = (f"data.fake{i}.viewers@opendes.contoso.com" for i in range(3))
+
+
+def record(index: int, viewers: list, owners: list = ()) -> dict:
+    """Record with the given acl"""
+    return {"id": f"opendes:wb:{index}", "acl": {"viewers": list(viewers), "owners": list(owners)}}
+
+
+class TestAclEvaluator(TestCase):
+    """Test cases for AclEvaluator"""
+
+    def setUp(self):
+        entitlements = FakeEntitlements(groups=3, members_per_group=1)
+        self.server = FakeOsduServer(SyntheticDataset(records=1), entitlements).start()
+        self.entitlements = EntitlementsClient(OsduClient(self.server.url, "opendes", StaticTokenCredential()))
+        # alice is in group1 directly and group0 through group1
+        self.entitlements.add_member_to_group("alice@contoso.com", GROUP1, "MEMBER")
+        self.entitlements.add_member_to_group(GROUP1, GROUP0, "MEMBER")
+
+    def tearDown(self):
+        self.server.stop()
+
+    def group_requests(self) -> int:
+        """Number of member groups requests made to the server"""
+        return self.server.request_counts.get(("GET", "entitlements", "members/{id}/groups"), 0)
+
+    def test_groups(self):
+        """Test an identity's groups include nested groups and are cached"""
+        evaluator = AclEvaluator(self.entitlements)
+        self.assertEqual({GROUP0, GROUP1}, evaluator.groups("alice@contoso.com"))
+        evaluator.groups("alice@contoso.com")
+        self.assertEqual(1, self.group_requests())
+        self.assertEqual({GROUP0, GROUP1, GROUP2}, evaluator.groups())
+
+    def test_ttl(self):
+        """Test groups are fetched again after the ttl or when invalidated"""
+        evaluator = AclEvaluator(self.entitlements, ttl=0.05)
+        evaluator.groups("alice@contoso.com")
+        time.sleep(0.06)
+        evaluator.groups("alice@contoso.com")
+        self.assertEqual(2, self.group_requests())
+        evaluator.invalidate("alice@contoso.com")
+        evaluator.groups("alice@contoso.com")
+        self.assertEqual(3, self.group_requests())
+
+    @params(
+        ([GROUP0], [], False, True),
+        ([GROUP2], [], False, False),
+        ([GROUP2], [GROUP1], False, True),
+        ([GROUP0], [GROUP2], True, False),
+        ([], [GROUP1], True, True),
+    )
+    def test_can_access(self, viewers, owners, owner, expected):
+        """Test viewer and owner access"""
+        evaluator = AclEvaluator(self.entitlements)
+        acl = {"viewers": viewers, "owners": owners}
+        self.assertEqual(expected, evaluator.can_access(acl, "alice@contoso.com", owner))
+
+    def test_filter_records(self):
+        """Test only accessible records are kept, in order, with one group lookup"""
+        evaluator = AclEvaluator(self.entitlements)
+        records = [record(i, [(GROUP0, GROUP2)[i % 2]]) for i in range(1000)] + [{"id": "no acl"}]
+        visible = evaluator.filter_records(records, "alice@contoso.com")
+        self.assertEqual([record["id"] for record in records[:1000:2]], [record["id"] for record in visible])
+        self.assertEqual(1, self.group_requests())
+        self.assertEqual([], evaluator.filter_records(records, "alice@contoso.com", owner=True))
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
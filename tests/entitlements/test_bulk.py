@@ -0,0 +1,133 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+
+"""Test cases for bulk entitlements operations"""
+
+import time
+from unittest.case import TestCase
+
+import mock
+import requests
+from nose2.tools import params
+
+from osdu._ratelimit import TokenBucket
+from osdu.client import OsduClient
+from osdu.entitlements import EntitlementsClient
+from osdu.entitlements._bulk import run_bulk
+from osdu.testing import (
+    FakeEntitlements,
+    FakeOsduServer,
+    Faults,
+    StaticTokenCredential,
+    SyntheticDataset,
+)
+
+GROUP0, GROUP1 = (f"data.fake{i}.viewers@opendes.contoso.com" for i in range(2))
+
+
+class TestBulkMembers(TestCase):
+    """Test cases for EntitlementsClient bulk member operations"""
+
+    def setUp(self):
+        entitlements = FakeEntitlements(groups=2, members_per_group=2)
+        self.server = FakeOsduServer(SyntheticDataset(records=1), entitlements).start()
+        self.entitlements = EntitlementsClient(OsduClient(self.server.url, "opendes", StaticTokenCredential()))
+
+    def tearDown(self):
+        self.server.stop()
+
+    def members(self, group: str) -> dict:
+        """Role of each member of group"""
+        members = self.entitlements.list_group_members(group)["members"]
+        return {member["email"]: member["role"] for member in members}
+
+    def test_add(self):
+        """Test members are added and existing members count as success"""
+        items = [(f"new{i}@contoso.com", group, "MEMBER") for i in range(10) for group in (GROUP0, GROUP1)]
+        items.append(("user0@contoso.com", GROUP0, "OWNER"))
+        report = self.entitlements.add_members_to_groups(items, max_workers=4)
+        self.assertEqual(21, len(report.succeeded))
+        self.assertEqual([], report.failed)
+        self.assertEqual(409, report.results[-1].status_code)
+        self.assertEqual(items, [result.item for result in report.results])
+        self.assertEqual(12, len(self.members(GROUP0)))
+
+    def test_remove(self):
+        """Test members are removed and missing members count as success"""
+        report = self.entitlements.remove_members_from_groups(
+            [("user1@contoso.com", GROUP0), ("user1@contoso.com", GROUP1), ("nobody@contoso.com", GROUP0)]
+        )
+        self.assertTrue(all(result.ok for result in report.results))
+        self.assertEqual(404, report.results[2].status_code)
+        self.assertEqual({"user0@contoso.com": "OWNER"}, self.members(GROUP1))
+
+    def test_partial_failure(self):
+        """Test failed items are reported rather than raised"""
+        report = self.entitlements.add_members_to_groups(
+            [("a@contoso.com", GROUP0, "MEMBER"), ("a@contoso.com", "missing@opendes.contoso.com", "MEMBER")]
+        )
+        self.assertEqual(1, len(report.failed))
+        failed = report.failed[0]
+        self.assertEqual((404, 1), (failed.status_code, failed.attempts))
+        self.assertIsInstance(failed.error, requests.HTTPError)
+
+    def test_transient_failures_retried(self):
+        """Test throttled requests are retried"""
+        self.server.faults = Faults(status_429_rate=0.3, retry_after=0, seed=2)
+        items = [(f"new{i}@contoso.com", GROUP0, "MEMBER") for i in range(20)]
+        with mock.patch("osdu.entitlements._bulk.retry_delay", return_value=0):
+            report = self.entitlements.add_members_to_groups(items, retries=10)
+        self.assertEqual([], report.failed)
+        self.assertTrue(any(result.attempts > 1 for result in report.results))
+        self.assertEqual(22, len(self.members(GROUP0)))
+
+    def test_client_retries_not_multiplied(self):
+        """Test the client doesn't retry bulk calls as well, so every attempt takes a token"""
+        self.server.faults = Faults(status_503_rate=1, retry_after=0)
+        entitlements = EntitlementsClient(OsduClient(self.server.url, "opendes", StaticTokenCredential(), retries=3))
+        items = [(f"new{i}@contoso.com", GROUP0, "MEMBER") for i in range(4)]
+        with mock.patch("osdu.entitlements._bulk.retry_delay", return_value=0):
+            with mock.patch.object(TokenBucket, "acquire", return_value=0.0) as acquire:
+                report = entitlements.add_members_to_groups(items, rate=100, retries=2)
+        self.assertEqual([3] * 4, [result.attempts for result in report.failed])
+        posts = sum(count for (method, _, _), count in self.server.request_counts.items() if method == "POST")
+        self.assertEqual((12, 12), (posts, acquire.call_count))
+
+
+class TestRunBulk(TestCase):
+    """Test cases for run_bulk"""
+
+    @params(requests.ConnectionError(), requests.Timeout())
+    def test_connection_errors_retried(self, error):
+        """Test connection errors are retried until retries run out"""
+        operation = mock.Mock(side_effect=error)
+        with mock.patch("osdu.entitlements._bulk.retry_delay", return_value=0):
+            report = run_bulk(operation, [("a",)], retries=2)
+        result = report.results[0]
+        self.assertEqual((False, None, 3), (result.ok, result.status_code, result.attempts))
+
+    def test_unexpected_error_reported(self):
+        """Test other errors fail the item without retrying"""
+        report = run_bulk(mock.Mock(side_effect=ValueError("bad")), [("a",), ("b",)])
+        self.assertEqual([1, 1], [result.attempts for result in report.failed])
+
+    def test_rate_limited(self):
+        """Test a rate limit spaces calls once the burst is used"""
+        start = time.perf_counter()
+        run_bulk(mock.Mock(), [(i,) for i in range(6)], max_workers=6, rate=20)
+        # burst of 20 tokens covers all calls
+        self.assertLess(time.perf_counter() - start, 0.2)
+        start = time.perf_counter()
+        run_bulk(mock.Mock(), [(i,) for i in range(14)], max_workers=6, rate=10)
+        # 10 immediately then one every 0.1s
+        self.assertGreaterEqual(time.perf_counter() - start, 0.35)
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
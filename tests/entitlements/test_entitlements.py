@@ -7,6 +7,11 @@
 
 """Test cases for entitlements client"""
 
+import os
+import pickle
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest.case import TestCase
 
 import mock
@@ -17,6 +22,7 @@ from osdu.client import OsduClient
 from osdu.entitlements import EntitlementsClient
 from osdu.entitlements._client import VALID_ENTITLEMENTS_API_VERSIONS
 from osdu.identity import OsduTokenCredential
+from osdu.testing import FakeEntitlements, FakeOsduServer, StaticTokenCredential, SyntheticDataset
 
 
 def create_dummy_client(server_url="http://www.test.com"):
@@ -144,8 +150,51 @@ class TestEntitlementsClient(TestCase):
 
             _ = entitlements_client.list_group_members("group1@asdf.com")
 
+    @params(
+        ({"role": "OWNER"}, "?role=OWNER"),
+        ({"limit": 10, "cursor": "abc"}, "?limit=10&cursor=abc"),
+    )
+    def test_list_group_members_parameters(self, kwargs, expected_query):
+        """Test optional parameters are passed in the query string"""
+        with mock.patch("osdu.client.OsduClient.get_returning_json", return_value={}) as mock_get_returning_json:
+            entitlements_client = EntitlementsClient(create_dummy_client())
+            entitlements_client.list_group_members("group1@asdf.com", **kwargs)
+            mock_get_returning_json.assert_called_with(
+                "http://www.test.com/api/entitlements/v2/groups/group1@asdf.com/members" + expected_query
+            )
+
     # endregion test list_group_members
 
+    # region test list_member_groups
+    def test_list_member_groups(self):
+        """Test the member groups endpoint is called with the group type"""
+        with mock.patch("osdu.client.OsduClient.get_returning_json", return_value={"groups": []}) as mock_get:
+            entitlements_client = EntitlementsClient(create_dummy_client())
+            self.assertEqual({"groups": []}, entitlements_client.list_member_groups("a@x.com", "DATA"))
+            mock_get.assert_called_with(
+                "http://www.test.com/api/entitlements/v2/members/a@x.com/groups?type=DATA"
+            )
+
+    # endregion test list_member_groups
+
+    # region test iter_group_members
+    def test_iter_group_members(self):
+        """Test pages are followed until there is no cursor"""
+        pages = [
+            {"members": [{"email": "a@x.com", "role": "OWNER"}, {"email": "b@x.com", "role": "MEMBER"}], "cursor": "2"},
+            {"members": [{"email": "c@x.com", "role": "MEMBER"}]},
+        ]
+        with mock.patch.object(EntitlementsClient, "list_group_members", side_effect=pages) as mock_list:
+            entitlements_client = EntitlementsClient(create_dummy_client())
+            members = list(entitlements_client.iter_group_members("group1@asdf.com", "MEMBER", 2))
+        self.assertEqual(["a@x.com", "b@x.com", "c@x.com"], [member["email"] for member in members])
+        self.assertEqual(
+            [mock.call("group1@asdf.com", "MEMBER", 2, None), mock.call("group1@asdf.com", "MEMBER", 2, "2")],
+            mock_list.call_args_list,
+        )
+
+    # endregion test iter_group_members
+
     # region test add_group
     @params("group1@asdf.com", "group2@asdf.com")
     def test_add_group_required_parameters(self, group):
@@ -166,7 +215,7 @@ class TestEntitlementsClient(TestCase):
 
             mock_post_returning_json.assert_called_once()
             mock_post_returning_json.assert_called_with(
-                "http://www.test.com/api/entitlements/v2/groups", request_data, [200, 201]
+                "http://www.test.com/api/entitlements/v2/groups", request_data, [200, 201], retries=None
             )
             self.assertEqual(expected_response_data, response_data)
 
@@ -192,7 +241,7 @@ class TestEntitlementsClient(TestCase):
 
             mock_post_returning_json.assert_called_once()
             mock_post_returning_json.assert_called_with(
-                "http://www.test.com/api/entitlements/v2/groups", request_data, [200, 201]
+                "http://www.test.com/api/entitlements/v2/groups", request_data, [200, 201], retries=None
             )
             self.assertEqual(expected_response_data, response_data)
 
@@ -223,7 +272,7 @@ class TestEntitlementsClient(TestCase):
 
             mock_delete.assert_called_once()
             mock_delete.assert_called_with(
-                f"http://www.test.com/api/entitlements/v2/groups/{group}", [200, 204]
+                f"http://www.test.com/api/entitlements/v2/groups/{group}", [200, 204], retries=None
             )
 
     @mock.patch.object(OsduClient, "delete", side_effect=HTTPError(1))
@@ -257,7 +306,7 @@ class TestEntitlementsClient(TestCase):
 
             mock_post_returning_json.assert_called_once()
             mock_post_returning_json.assert_called_with(
-                f"http://www.test.com/api/entitlements/v2/groups/{group}/members", request_data
+                f"http://www.test.com/api/entitlements/v2/groups/{group}/members", request_data, retries=None
             )
             self.assertEqual(expected_response_data, response_data)
 
@@ -296,6 +345,7 @@ class TestEntitlementsClient(TestCase):
             mock_delete.assert_called_with(
                 f"http://www.test.com/api/entitlements/v2/groups/{group}/members/{member}",
                 [204],
+                retries=None,
             )
 
     @mock.patch.object(OsduClient, "delete", side_effect=HTTPError(1))
@@ -309,6 +359,108 @@ class TestEntitlementsClient(TestCase):
     # endregion test remove_member_from_group
 
 
+class TestEntitlementsMemberIndex(TestCase):
+    """Test cases for the EntitlementsClient member index"""
+
+    def setUp(self):
+        entitlements = FakeEntitlements(groups=4, members_per_group=3)
+        self.server = FakeOsduServer(SyntheticDataset(records=1), entitlements).start()
+        self.client = OsduClient(self.server.url, "opendes", StaticTokenCredential())
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.path = os.path.join(self.directory.name, "members.json")
+
+    def tearDown(self):
+        self.server.stop()
+        self.directory.cleanup()
+
+    def member_requests(self) -> int:
+        """Number of list members requests made to the server"""
+        return self.server.request_counts.get(("GET", "entitlements", "groups/{id}/members"), 0)
+
+    def test_get_member_groups(self):
+        """Test the index is built once on first use"""
+        entitlements = EntitlementsClient(self.client)
+        groups = entitlements.get_member_groups("user0@contoso.com")
+        self.assertEqual(4, len(groups))
+        self.assertTrue(all(role == "OWNER" for role in groups.values()))
+        self.assertEqual({}, entitlements.get_member_groups("nobody@contoso.com"))
+        self.assertEqual(4, self.member_requests())
+        entitlements.get_member_groups("user1@contoso.com")
+        self.assertEqual(4, self.member_requests())
+
+    def test_get_member_groups_concurrent(self):
+        """Test concurrent first calls build the index once"""
+        entitlements = EntitlementsClient(self.client, member_index_path=self.path)
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(entitlements.get_member_groups, ["user0@contoso.com"] * 8))
+        self.assertEqual([4] * 8, [len(groups) for groups in results])
+        self.assertEqual(4, self.member_requests())
+
+    def test_updates(self):
+        """Test members added and removed through the client update the index"""
+        entitlements = EntitlementsClient(self.client)
+        entitlements.build_member_index()
+        group = "data.fake1.viewers@opendes.contoso.com"
+        entitlements.add_member_to_group("alice@contoso.com", group, "MEMBER")
+        self.assertEqual({group: "MEMBER"}, entitlements.get_member_groups("alice@contoso.com"))
+        entitlements.remove_member_from_group("alice@contoso.com", group)
+        self.assertEqual({}, entitlements.get_member_groups("alice@contoso.com"))
+        entitlements.delete_group(group)
+        self.assertNotIn(group, entitlements.get_member_groups("user0@contoso.com"))
+
+    def test_persisted(self):
+        """Test a saved index is loaded instead of built"""
+        entitlements = EntitlementsClient(self.client, member_index_path=self.path)
+        entitlements.get_member_groups("user0@contoso.com")
+        entitlements.add_member_to_group("alice@contoso.com", "data.fake0.viewers@opendes.contoso.com", "MEMBER")
+        entitlements.save_member_index()
+        requests = self.member_requests()
+
+        warm = EntitlementsClient(self.client, member_index_path=self.path)
+        self.assertEqual(4, len(warm.get_member_groups("user0@contoso.com")))
+        self.assertEqual(1, len(warm.get_member_groups("alice@contoso.com")))
+        self.assertEqual(requests, self.member_requests())
+
+    def test_persisted_too_old(self):
+        """Test a saved index older than the max age is rebuilt"""
+        EntitlementsClient(self.client, member_index_path=self.path).build_member_index()
+        time.sleep(0.02)
+        requests = self.member_requests()
+        entitlements = EntitlementsClient(self.client, member_index_path=self.path, member_index_max_age=0.01)
+        entitlements.get_member_groups("user0@contoso.com")
+        self.assertEqual(requests + 4, self.member_requests())
+
+    def test_iter_group_members_paged(self):
+        """Test members are paged from the server, filtered by role"""
+        entitlements = EntitlementsClient(self.client)
+        group = "data.fake0.viewers@opendes.contoso.com"
+        entitlements.add_members_to_groups([(f"new{i}@contoso.com", group, "MEMBER") for i in range(20)])
+        members = list(entitlements.iter_group_members(group, limit=6))
+        self.assertEqual(23, len({member["email"] for member in members}))
+        self.assertEqual(4, self.member_requests())
+        owners = list(entitlements.iter_group_members(group, role="OWNER", limit=6))
+        self.assertEqual([{"email": "user0@contoso.com", "role": "OWNER"}], owners)
+
+    def test_member_index_follows_pages(self):
+        """Test the index includes members returned on later pages"""
+        entitlements = EntitlementsClient(self.client)
+        list_group_members = entitlements.list_group_members
+        with mock.patch.object(
+            entitlements,
+            "list_group_members",
+            side_effect=lambda group, role=None, limit=None, cursor=None: list_group_members(group, role, 1, cursor),
+        ):
+            self.assertEqual(4, len(entitlements.get_member_groups("user2@contoso.com")))
+        self.assertEqual(12, self.member_requests())
+
+    def test_pickle(self):
+        """Test a client with a member index can be pickled"""
+        entitlements = EntitlementsClient(self.client)
+        entitlements.build_member_index()
+        entitlements = pickle.loads(pickle.dumps(entitlements))
+        self.assertEqual(4, len(entitlements.get_member_groups("user0@contoso.com")))
+
+
 if __name__ == "__main__":
     import nose2
 
@@ -0,0 +1,132 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+
+"""Test cases for the entitlements membership graph"""
+
+import time
+from unittest.case import TestCase
+
+import mock
+
+from osdu.client import OsduClient
+from osdu.entitlements import EntitlementsClient, MembershipGraph
+from osdu.testing import FakeEntitlements, FakeOsduServer, StaticTokenCredential, SyntheticDataset
+
+GROUP0, GROUP1, GROUP2 = (f"data.fake{i}.viewers@opendes.contoso.com" for i in range(3))
+
+
+class TestMembershipGraph(TestCase):
+    """Test cases for MembershipGraph"""
+
+    def setUp(self):
+        entitlements = FakeEntitlements(groups=3, members_per_group=2)
+        self.server = FakeOsduServer(SyntheticDataset(records=1), entitlements).start()
+        self.entitlements = EntitlementsClient(OsduClient(self.server.url, "opendes", StaticTokenCredential()))
+        # alice is in group2, which is in group1, which is in group0
+        self.entitlements.add_member_to_group("alice@contoso.com", GROUP2, "MEMBER")
+        self.entitlements.add_member_to_group(GROUP2, GROUP1, "MEMBER")
+        self.entitlements.add_member_to_group(GROUP1, GROUP0, "MEMBER")
+
+    def tearDown(self):
+        self.server.stop()
+
+    def member_requests(self) -> int:
+        """Number of list members requests made to the server"""
+        return self.server.request_counts.get(("GET", "entitlements", "groups/{id}/members"), 0)
+
+    def test_effective_groups(self):
+        """Test nested groups are resolved for a member"""
+        graph = MembershipGraph(self.entitlements)
+        self.assertEqual({GROUP0, GROUP1, GROUP2}, graph.effective_groups("alice@contoso.com"))
+        self.assertEqual({GROUP0}, graph.effective_groups(GROUP1))
+        self.assertEqual(frozenset(), graph.effective_groups("nobody@contoso.com"))
+        self.assertTrue(graph.is_member("alice@contoso.com", GROUP0))
+        self.assertFalse(graph.is_member(GROUP0, GROUP2))
+
+    def test_effective_members(self):
+        """Test nested groups are resolved for a group"""
+        graph = MembershipGraph(self.entitlements)
+        self.assertEqual(
+            {"alice@contoso.com", "user0@contoso.com", "user1@contoso.com"}, graph.effective_members(GROUP0)
+        )
+        self.assertEqual({GROUP1, GROUP2}, graph.effective_members(GROUP0, include_groups=True) & graph.groups)
+        self.assertEqual(
+            {"user0@contoso.com": "OWNER", "user1@contoso.com": "MEMBER", GROUP1: "MEMBER"},
+            graph.direct_members(GROUP0),
+        )
+
+    def test_queries_are_local(self):
+        """Test queries within the ttl don't call the service"""
+        graph = MembershipGraph(self.entitlements)
+        self.assertEqual(3, graph.refresh())
+        requests = self.member_requests()
+        for _ in range(10):
+            graph.effective_groups("alice@contoso.com")
+        self.assertEqual(requests, self.member_requests())
+        self.assertEqual(0, graph.refresh())
+
+    def test_incremental_refresh(self):
+        """Test only invalidated and new groups are fetched"""
+        graph = MembershipGraph(self.entitlements)
+        graph.refresh()
+        self.entitlements.remove_member_from_group("alice@contoso.com", GROUP2)
+        graph.invalidate(GROUP2)
+        self.assertEqual(1, graph.refresh())
+        self.assertEqual(frozenset(), graph.effective_groups("alice@contoso.com"))
+
+        self.entitlements.add_group("data.new.viewers", "new")
+        self.assertEqual(1, graph.refresh())
+        self.assertIn("data.new.viewers@opendes.contoso.com", graph.groups)
+        self.assertEqual(4, graph.refresh(force=True))
+
+    def test_ttl(self):
+        """Test queries refresh the graph once the ttl has passed"""
+        graph = MembershipGraph(self.entitlements, ttl=0.05)
+        graph.effective_groups("alice@contoso.com")
+        requests = self.member_requests()
+        time.sleep(0.06)
+        graph.effective_groups("alice@contoso.com")
+        self.assertEqual(requests + 3, self.member_requests())
+
+    def test_nested_groups_discovered(self):
+        """Test nested groups are fetched when starting from given groups"""
+        graph = MembershipGraph(self.entitlements, groups=[GROUP0])
+        self.assertEqual(3, graph.refresh())
+        self.assertEqual({GROUP0, GROUP1, GROUP2}, graph.groups)
+
+    def test_removed_nested_group_pruned(self):
+        """Test a nested group no longer reachable is dropped"""
+        graph = MembershipGraph(self.entitlements, groups=[GROUP0])
+        graph.refresh()
+        self.entitlements.remove_member_from_group(GROUP1, GROUP0)
+        graph.invalidate(GROUP0)
+        graph.refresh()
+        self.assertEqual({GROUP0}, graph.groups)
+        self.assertEqual(frozenset(), graph.effective_groups("alice@contoso.com"))
+
+    def test_members_follow_pages(self):
+        """Test members returned on later pages are in the graph"""
+        list_group_members = self.entitlements.list_group_members
+        with mock.patch.object(
+            self.entitlements,
+            "list_group_members",
+            side_effect=lambda group, role=None, limit=None, cursor=None: list_group_members(group, role, 1, cursor),
+        ):
+            graph = MembershipGraph(self.entitlements)
+            self.assertEqual({GROUP0, GROUP1, GROUP2}, graph.effective_groups("alice@contoso.com"))
+
+    def test_cycle(self):
+        """Test cyclic nesting terminates"""
+        self.entitlements.add_member_to_group(GROUP0, GROUP2, "MEMBER")
+        graph = MembershipGraph(self.entitlements)
+        self.assertEqual({GROUP0, GROUP1, GROUP2}, graph.effective_groups(GROUP0))
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
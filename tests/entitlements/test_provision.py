@@ -0,0 +1,87 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+
+"""Test cases for provisioning entitlements groups from a manifest"""
+
+from unittest.case import TestCase
+
+import mock
+import requests
+
+from osdu.client import OsduClient
+from osdu.entitlements import EntitlementsClient
+from osdu.testing import FakeEntitlements, FakeOsduServer, StaticTokenCredential, SyntheticDataset
+
+DOMAIN = "opendes.contoso.com"
+
+
+def manifest(projects: int) -> dict:
+    """Viewers and owners groups for each project, with the owners nested in the viewers"""
+    groups = {}
+    for project in range(projects):
+        viewers, owners = (f"data.project{project}.{name}@{DOMAIN}" for name in ("viewers", "owners"))
+        groups[viewers] = {"description": f"project {project} viewers", "members": [owners, "alice@contoso.com"]}
+        groups[owners] = {"description": f"project {project} owners", "members": {"bob@contoso.com": "OWNER"}}
+    return {"groups": groups}
+
+
+class TestProvisionGroups(TestCase):
+    """Test cases for EntitlementsClient.provision_groups"""
+
+    def setUp(self):
+        self.server = FakeOsduServer(SyntheticDataset(records=1), FakeEntitlements(groups=0)).start()
+        self.entitlements = EntitlementsClient(OsduClient(self.server.url, "opendes", StaticTokenCredential()))
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_provision(self):
+        """Test groups are created with their members and nested groups"""
+        report = self.entitlements.provision_groups(manifest(10), max_workers=4)
+        self.assertEqual([], report.failed)
+        self.assertEqual((20, 30, []), (len(report.groups.results), len(report.members.results), report.skipped))
+        self.assertGreater(report.groups_per_s, 0)
+        self.assertGreater(report.calls_per_s, 0)
+        self.assertEqual(20, len(self.entitlements.list_groups()["groups"]))
+        members = self.entitlements.list_group_members(f"data.project3.viewers@{DOMAIN}")["members"]
+        self.assertEqual({f"data.project3.owners@{DOMAIN}", "alice@contoso.com"}, {m["email"] for m in members})
+
+    def test_idempotent(self):
+        """Test provisioning again succeeds without changes"""
+        self.entitlements.provision_groups(manifest(3))
+        report = self.entitlements.provision_groups(manifest(3))
+        self.assertEqual([], report.failed)
+        self.assertTrue(all(result.status_code == 409 for result in report.groups.results + report.members.results))
+
+    def test_failed_group_skipped(self):
+        """Test memberships of a group that couldn't be created are skipped"""
+        add_group = self.entitlements.add_group
+        response = requests.Response()
+        response.status_code = 400
+
+        def failing_add_group(name, description=None, retries=None):
+            if name == "data.project1.owners":
+                raise requests.HTTPError(response=response)
+            return add_group(name, description, retries)
+
+        with mock.patch.object(self.entitlements, "add_group", side_effect=failing_add_group):
+            report = self.entitlements.provision_groups(manifest(2))
+        self.assertEqual([("data.project1.owners", "project 1 owners")], [result.item for result in report.failed])
+        self.assertEqual(
+            [
+                (f"data.project1.owners@{DOMAIN}", f"data.project1.viewers@{DOMAIN}", "MEMBER"),
+                ("bob@contoso.com", f"data.project1.owners@{DOMAIN}", "OWNER"),
+            ],
+            report.skipped,
+        )
+        self.assertEqual(4, len(report.members.results))
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
@@ -0,0 +1,129 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+
+"""Test cases for entitlements reconciliation"""
+
+import json
+import os
+import tempfile
+from unittest.case import TestCase
+
+from nose2.tools import params
+
+from osdu.client import OsduClient
+from osdu.entitlements import EntitlementsClient, read_desired_state
+from osdu.entitlements._reconcile import desired_groups, plan_reconcile
+from osdu.testing import FakeEntitlements, FakeOsduServer, StaticTokenCredential, SyntheticDataset
+
+GROUP0, GROUP1 = (f"data.fake{i}.viewers@opendes.contoso.com" for i in range(2))
+NEW_GROUP = "data.new.viewers@opendes.contoso.com"
+
+
+class TestPlanReconcile(TestCase):
+    """Test cases for planning a reconcile"""
+
+    def test_plan(self):
+        """Test only the differences are planned"""
+        current = {GROUP0: {"a@x.com": "OWNER", "b@x.com": "MEMBER", "c@x.com": "MEMBER"}}
+        desired = desired_groups(
+            {
+                "groups": {
+                    GROUP0: {"members": {"a@x.com": "owner", "b@x.com": "OWNER", "d@x.com": "MEMBER"}},
+                    NEW_GROUP: {"description": "new", "members": ["a@x.com"]},
+                }
+            }
+        )
+        plan = plan_reconcile(current, desired, prune=[GROUP0, GROUP1])
+        self.assertEqual([("data.new.viewers", "new")], plan.add_groups)
+        self.assertEqual([("b@x.com", GROUP0), ("c@x.com", GROUP0)], plan.remove_members)
+        self.assertEqual(
+            [("b@x.com", GROUP0, "OWNER"), ("d@x.com", GROUP0, "MEMBER"), ("a@x.com", NEW_GROUP, "MEMBER")],
+            plan.add_members,
+        )
+        self.assertEqual([(GROUP1,)], plan.delete_groups)
+        self.assertEqual(7, plan.changes)
+
+    def test_no_changes(self):
+        """Test a group already in the desired state needs no calls"""
+        current = {GROUP0: {"a@x.com": "OWNER"}}
+        plan = plan_reconcile(current, desired_groups({"groups": {GROUP0: {"members": {"a@x.com": "OWNER"}}}}))
+        self.assertEqual(0, plan.changes)
+
+    def test_ignore_members(self):
+        """Test ignored members are neither added nor removed"""
+        current = {GROUP0: {"me@x.com": "OWNER"}}
+        desired = desired_groups({"groups": {GROUP0: {"members": ["a@x.com"]}, NEW_GROUP: None}})
+        plan = plan_reconcile(current, desired, ignore_members=["me@x.com"])
+        self.assertEqual([], plan.remove_members)
+        self.assertEqual([("a@x.com", GROUP0, "MEMBER")], plan.add_members)
+
+    @params(".json", ".yaml")
+    def test_read_desired_state(self, extension):
+        """Test desired state is read from json and yaml"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "groups" + extension)
+            with open(path, "w", encoding="utf8") as file:
+                # json is valid yaml
+                json.dump({"groups": {GROUP0: {"members": ["a@x.com"]}}}, file)
+            self.assertEqual({"groups": {GROUP0: {"members": ["a@x.com"]}}}, read_desired_state(path))
+
+
+class TestReconcile(TestCase):
+    """Test cases for EntitlementsClient.reconcile"""
+
+    def setUp(self):
+        entitlements = FakeEntitlements(groups=2, members_per_group=3)
+        self.server = FakeOsduServer(SyntheticDataset(records=1), entitlements).start()
+        self.entitlements = EntitlementsClient(OsduClient(self.server.url, "opendes", StaticTokenCredential()))
+        self.desired = {
+            "groups": {
+                GROUP0: {"members": {"user0@contoso.com": "OWNER", "user1@contoso.com": "OWNER"}},
+                NEW_GROUP: {"description": "new", "members": ["alice@contoso.com", GROUP0]},
+            }
+        }
+
+    def tearDown(self):
+        self.server.stop()
+
+    def members(self, group: str) -> dict:
+        """Role of each member of group"""
+        members = self.entitlements.list_group_members(group)["members"]
+        return {member["email"]: member["role"] for member in members}
+
+    def test_dry_run(self):
+        """Test a dry run only plans"""
+        report = self.entitlements.reconcile(self.desired, dry_run=True, prune_prefix="data.fake")
+        self.assertEqual((1, 2, 3, 1), tuple(len(calls) for calls in report.plan))
+        self.assertEqual({}, report.results)
+        self.assertEqual({"fetch", "plan"}, set(report.timings))
+        self.assertEqual(3, len(self.members(GROUP0)))
+
+    def test_reconcile(self):
+        """Test the groups reach the desired state and a second run changes nothing"""
+        report = self.entitlements.reconcile(self.desired, prune_prefix="data.fake")
+        self.assertEqual([], report.failed)
+        self.assertEqual(
+            {"fetch", "plan", "add_groups", "remove_members", "add_members", "delete_groups"}, set(report.timings)
+        )
+        self.assertEqual({"user0@contoso.com": "OWNER", "user1@contoso.com": "OWNER"}, self.members(GROUP0))
+        self.assertEqual({"alice@contoso.com": "MEMBER", GROUP0: "MEMBER"}, self.members(NEW_GROUP))
+        groups = {group["email"] for group in self.entitlements.list_groups()["groups"]}
+        self.assertEqual({GROUP0, NEW_GROUP}, groups)
+
+        self.assertEqual(0, self.entitlements.reconcile(self.desired, prune_prefix="data.fake").plan.changes)
+
+    def test_no_prune(self):
+        """Test groups are only deleted with a prune prefix"""
+        self.entitlements.reconcile(self.desired)
+        groups = {group["email"] for group in self.entitlements.list_groups()["groups"]}
+        self.assertIn(GROUP1, groups)
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
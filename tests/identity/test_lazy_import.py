@@ -0,0 +1,66 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+
+"""Test cases for lazily importing credentials"""
+
+import os
+import subprocess
+import sys
+from unittest.case import TestCase
+
+import osdu.identity
+from osdu.identity import OsduMsalInteractiveCredential
+from osdu.identity._credential.msal_interactive import (
+    OsduMsalInteractiveCredential as MsalInteractiveCredential,
+)
+
+
+def _modules_after(code: str) -> set:
+    """Modules loaded by a fresh interpreter after running code"""
+    result = subprocess.run(
+        [sys.executable, "-c", code + "\nimport sys\nprint('\\n'.join(sys.modules))"],
+        capture_output=True,
+        check=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+    return set(result.stdout.split())
+
+
+class TestLazyImport(TestCase):
+    """Test cases for lazily importing credentials"""
+
+    def test_msal_not_imported(self):
+        """Test msal isn't loaded unless an msal credential is used"""
+        modules = _modules_after(
+            "from osdu.identity import OsduTokenCredential, OsduEnvironmentCredential\n"
+            "import osdu.client, osdu.search, osdu.entitlements"
+        )
+        self.assertIn("osdu.identity._credential.token", modules)
+        self.assertNotIn("msal", modules)
+        self.assertNotIn("cProfile", modules)
+
+    def test_msal_imported_on_use(self):
+        """Test msal is loaded when an msal credential is imported"""
+        modules = _modules_after("from osdu.identity import OsduMsalNonInteractiveCredential")
+        self.assertIn("msal", modules)
+
+    def test_attribute(self):
+        """Test lazily loaded credentials are the classes in their modules"""
+        self.assertIs(MsalInteractiveCredential, OsduMsalInteractiveCredential)
+        self.assertIn("OsduTokenCredential", dir(osdu.identity))
+
+    def test_unknown_attribute(self):
+        """Test unknown names raise AttributeError"""
+        with self.assertRaises(AttributeError):
+            osdu.identity.OsduUnknownCredential  # pylint: disable=pointless-statement
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
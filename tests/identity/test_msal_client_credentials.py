@@ -6,12 +6,17 @@
 
 
 """Test cases for get token OSDU client"""
+import functools
 import json
+import multiprocessing
+import pickle
 
 import mock
+import msal
 
 from unittest.case import TestCase
 from osdu.identity import OsduMsalNonInteractiveCredential
+from osdu.testing import FAKE_AUTHORITY_BASE, FakeAuthorityHttpClient, FakeOsduServer
 
 
 class TestOsduMsalNonInteractiveCredential(TestCase):
@@ -31,6 +36,108 @@ class TestOsduMsalNonInteractiveCredential(TestCase):
         self.assertEqual('token', self.auth.get_token())
 
 
+class TestOsduMsalNonInteractiveCredentialPickle(TestCase):
+    """Test cases for pickling and forking the msal client credentials"""
+
+    def setUp(self):
+        self.server = FakeOsduServer().start()
+        self.authority = FAKE_AUTHORITY_BASE + "/tenant"
+        self.factory = functools.partial(_application, self.server.url, self.authority)
+        # msal's default in memory TokenCache, not a SerializableTokenCache
+        self.credential = OsduMsalNonInteractiveCredential(
+            "client", "secret", self.authority, "scope", self.factory(msal.TokenCache()), self.factory
+        )
+        self.credential.get_token()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def _token_requests(self) -> int:
+        counts = self.server.request_counts.items()
+        return sum(count for (_, _, endpoint), count in counts if endpoint.endswith("oauth2/v2.0/token"))
+
+    def test_pickle_keeps_cached_token(self):
+        """Test the unpickled credential recreates the msal client with the cached token"""
+        copy = pickle.loads(pickle.dumps(self.credential))
+        self.assertEqual("token", copy.get_token())
+        self.assertEqual(1, self._token_requests())
+        self.assertEqual(("client", "secret", self.authority), (copy.client_id, copy.client_secret, copy.authority))
+
+    def test_fork_recreates_client(self):
+        """Test a forked child recreates the msal client, keeping the cached token"""
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        child = context.Process(target=_child_token, args=(self.credential, results))
+        child.start()
+        child.join(30)
+        self.assertEqual(("token", True), results.get(timeout=5))
+        self.assertEqual(1, self._token_requests())
+
+    def test_fork_before_first_use(self):
+        """Test a credential without an msal client yet can be used after forking"""
+        credential = OsduMsalNonInteractiveCredential("client", "secret", self.authority, "scope", None)
+        application = functools.partial(
+            msal.ConfidentialClientApplication,
+            http_client=FakeAuthorityHttpClient(self.server.url),
+            instance_discovery=False,
+        )
+        copy = pickle.loads(pickle.dumps(self.credential))
+        with mock.patch(
+            "osdu.identity._credential.msal_non_interactive.ConfidentialClientApplication", application
+        ):
+            with mock.patch("osdu.identity._credential.msal_non_interactive.os.getpid", return_value=0):
+                self.assertIsNotNone(credential.msal_confidential_client)
+                self.assertEqual("token", copy.get_token())
+
+    def test_client_without_factory_rebuilt(self):
+        """Test a credential given a client but no factory rebuilds it with the cached token, warning"""
+        credential = OsduMsalNonInteractiveCredential(
+            "client", "secret", self.authority, "scope", self.factory(None)
+        )
+        credential.get_token()
+        application = functools.partial(
+            msal.ConfidentialClientApplication,
+            http_client=FakeAuthorityHttpClient(self.server.url),
+            instance_discovery=False,
+        )
+        copy = pickle.loads(pickle.dumps(credential))
+        with mock.patch(
+            "osdu.identity._credential.msal_non_interactive.ConfidentialClientApplication", application
+        ):
+            with self.assertLogs("osdu.identity._credential.msal_non_interactive", "WARNING"):
+                self.assertEqual("token", copy.get_token())
+            credential._before_fork()  # pylint: disable=protected-access
+            with mock.patch("osdu.identity._credential.msal_non_interactive.os.getpid", return_value=0):
+                with self.assertLogs("osdu.identity._credential.msal_non_interactive", "WARNING"):
+                    self.assertEqual("token", credential.get_token())
+        self.assertEqual(2, self._token_requests())
+
+    def test_fork_hook_registered_once(self):
+        """Test creating and unpickling credentials doesn't register more fork handlers"""
+        with mock.patch("osdu.identity._credential.msal_non_interactive.os.register_at_fork") as register:
+            pickle.loads(pickle.dumps(self.credential))
+            OsduMsalNonInteractiveCredential("client", "secret", self.authority, "scope", None)
+        register.assert_not_called()
+
+
+def _application(server_url: str, authority: str, token_cache: msal.TokenCache) -> msal.ConfidentialClientApplication:
+    """msal client sending its requests to the fake server, msal needs an https authority"""
+    return msal.ConfidentialClientApplication(
+        "client",
+        client_credential="secret",
+        authority=authority,
+        http_client=FakeAuthorityHttpClient(server_url),
+        instance_discovery=False,
+        token_cache=token_cache,
+    )
+
+
+def _child_token(credential: OsduMsalNonInteractiveCredential, results: multiprocessing.Queue):
+    """Get a token in a forked child, reporting whether the msal client was recreated"""
+    client = credential._msal_confidential_client  # pylint: disable=protected-access
+    results.put((credential.get_token(), client is not credential.msal_confidential_client))
+
+
 if __name__ == "__main__":
     import nose2
 
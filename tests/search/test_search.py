@@ -14,6 +14,8 @@ from nose2.tools import params
 from requests.models import HTTPError
 
 from osdu.client import OsduClient
+from osdu.deadline import Deadline
+from osdu.exceptions import DeadlineExceededError
 from osdu.identity import OsduTokenCredential
 from osdu.search import SearchClient
 from osdu.search._client import VALID_SEARCH_API_VERSIONS
@@ -331,6 +333,69 @@ class TestSearchClient(TestCase):
 
     # endregion test query_by_kind
 
+    # region test query_with_cursor
+    def test_query_with_cursor(self):
+        """Test the query_with_cursor function"""
+        request_data = {
+            "kind": "kind1",
+            "query": "data.Name:x",
+            "limit": 10,
+            "cursor": "abc",
+            "returnedFields": ["id"],
+        }
+        expected_response_data = {"results": [], "cursor": None}
+        deadline = Deadline(10)
+        with mock.patch(
+            "osdu.client.OsduClient.post_returning_json", return_value=expected_response_data
+        ) as mock_post_returning_json:
+            search_client = SearchClient(create_dummy_client())
+
+            response_data = search_client.query_with_cursor(
+                "kind1", "data.Name:x", 10, "abc", ["id"], deadline
+            )
+
+            mock_post_returning_json.assert_called_once_with(
+                "http://www.test.com/api/search/v2/query_with_cursor", request_data,
+                deadline=deadline
+            )
+            self.assertEqual(expected_response_data, response_data)
+
+    def test_iter_query_records_follows_cursor(self):
+        """Test iter_query_records follows the cursor until exhausted"""
+        pages = [
+            {"results": [{"id": 1}, {"id": 2}], "cursor": "c1"},
+            {"results": [{"id": 3}], "cursor": "c2"},
+            {"results": [], "cursor": None},
+        ]
+        with mock.patch(
+            "osdu.client.OsduClient.post_returning_json", side_effect=pages
+        ) as mock_post_returning_json:
+            search_client = SearchClient(create_dummy_client())
+
+            records = list(search_client.iter_query_records("kind1", limit=2))
+
+            self.assertEqual([{"id": 1}, {"id": 2}, {"id": 3}], records)
+            self.assertEqual(3, mock_post_returning_json.call_count)
+            self.assertEqual("c2", mock_post_returning_json.call_args[0][1]["cursor"])
+
+    def test_iter_query_pages_deadline_exceeded(self):
+        """Test a cursor scan stops once its deadline is exceeded"""
+        response_mock = mock.Mock(status_code=200)
+        response_mock.json.return_value = {"results": [{"id": 1}], "cursor": "c1"}
+        with mock.patch("requests.Session.request", return_value=response_mock), mock.patch.object(
+            OsduClient, "get_headers", return_value={}
+        ):
+            search_client = SearchClient(create_dummy_client())
+            deadline = Deadline(10)
+
+            iterator = search_client.iter_query_pages("kind1", deadline=deadline)
+            next(iterator)
+            with mock.patch("osdu.deadline.time.monotonic", return_value=float("inf")):
+                with self.assertRaises(DeadlineExceededError):
+                    next(iterator)
+
+    # endregion test query_with_cursor
+
 
 if __name__ == "__main__":
     import nose2
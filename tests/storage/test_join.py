@@ -0,0 +1,108 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+
+"""Test cases for the search then fetch pipeline"""
+
+import time
+from unittest.case import TestCase
+
+import mock
+from requests.models import HTTPError
+
+from osdu.client import OsduClient
+from osdu.deadline import Deadline
+from osdu.search import SearchClient
+from osdu.storage import StorageClient, search_and_fetch
+from osdu.testing import (
+    FakeOsduServer,
+    FakeStorage,
+    StaticTokenCredential,
+    SyntheticDataset,
+    constant_latency,
+)
+
+KIND = "osdu:wks:master-data--Well:1.0.0"
+
+
+class TestSearchAndFetch(TestCase):
+    """Test cases for search_and_fetch"""
+
+    def setUp(self):
+        self.dataset = SyntheticDataset(records=2000)
+        # storage only has the first 1800 records
+        storage = FakeStorage(SyntheticDataset(records=1800))
+        self.server = FakeOsduServer(self.dataset, storage=storage, latency=constant_latency(0.005)).start()
+        client = OsduClient(self.server.url, "opendes", StaticTokenCredential())
+        self.search = SearchClient(client)
+        self.storage = StorageClient(client)
+        self.expected = [record["id"] for record in self.dataset.records if record["kind"] == KIND]
+
+    def tearDown(self):
+        self.server.stop()
+
+    def page_requests(self) -> int:
+        """Number of search pages requested"""
+        return self.server.request_counts.get(("POST", "search", "query_with_cursor"), 0)
+
+    def test_ordered(self):
+        """Test the records are fetched in search order with missing records separated"""
+        batches = list(search_and_fetch(self.search, self.storage, KIND, page_size=100, max_workers=4))
+        fetched = [record["id"] for batch in batches for record in batch.records]
+        invalid = [record_id for batch in batches for record_id in batch.invalid_records]
+        self.assertEqual([i for i in self.expected if int(i.rsplit(":", 1)[1]) < 1800], fetched)
+        self.assertEqual([i for i in self.expected if int(i.rsplit(":", 1)[1]) >= 1800], invalid)
+        self.assertIn("data", batches[0].records[0])
+
+    def test_unordered(self):
+        """Test unordered output contains every record"""
+        batches = list(search_and_fetch(self.search, self.storage, KIND, page_size=300, batch_size=50, ordered=False))
+        fetched = [record["id"] for batch in batches for record in batch.records]
+        fetched += [record_id for batch in batches for record_id in batch.invalid_records]
+        self.assertEqual(sorted(self.expected), sorted(fetched))
+
+    def test_pipelined(self):
+        """Test records are yielded before the search is exhausted, with bounded read ahead"""
+        batches = search_and_fetch(self.search, self.storage, KIND, page_size=50, max_workers=1, max_pending_pages=1)
+        next(batches)
+        self.assertLess(self.page_requests(), 10)
+        batches.close()
+        time.sleep(0.1)
+        requests = self.page_requests()
+        time.sleep(0.1)
+        self.assertEqual(requests, self.page_requests())
+
+    def test_deadline_passed_to_storage(self):
+        """Test the deadline also applies to the storage calls"""
+        deadline = Deadline(60)
+        query_records = self.storage.query_records
+        deadlines = []
+
+        def query(ids, call_deadline=None):
+            deadlines.append(call_deadline)
+            return query_records(ids, call_deadline)
+
+        with mock.patch.object(self.storage, "query_records", side_effect=query):
+            list(search_and_fetch(self.search, self.storage, KIND, page_size=500, deadline=deadline))
+        self.assertTrue(deadlines)
+        self.assertTrue(all(call_deadline is deadline for call_deadline in deadlines))
+
+    def test_search_error(self):
+        """Test a search error is raised to the consumer"""
+
+        def pages(*_):
+            yield {"results": [{"id": self.expected[0]}], "cursor": "1"}
+            raise HTTPError("search failed")
+
+        with mock.patch.object(self.search, "iter_query_pages", side_effect=pages):
+            with self.assertRaises(HTTPError):
+                list(search_and_fetch(self.search, self.storage, KIND))
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
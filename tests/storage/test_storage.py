@@ -0,0 +1,307 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+
+"""Test cases for storage client"""
+
+import json
+import math
+from unittest.case import TestCase
+
+import mock
+import requests
+from nose2.tools import params
+from requests.models import HTTPError
+
+from osdu.client import OsduClient
+from osdu.storage import RecordBatch, StorageClient
+from osdu.testing import Faults, FakeOsduServer, FakeStorage, StaticTokenCredential, SyntheticDataset
+
+
+def new_record(index: int, size: int = 10) -> dict:
+    """Record with the fields the storage service requires"""
+    return {
+        "id": f"opendes:wb:{index}",
+        "kind": "osdu:wks:master-data--Wellbore:1.0.0",
+        "acl": {"viewers": ["data.default.viewers@opendes.contoso.com"], "owners": []},
+        "legal": {"legaltags": ["opendes-public"], "otherRelevantDataCountries": ["NO"]},
+        "data": {"Description": "x" * size},
+    }
+
+
+class TestStorageClient(TestCase):
+    """Test cases for StorageClient"""
+
+    def setUp(self):
+        self.server = FakeOsduServer(SyntheticDataset(records=1000)).start()
+        self.storage = StorageClient(OsduClient(self.server.url, "opendes", StaticTokenCredential()))
+        self.ids = [record["id"] for record in self.server.dataset.records]
+
+    def tearDown(self):
+        self.server.stop()
+
+    def query_requests(self) -> int:
+        """Number of batch requests made to the server"""
+        return self.server.request_counts.get(("POST", "storage", "query/records"), 0)
+
+    @params((2, 2), ("latest", 2))
+    def test_init(self, service_version, expected):
+        """Test the service version"""
+        storage = StorageClient(self.storage._client, service_version)  # pylint: disable=protected-access
+        self.assertEqual(expected, storage.service_version)
+        self.assertEqual(f"{self.server.url}/api/storage/v2/", storage.api_url())
+
+    def test_is_healthy(self):
+        """Test the liveness check"""
+        self.assertTrue(self.storage.is_healthy())
+
+    def test_get_record(self):
+        """Test getting a single record"""
+        record = self.storage.get_record(self.ids[3])
+        self.assertEqual((self.ids[3], 1), (record["id"], record["version"]))
+        with self.assertRaises(HTTPError):
+            self.storage.get_record("opendes:wb:missing")
+
+    def test_get_records(self):
+        """Test records are fetched in ordered batches with invalid ids separated"""
+        ids = self.ids[:450] + ["opendes:wb:missing"]
+        batches = list(self.storage.get_records(iter(ids), max_workers=4))
+        self.assertEqual(5, len(batches))
+        self.assertEqual(ids[:450], [record["id"] for batch in batches for record in batch.records])
+        self.assertEqual(["opendes:wb:missing"], batches[-1].invalid_records)
+        self.assertEqual(5, self.query_requests())
+
+    def test_get_records_unordered(self):
+        """Test unordered batches contain every record"""
+        batches = list(self.storage.get_records(self.ids, batch_size=30, ordered=False))
+        self.assertEqual(sorted(self.ids), sorted(record["id"] for batch in batches for record in batch.records))
+
+    @mock.patch("osdu.storage._client.retry_delay", return_value=0)
+    def test_get_records_retry(self, _):
+        """Test ids returned as retryRecords are fetched again"""
+        self.server.storage.retry_ids.update(self.ids[:3])
+        batches = list(self.storage.get_records(self.ids[:10]))
+        self.assertEqual([RecordBatch(batches[0].records, [], [])], batches)
+        self.assertEqual(sorted(self.ids[:10]), sorted(record["id"] for record in batches[0].records))
+        self.assertEqual(2, self.query_requests())
+
+    @mock.patch("osdu.storage._client.retry_delay", return_value=0)
+    def test_get_records_retries_exhausted(self, _):
+        """Test ids still failing after the retries are reported"""
+        with mock.patch.object(
+            self.storage, "query_records", return_value={"records": [], "retryRecords": ["opendes:wb:1"]}
+        ) as query_records:
+            batches = list(self.storage.get_records(["opendes:wb:1"], retries=2))
+        self.assertEqual([RecordBatch([], [], ["opendes:wb:1"])], batches)
+        self.assertEqual(3, query_records.call_count)
+
+    @params({"batch_size": 0}, {"batch_size": 101}, {"max_workers": 0})
+    def test_get_records_invalid(self, kwargs):
+        """Test invalid arguments are rejected when called, not when iterated"""
+        with self.assertRaises(ValueError):
+            self.storage.get_records(self.ids, **kwargs)
+
+    def test_get_records_lazy(self):
+        """Test ids are read as batches are consumed"""
+        consumed = []
+
+        def ids():
+            for record_id in self.ids:
+                consumed.append(record_id)
+                yield record_id
+
+        batches = self.storage.get_records(ids(), batch_size=10, max_workers=2)
+        next(batches)
+        batches.close()
+        self.assertLessEqual(len(consumed), 60)
+
+
+class TestStoragePutRecords(TestCase):
+    """Test cases for StorageClient.put_records"""
+
+    def setUp(self):
+        self.fake_storage = FakeStorage(max_request_bytes=256 * 1024)
+        self.server = FakeOsduServer(SyntheticDataset(records=1), storage=self.fake_storage).start()
+        self.storage = StorageClient(OsduClient(self.server.url, "opendes", StaticTokenCredential()))
+
+    def tearDown(self):
+        self.server.stop()
+
+    def put_requests(self) -> int:
+        """Number of put requests made to the server"""
+        return self.server.request_counts.get(("PUT", "storage", "records"), 0)
+
+    def test_put_records(self):
+        """Test records are put in chunks, with results in the order of the records"""
+        records = [new_record(i) for i in range(1200)]
+        report = self.storage.put_records(iter(records), max_workers=4)
+        self.assertEqual([], report.failed)
+        self.assertEqual([record["id"] for record in records], [result.id for result in report.results])
+        self.assertEqual({1}, {result.version for result in report.results})
+        self.assertEqual((3, 3), (report.calls, self.put_requests()))
+        self.assertEqual(1200, len(self.fake_storage))
+        self.assertGreater(report.records_per_s, 0)
+        self.assertGreater(report.bytes_per_s, 0)
+        self.assertEqual(2, self.storage.put_records(records[:1]).results[0].version)
+
+    def test_put_records_max_bytes(self):
+        """Test chunks are limited by their size in bytes"""
+        records = [new_record(i, size=1000) for i in range(100)]
+        report = self.storage.put_records(records, max_bytes=10_000)
+        self.assertEqual([], report.failed)
+        per_call = 10_000 // (len(json.dumps(records[10], separators=(",", ":"))) + 1)
+        self.assertEqual(math.ceil(100 / per_call), report.calls)
+        self.assertLessEqual(report.bytes_sent, report.calls * 10_000)
+
+    def test_put_records_generated_ids(self):
+        """Test ids generated for records without one are returned"""
+        records = [new_record(i) for i in range(4)]
+        del records[1]["id"], records[3]["id"]
+        results = self.storage.put_records(records).results
+        self.assertEqual(["opendes:wb:0", "opendes:wb:2"], [results[0].id, results[2].id])
+        self.assertEqual(["opendes:generated:0", "opendes:generated:1"], [results[1].id, results[3].id])
+
+    def test_put_records_split(self):
+        """Test a failing chunk is split until the invalid record is isolated"""
+        records = [new_record(i) for i in range(8)]
+        del records[5]["legal"]
+        report = self.storage.put_records(records)
+        self.assertEqual(["opendes:wb:5"], [result.id for result in report.failed])
+        self.assertEqual(400, report.failed[0].error.response.status_code)
+        self.assertEqual(7, len(report.succeeded))
+        # 8 -> 4 + 4 -> 2 + 2 -> 1 + 1
+        self.assertEqual(7, report.calls)
+
+    def test_put_records_split_two_invalid(self):
+        """Test invalid records in both halves, rejected with the same message, are both isolated"""
+        records = [new_record(i) for i in range(8)]
+        del records[1]["acl"], records[5]["acl"]
+        report = self.storage.put_records(records)
+        self.assertEqual(["opendes:wb:1", "opendes:wb:5"], [result.id for result in report.failed])
+        self.assertEqual(6, len(report.succeeded))
+        # 8 -> 4 + 4 -> 2 + 2 + 2 + 2 -> 1 + 1 + 1 + 1
+        self.assertEqual((11, 11), (report.calls, self.put_requests()))
+        self.assertEqual(6, len(self.fake_storage))
+
+    def test_put_records_split_calls_limited(self):
+        """Test splitting stops after max_split_calls, as for a shared invalid legal tag"""
+        records = [new_record(i) for i in range(8)]
+        for record in records:
+            del record["legal"]
+        report = self.storage.put_records(records, max_split_calls=6)
+        self.assertEqual(8, len(report.failed))
+        self.assertEqual({400}, {result.error.response.status_code for result in report.failed})
+        # 8 -> 4 + 4 -> 2 + 2 + 2 + 2, the budget used up before putting single records
+        self.assertEqual((7, 7), (report.calls, self.put_requests()))
+
+    def test_put_records_too_large(self):
+        """Test a record larger than the service accepts fails alone"""
+        records = [new_record(0), new_record(1, size=300_000), new_record(2)]
+        report = self.storage.put_records(records)
+        self.assertEqual(["opendes:wb:1"], [result.id for result in report.failed])
+        self.assertEqual(413, report.failed[0].error.response.status_code)
+
+    def failing_put(self, *errors):
+        """put_returning_json raising errors on the first calls, then putting the records"""
+        put = self.storage._client.put_returning_json  # pylint: disable=protected-access
+        bodies = []
+
+        def failing(url, body, **kwargs):
+            bodies.append(json.loads(body))
+            if len(bodies) <= len(errors):
+                raise errors[len(bodies) - 1]
+            return put(url, body, **kwargs)
+
+        patch = mock.patch.object(self.storage._client, "put_returning_json", side_effect=failing)  # noqa:E501 pylint: disable=protected-access
+        return patch, bodies
+
+    @staticmethod
+    def http_error(status_code: int, headers: dict = None) -> HTTPError:
+        """HTTPError with a response of the given status"""
+        return HTTPError(response=mock.Mock(status_code=status_code, headers=headers or {}))
+
+    @mock.patch("time.sleep")
+    def test_put_records_transient_retried(self, mock_sleep):
+        """Test throttling is retried after Retry-After without splitting the chunk"""
+        patch, bodies = self.failing_put(self.http_error(429, {"Retry-After": "2"}), self.http_error(503))
+        with patch:
+            report = self.storage.put_records([new_record(i) for i in range(10)])
+        self.assertEqual([], report.failed)
+        self.assertEqual([10, 10, 10], [len(body) for body in bodies])
+        self.assertEqual(3, report.calls)
+        self.assertEqual(2.0, mock_sleep.call_args_list[0][0][0])
+
+    @mock.patch("time.sleep")
+    def test_put_records_transient_exhausted(self, _):
+        """Test records fail once the retries of a transient error are exhausted"""
+        patch, bodies = self.failing_put(*[self.http_error(503)] * 3)
+        with patch:
+            report = self.storage.put_records([new_record(i) for i in range(4)], retries=2)
+        self.assertEqual(4, len(report.failed))
+        self.assertEqual(3, len(bodies))
+
+    @mock.patch("time.sleep")
+    def test_put_records_client_retries_not_multiplied(self, _):
+        """Test client level retries aren't added to the retries of a chunk"""
+        self.server.faults = Faults(status_503_rate=1, retry_after=0)
+        client = OsduClient(self.server.url, "opendes", StaticTokenCredential(), retries=3)
+        report = StorageClient(client).put_records([new_record(i) for i in range(4)], retries=2)
+        self.assertEqual(4, len(report.failed))
+        self.assertEqual((3, 3), (report.calls, self.put_requests()))
+
+    def test_put_records_other_error_not_split(self):
+        """Test a rejection not caused by the records fails the chunk without splitting it"""
+        patch, bodies = self.failing_put(self.http_error(403))
+        with patch:
+            report = self.storage.put_records([new_record(i) for i in range(4)])
+        self.assertEqual((4, 1), (len(report.failed), len(bodies)))
+
+    @mock.patch("time.sleep")
+    def test_put_records_read_timeout(self, _):
+        """Test records without an id aren't put again after a put that may have been applied"""
+        records = [new_record(i) for i in range(3)]
+        del records[1]["id"]
+        patch, bodies = self.failing_put(requests.ReadTimeout())
+        with patch:
+            report = self.storage.put_records(records)
+        self.assertEqual([True, False, True], [result.ok for result in report.results])
+        self.assertIsInstance(report.results[1].error, requests.ReadTimeout)
+        self.assertEqual([3, 2], [len(body) for body in bodies])
+        self.assertEqual(2, len(self.fake_storage))
+
+    @mock.patch("time.sleep")
+    def test_put_records_gateway_error(self, _):
+        """Test records without an id aren't put again after a 502 or 504"""
+        records = [new_record(i) for i in range(3)]
+        del records[1]["id"]
+        patch, bodies = self.failing_put(self.http_error(504))
+        with patch:
+            report = self.storage.put_records(records)
+        self.assertEqual([True, False, True], [result.ok for result in report.results])
+        self.assertEqual([3, 2], [len(body) for body in bodies])
+
+    @mock.patch("time.sleep")
+    def test_put_records_connect_timeout(self, _):
+        """Test every record is put again after a put that wasn't sent"""
+        records = [new_record(i) for i in range(3)]
+        del records[1]["id"]
+        patch, bodies = self.failing_put(requests.ConnectTimeout())
+        with patch:
+            report = self.storage.put_records(records)
+        self.assertEqual([], report.failed)
+        self.assertEqual([3, 3], [len(body) for body in bodies])
+
+    @params(0, 501)
+    def test_put_records_max_records(self, max_records):
+        """Test chunk sizes the service doesn't accept are rejected"""
+        with self.assertRaises(ValueError):
+            self.storage.put_records([new_record(0)], max_records=max_records)
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
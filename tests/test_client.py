@@ -7,6 +7,9 @@
 
 """Test cases for base OSDU client"""
 
+import multiprocessing
+import os
+import pickle
 from unittest.case import TestCase
 
 import mock
@@ -14,9 +17,16 @@ import requests
 from mock import patch
 from nose2.tools import params
 from requests.models import HTTPError
+from urllib3.exceptions import MaxRetryError, NewConnectionError
 
-from osdu.client import OsduClient
+from osdu._phases import PhaseTimingAdapter
+from osdu.client import DEFAULT_TIMEOUT, OsduClient
+from osdu.deadline import Deadline
+from osdu.exceptions import DeadlineExceededError
+from osdu.hedging import HedgingPolicy
 from osdu.identity import OsduTokenCredential
+from osdu.search import SearchClient
+from osdu.testing import FakeOsduServer, StaticTokenCredential, SyntheticDataset
 
 dummy_json = {
     "name": "value",
@@ -62,6 +72,7 @@ class TestOsduClient(TestCase):
         client = OsduClient(None, None, None)
 
         self.assertEqual(0, client.retries)
+        self.assertIsNone(client.hedging)
 
     @patch.object(OsduTokenCredential, "get_token", return_value=("ACCESS_TOKEN"))
     def test_get_headers(self, mock_get_token):  # pylint: disable=W0613
@@ -76,6 +87,38 @@ class TestOsduClient(TestCase):
 
         self.assertDictEqual(expected_headers, headers)
 
+    def test_get_headers_reused_until_token_changes(self):
+        """Test the prepared headers are reused until the token rotates"""
+        with patch.object(OsduTokenCredential, "get_token", side_effect=["A", "A", "B"]):
+            client = create_dummy_client()
+            headers1 = client.get_headers()
+            headers2 = client.get_headers()
+            headers3 = client.get_headers()
+
+        self.assertIs(headers1, headers2)
+        self.assertEqual("Bearer A", headers2["Authorization"])
+        self.assertEqual("Bearer B", headers3["Authorization"])
+        self.assertEqual("opendes", headers3["data-partition-id"])
+
+    @patch.object(OsduTokenCredential, "get_token", return_value=("ACCESS_TOKEN"))
+    def test_get_headers_extra_headers(self, _):
+        """Test extra headers are added without modifying the prepared headers"""
+        client = create_dummy_client()
+        headers = client.get_headers({"correlation-id": "123"})
+
+        self.assertEqual("123", headers["correlation-id"])
+        self.assertEqual("Bearer ACCESS_TOKEN", headers["Authorization"])
+        self.assertNotIn("correlation-id", client.get_headers())
+
+    @patch.object(OsduTokenCredential, "get_token", return_value=("ACCESS_TOKEN"))
+    def test_extra_headers_sent(self, _):
+        """Test per call extra headers are sent with the request"""
+        with mock.patch("requests.Session.request", return_value=mock.Mock()) as mock_request:
+            client = create_dummy_client()
+            client.delete("http://www.test.com/", headers={"correlation-id": "123"})
+
+            self.assertEqual("123", mock_request.call_args[1]["headers"]["correlation-id"])
+
     # region test get
 
     @params(
@@ -87,13 +130,17 @@ class TestOsduClient(TestCase):
         """Test valid get returns expected values"""
         response_mock = mock.Mock()
         type(response_mock).status_code = mock.PropertyMock(return_value=returned_status_code)
-        with mock.patch.object(requests, "get", return_value=response_mock) as mock_get:
+        with mock.patch.object(
+            requests.Session, "request", return_value=response_mock
+        ) as mock_get:
             client = create_dummy_client()
 
             response = client.get(url)
 
             mock_get.assert_called_once()
-            mock_get.assert_called_with(url, headers=self.dummy_headers)
+            mock_get.assert_called_with(
+                "GET", url, headers=self.dummy_headers, timeout=DEFAULT_TIMEOUT
+            )
             self.assertEqual(response_mock, response)
 
     @params(
@@ -108,12 +155,14 @@ class TestOsduClient(TestCase):
         """Test valid get returns ok when status-codes are provided"""
         response_mock = mock.Mock()
         type(response_mock).status_code = mock.PropertyMock(return_value=returned_status_code)
-        with mock.patch("requests.get", return_value=response_mock) as mock_delete:
+        with mock.patch("requests.Session.request", return_value=response_mock) as mock_delete:
             client = create_dummy_client()
             response = client.get("http://www.test.com/", expected_status_codes)
 
             mock_delete.assert_called_once()
-            mock_delete.assert_called_with("http://www.test.com/", headers=self.dummy_headers)
+            mock_delete.assert_called_with(
+                "GET", "http://www.test.com/", headers=self.dummy_headers, timeout=DEFAULT_TIMEOUT
+            )
             self.assertEqual(response_mock, response)
 
     @params(
@@ -127,7 +176,7 @@ class TestOsduClient(TestCase):
         """Test get returns exception when status-codes are provided and return doeesn't match"""
         error_response_mock = mock.MagicMock()
         type(error_response_mock).status_code = mock.PropertyMock(return_value=returned_status_code)
-        with mock.patch("requests.get", return_value=error_response_mock) as _:
+        with mock.patch("requests.Session.request", return_value=error_response_mock) as _:
             with self.assertRaises(HTTPError):
                 client = create_dummy_client()
                 _ = client.get("http://www.test.com/", expected_status_codes)
@@ -151,7 +200,7 @@ class TestOsduClient(TestCase):
             response = client.get_returning_json(url)
 
             mock_get.assert_called_once()
-            mock_get.assert_called_with(url, [200])
+            mock_get.assert_called_with(url, [200], timeout=None, deadline=None, headers=None)
             self.assertDictEqual(dummy_json, response)
 
     @params(
@@ -169,7 +218,10 @@ class TestOsduClient(TestCase):
             response = client.get_returning_json("http://www.test.com/", expected_status_codes)
 
             mock_get.assert_called_once()
-            mock_get.assert_called_with("http://www.test.com/", expected_status_codes)
+            mock_get.assert_called_with(
+                "http://www.test.com/", expected_status_codes, timeout=None, deadline=None,
+                headers=None
+            )
             self.assertDictEqual(dummy_json, response)
 
     # endregion test get_returning_json
@@ -185,14 +237,17 @@ class TestOsduClient(TestCase):
         """Test valid post with string returns expected values"""
         response_mock = mock.Mock()
         type(response_mock).status_code = mock.PropertyMock(return_value=returned_status_code)
-        with mock.patch.object(requests, "post", return_value=response_mock) as mock_post:
+        with mock.patch.object(
+            requests.Session, "request", return_value=response_mock
+        ) as mock_post:
             client = create_dummy_client()
 
             response = client.post("http://www.test.com/", string_data)
 
             mock_post.assert_called_once()
             mock_post.assert_called_with(
-                "http://www.test.com/", data=string_data, json=None, headers=self.dummy_headers
+                "POST", "http://www.test.com/", data=string_data, json=None,
+                headers=self.dummy_headers, timeout=DEFAULT_TIMEOUT
             )
             self.assertEqual(response_mock, response)
 
@@ -205,14 +260,17 @@ class TestOsduClient(TestCase):
         """Test valid post with json returns expected values"""
         response_mock = mock.Mock()
         type(response_mock).status_code = mock.PropertyMock(return_value=returned_status_code)
-        with mock.patch.object(requests, "post", return_value=response_mock) as mock_post:
+        with mock.patch.object(
+            requests.Session, "request", return_value=response_mock
+        ) as mock_post:
             client = create_dummy_client()
 
             response = client.post("http://www.test.com/", json)
 
             mock_post.assert_called_once()
             mock_post.assert_called_with(
-                "http://www.test.com/", data=None, json=json, headers=self.dummy_headers
+                "POST", "http://www.test.com/", data=None, json=json, headers=self.dummy_headers,
+                timeout=DEFAULT_TIMEOUT
             )
             self.assertEqual(response_mock, response)
 
@@ -228,13 +286,14 @@ class TestOsduClient(TestCase):
         """Test valid post returns ok when status-codes are provided"""
         response_mock = mock.Mock()
         type(response_mock).status_code = mock.PropertyMock(return_value=returned_status_code)
-        with mock.patch("requests.post", return_value=response_mock) as mock_delete:
+        with mock.patch("requests.Session.request", return_value=response_mock) as mock_delete:
             client = create_dummy_client()
             response = client.post("http://www.test.com/", "test data", expected_status_codes)
 
             mock_delete.assert_called_once()
             mock_delete.assert_called_with(
-                "http://www.test.com/", data="test data", json=None, headers=self.dummy_headers
+                "POST", "http://www.test.com/", data="test data", json=None,
+                headers=self.dummy_headers, timeout=DEFAULT_TIMEOUT
             )
             self.assertEqual(response_mock, response)
 
@@ -249,7 +308,7 @@ class TestOsduClient(TestCase):
         """Test post returns exception when status-codes are provided and return doeesn't match"""
         error_response_mock = mock.MagicMock()
         type(error_response_mock).status_code = mock.PropertyMock(return_value=returned_status_code)
-        with mock.patch("requests.post", return_value=error_response_mock) as _:
+        with mock.patch("requests.Session.request", return_value=error_response_mock) as _:
             with self.assertRaises(HTTPError):
                 client = create_dummy_client()
                 _ = client.post("http://www.test.com/", "test data", expected_status_codes)
@@ -275,7 +334,10 @@ class TestOsduClient(TestCase):
             response = client.post_returning_json("http://www.test.com/", data)
 
             mock_post.assert_called_once()
-            mock_post.assert_called_with("http://www.test.com/", data, [200])
+            mock_post.assert_called_with(
+                "http://www.test.com/", data, [200], timeout=None, deadline=None,
+                headers=None, retries=None
+            )
             self.assertDictEqual(expected_response_data, response)
 
     @params(
@@ -295,7 +357,10 @@ class TestOsduClient(TestCase):
             )
 
             mock_post.assert_called_once()
-            mock_post.assert_called_with("http://www.test.com/", dummy_json, expected_status_codes)
+            mock_post.assert_called_with(
+                "http://www.test.com/", dummy_json, expected_status_codes, timeout=None,
+                deadline=None, headers=None, retries=None
+            )
             self.assertDictEqual(dummy_json, response)
 
     # endregion test post_returning_json
@@ -311,14 +376,17 @@ class TestOsduClient(TestCase):
         """Test valid put with string returns expected values"""
         response_mock = mock.Mock()
         type(response_mock).status_code = mock.PropertyMock(return_value=returned_status_code)
-        with mock.patch.object(requests, "put", return_value=response_mock) as mock_put:
+        with mock.patch.object(
+            requests.Session, "request", return_value=response_mock
+        ) as mock_put:
             client = create_dummy_client()
 
             response = client.put("http://www.test.com/", string_data)
 
             mock_put.assert_called_once()
             mock_put.assert_called_with(
-                "http://www.test.com/", data=string_data, json=None, headers=self.dummy_headers
+                "PUT", "http://www.test.com/", data=string_data, json=None,
+                headers=self.dummy_headers, timeout=DEFAULT_TIMEOUT
             )
             self.assertEqual(response_mock, response)
 
@@ -331,14 +399,17 @@ class TestOsduClient(TestCase):
         """Test valid put with json returns expected values"""
         response_mock = mock.Mock()
         type(response_mock).status_code = mock.PropertyMock(return_value=returned_status_code)
-        with mock.patch.object(requests, "put", return_value=response_mock) as mock_put:
+        with mock.patch.object(
+            requests.Session, "request", return_value=response_mock
+        ) as mock_put:
             client = create_dummy_client()
 
             response = client.put("http://www.test.com/", json)
 
             mock_put.assert_called_once()
             mock_put.assert_called_with(
-                "http://www.test.com/", data=None, json=json, headers=self.dummy_headers
+                "PUT", "http://www.test.com/", data=None, json=json, headers=self.dummy_headers,
+                timeout=DEFAULT_TIMEOUT
             )
             self.assertEqual(response_mock, response)
 
@@ -354,13 +425,14 @@ class TestOsduClient(TestCase):
         """Test valid put returns ok when status-codes are provided"""
         response_mock = mock.Mock()
         type(response_mock).status_code = mock.PropertyMock(return_value=returned_status_code)
-        with mock.patch("requests.put", return_value=response_mock) as mock_delete:
+        with mock.patch("requests.Session.request", return_value=response_mock) as mock_delete:
             client = create_dummy_client()
             response = client.put("http://www.test.com/", "test data", expected_status_codes)
 
             mock_delete.assert_called_once()
             mock_delete.assert_called_with(
-                "http://www.test.com/", data="test data", json=None, headers=self.dummy_headers
+                "PUT", "http://www.test.com/", data="test data", json=None,
+                headers=self.dummy_headers, timeout=DEFAULT_TIMEOUT
             )
             self.assertEqual(response_mock, response)
 
@@ -375,7 +447,7 @@ class TestOsduClient(TestCase):
         """Test put returns exception when status-codes are provided and return doeesn't match"""
         error_response_mock = mock.MagicMock()
         type(error_response_mock).status_code = mock.PropertyMock(return_value=returned_status_code)
-        with mock.patch("requests.put", return_value=error_response_mock) as _:
+        with mock.patch("requests.Session.request", return_value=error_response_mock) as _:
             with self.assertRaises(HTTPError):
                 client = create_dummy_client()
                 _ = client.put("http://www.test.com/", "test data", expected_status_codes)
@@ -401,7 +473,10 @@ class TestOsduClient(TestCase):
             response = client.put_returning_json("http://www.test.com/", data)
 
             mock_put.assert_called_once()
-            mock_put.assert_called_with("http://www.test.com/", data, [200])
+            mock_put.assert_called_with(
+                "http://www.test.com/", data, [200], timeout=None, deadline=None,
+                headers=None, retries=None
+            )
             self.assertDictEqual(expected_response_data, response)
 
     @params(
@@ -421,7 +496,10 @@ class TestOsduClient(TestCase):
             )
 
             mock_put.assert_called_once()
-            mock_put.assert_called_with("http://www.test.com/", dummy_json, expected_status_codes)
+            mock_put.assert_called_with(
+                "http://www.test.com/", dummy_json, expected_status_codes, timeout=None,
+                deadline=None, headers=None, retries=None
+            )
             self.assertDictEqual(dummy_json, response)
 
     # endregion test put_returning_json
@@ -437,12 +515,14 @@ class TestOsduClient(TestCase):
         """Test valid delete returns expected values"""
         response_mock = mock.Mock()
         type(response_mock).status_code = mock.PropertyMock(return_value=returned_status_code)
-        with mock.patch("requests.delete", return_value=response_mock) as mock_delete:
+        with mock.patch("requests.Session.request", return_value=response_mock) as mock_delete:
             client = create_dummy_client()
             response = client.delete(url)
 
             mock_delete.assert_called_once()
-            mock_delete.assert_called_with(url, headers=self.dummy_headers)
+            mock_delete.assert_called_with(
+                "DELETE", url, headers=self.dummy_headers, timeout=DEFAULT_TIMEOUT
+            )
             self.assertEqual(response_mock, response)
 
     @params(
@@ -457,12 +537,15 @@ class TestOsduClient(TestCase):
         """Test valid delete returns ok when status-codes are provided"""
         response_mock = mock.Mock()
         type(response_mock).status_code = mock.PropertyMock(return_value=returned_status_code)
-        with mock.patch("requests.delete", return_value=response_mock) as mock_delete:
+        with mock.patch("requests.Session.request", return_value=response_mock) as mock_delete:
             client = create_dummy_client()
             response = client.delete("http://www.test.com/", expected_status_codes)
 
             mock_delete.assert_called_once()
-            mock_delete.assert_called_with("http://www.test.com/", headers=self.dummy_headers)
+            mock_delete.assert_called_with(
+                "DELETE", "http://www.test.com/", headers=self.dummy_headers,
+                timeout=DEFAULT_TIMEOUT
+            )
             self.assertEqual(response_mock, response)
 
     @params(
@@ -476,13 +559,259 @@ class TestOsduClient(TestCase):
         """Test delete returns exception when status-codes are provided and return doeesn't match"""
         error_response_mock = mock.MagicMock()
         type(error_response_mock).status_code = mock.PropertyMock(return_value=returned_status_code)
-        with mock.patch("requests.delete", return_value=error_response_mock) as _:
+        with mock.patch("requests.Session.request", return_value=error_response_mock) as _:
             with self.assertRaises(HTTPError):
                 client = create_dummy_client()
                 _ = client.delete("http://www.test.com/", expected_status_codes)
 
     # endregion test delete
 
+    # region test timeouts and retries
+    @patch.object(OsduClient, "get_headers", return_value=dummy_headers)
+    def test_timeout_client_default(self, _):
+        """Test the client timeout is used when no per call timeout is given"""
+        ok_response = mock.Mock(status_code=200)
+        with mock.patch("requests.Session.request", return_value=ok_response) as mock_req:
+            client = OsduClient("http://www.test.com", "opendes", None, timeout=(1, 2))
+            client.get("http://www.test.com/")
+
+            self.assertEqual((1, 2), client.timeout)
+            self.assertEqual((1, 2), mock_req.call_args[1]["timeout"])
+
+    @patch.object(OsduClient, "get_headers", return_value=dummy_headers)
+    def test_timeout_per_call(self, _):
+        """Test a per call timeout overrides the client default"""
+        ok_response = mock.Mock(status_code=200)
+        with mock.patch("requests.Session.request", return_value=ok_response) as mock_req:
+            client = create_dummy_client()
+            client.post("http://www.test.com/", "data", timeout=3)
+
+            self.assertEqual(3, mock_req.call_args[1]["timeout"])
+
+    @patch.object(OsduClient, "get_headers", return_value=dummy_headers)
+    def test_timeout_clipped_by_deadline(self, _):
+        """Test the timeout doesn't exceed the remaining deadline"""
+        ok_response = mock.Mock(status_code=200)
+        with mock.patch("requests.Session.request", return_value=ok_response) as mock_req:
+            client = create_dummy_client()
+            client.get("http://www.test.com/", deadline=Deadline(5))
+
+            connect_timeout, read_timeout = mock_req.call_args[1]["timeout"]
+            self.assertLessEqual(connect_timeout, 5)
+            self.assertLessEqual(read_timeout, 5)
+
+    @patch.object(OsduClient, "get_headers", return_value=dummy_headers)
+    def test_expired_deadline_not_sent(self, _):
+        """Test no request is sent once the deadline has passed"""
+        with mock.patch("requests.Session.request") as mock_req:
+            client = create_dummy_client()
+            with self.assertRaises(DeadlineExceededError):
+                client.get("http://www.test.com/", deadline=Deadline(0))
+
+            mock_req.assert_not_called()
+
+    @params(429, 502, 503, 504)
+    @patch.object(OsduClient, "get_headers", return_value=dummy_headers)
+    @patch("time.sleep")
+    def test_retry_transient_status(self, status_code, mock_sleep, _):
+        """Test transient status codes are retried"""
+        responses = [mock.Mock(status_code=status_code, headers={}), mock.Mock(status_code=200)]
+        with mock.patch("requests.Session.request", side_effect=responses) as mock_req:
+            client = create_dummy_client()
+            response = client.get("http://www.test.com/", [200])
+
+            self.assertEqual(200, response.status_code)
+            self.assertEqual(2, mock_req.call_count)
+            mock_sleep.assert_called_once()
+
+    @patch.object(OsduClient, "get_headers", return_value=dummy_headers)
+    @patch("time.sleep")
+    def test_retry_exhausted(self, mock_sleep, _):
+        """Test the last response is returned when retries are exhausted"""
+        response = mock.Mock(status_code=503, headers={"Retry-After": "1"})
+        with mock.patch("requests.Session.request", return_value=response) as mock_req:
+            client = create_dummy_client()
+            with self.assertRaises(HTTPError):
+                client.get("http://www.test.com/", [200])
+
+            self.assertEqual(3, mock_req.call_count)
+            mock_sleep.assert_called_with(1.0)
+
+    @patch.object(OsduClient, "get_headers", return_value=dummy_headers)
+    @patch("time.sleep")
+    def test_retry_connection_error(self, _, __):
+        """Test connection errors are retried and raised when retries are exhausted"""
+        with mock.patch(
+            "requests.Session.request", side_effect=requests.ConnectionError()
+        ) as mock_req:
+            client = create_dummy_client()
+            with self.assertRaises(requests.ConnectionError):
+                client.get("http://www.test.com/")
+
+            self.assertEqual(3, mock_req.call_count)
+
+    @params(
+        (requests.ReadTimeout(), 1),
+        (requests.ConnectionError("Connection aborted."), 1),
+        (requests.ConnectTimeout(), 3),
+        (requests.ConnectionError(MaxRetryError(None, "/", NewConnectionError(None, "refused"))), 3),
+    )
+    @patch.object(OsduClient, "get_headers", return_value=dummy_headers)
+    @patch("time.sleep")
+    def test_retry_write_only_if_not_sent(self, error, expected_calls, _, __):
+        """Test writes are only retried after connection errors raised before sending them"""
+        with mock.patch("requests.Session.request", side_effect=error) as mock_req:
+            client = create_dummy_client()
+            with self.assertRaises(type(error)):
+                client.post("http://www.test.com/api/storage/v2/records", {"kind": "a"})
+
+            self.assertEqual(expected_calls, mock_req.call_count)
+
+    @params((429, 3), (502, 1), (503, 3), (504, 1))
+    @patch.object(OsduClient, "get_headers", return_value=dummy_headers)
+    @patch("time.sleep")
+    def test_retry_write_status(self, status_code, expected_calls, _, __):
+        """Test writes are only retried on statuses returned before the server applied them"""
+        response = mock.Mock(status_code=status_code, headers={})
+        with mock.patch("requests.Session.request", return_value=response) as mock_req:
+            client = create_dummy_client()
+            with self.assertRaises(HTTPError):
+                client.post("http://www.test.com/api/storage/v2/records", {"kind": "a"}, [200])
+
+            self.assertEqual(expected_calls, mock_req.call_count)
+
+    @patch.object(OsduClient, "get_headers", return_value=dummy_headers)
+    def test_retry_stops_at_deadline(self, _):
+        """Test retries stop when the deadline has no time for another attempt"""
+        with mock.patch("requests.Session.request", side_effect=requests.Timeout()) as mock_req:
+            client = create_dummy_client()
+            with self.assertRaises(DeadlineExceededError):
+                client.get("http://www.test.com/", deadline=Deadline(0.1))
+
+            mock_req.assert_called_once()
+
+    # endregion test timeouts and retries
+
+    # region test slow requests
+
+    @patch.object(OsduClient, "get_headers", return_value=dummy_headers)
+    def test_slow_request_logged(self, _):
+        """Test requests over the threshold are logged with a redacted url and the caller"""
+        response = mock.Mock(status_code=200, content=b"12345")
+        response.request.body = b"abc"
+        client = OsduClient(
+            "http://www.test.com", "opendes", OsduTokenCredential(None, None, None, None),
+            slow_request_threshold=0.0,
+        )
+        with mock.patch("requests.Session.request", return_value=response):
+            with self.assertLogs("osdu.client.slow_requests", "WARNING") as logs:
+                client.get("http://www.test.com/api/storage/v2/records/opendes:wb:123?attr=1")
+
+        record = logs.records[0].osdu_slow_request
+        self.assertEqual("http://www.test.com/api/storage/v2/records/{id}", record["url"])
+        self.assertEqual(
+            ("GET", "opendes", 200, 3, 5),
+            (
+                record["method"], record["data_partition"], record["status_code"],
+                record["bytes_sent"], record["bytes_received"],
+            ),
+        )
+        self.assertIn("test_client.py", record["caller"])
+        self.assertIn("test_slow_request_logged", record["caller"])
+
+    @patch.object(OsduClient, "get_headers", return_value=dummy_headers)
+    def test_fast_request_not_logged(self, _):
+        """Test requests under the threshold are not logged"""
+        client = OsduClient(
+            "http://www.test.com", "opendes", OsduTokenCredential(None, None, None, None),
+            slow_request_threshold=60,
+        )
+        with mock.patch("requests.Session.request", return_value=mock.Mock(status_code=200)):
+            with mock.patch("osdu.client.slow_request_logger") as mock_logger:
+                client.get("http://www.test.com/")
+
+        mock_logger.warning.assert_not_called()
+
+    # endregion test slow requests
+
+    # region test pickling and fork
+
+    def test_pickle(self):
+        """Test an unpickled client has the same configuration and its own connection pool"""
+        client = OsduClient(
+            "http://www.test.com", "opendes", OsduTokenCredential(None, None, None, None),
+            retries=3, hedging=HedgingPolicy(), coalesce_gets=True, pool_size=4, record_phases=True,
+        )
+        copy = pickle.loads(pickle.dumps(client))
+
+        self.assertEqual(
+            ("http://www.test.com", "opendes", 3, True),
+            (copy.server_url, copy.data_partition, copy.retries, copy.coalesce_gets),
+        )
+        self.assertIsInstance(copy.hedging, HedgingPolicy)
+        self.assertIsNot(client._session, copy._session)  # pylint: disable=protected-access
+        adapter = copy._session.get_adapter("https://")  # pylint: disable=protected-access
+        self.assertIsInstance(adapter, PhaseTimingAdapter)
+        self.assertEqual(4, adapter._pool_maxsize)  # pylint: disable=protected-access
+
+    def test_pickle_keeps_token(self):
+        """Test a still valid token is used by the unpickled client without refreshing"""
+        credential = OsduTokenCredential(None, None, None, None)
+        with patch.object(
+            OsduTokenCredential, "_refresh_access_token",
+            return_value={"access_token": "abc", "expires_in": 3600},
+        ):
+            credential.get_token()
+        client = pickle.loads(pickle.dumps(OsduClient("http://www.test.com", "opendes", credential)))
+
+        with patch.object(OsduTokenCredential, "_refresh_access_token") as mock_refresh:
+            self.assertEqual("Bearer abc", client.get_headers()["Authorization"])
+        mock_refresh.assert_not_called()
+
+    def test_fork_resets_connections(self):
+        """Test a forked child replaces the inherited connection pool and coalescer"""
+        client = OsduClient(
+            "http://www.test.com", "opendes", OsduTokenCredential(None, None, None, None),
+            coalesce_gets=True,
+        )
+        session, coalescer = client._session, client._coalescer  # pylint: disable=protected-access
+        with patch.object(OsduClient, "get_headers", return_value=self.dummy_headers):
+            with mock.patch("requests.Session.request", return_value=mock.Mock(status_code=200)):
+                client.get("http://www.test.com/")
+                self.assertIs(session, client._session)  # pylint: disable=protected-access
+                with mock.patch("osdu.client.os.getpid", return_value=os.getpid() + 1):
+                    client.get("http://www.test.com/")
+
+        self.assertIsNot(session, client._session)  # pylint: disable=protected-access
+        self.assertIsNot(coalescer, client._coalescer)  # pylint: disable=protected-access
+
+    def test_process_pool(self):
+        """Test pickled and forked clients in a process pool"""
+        global _FORKED_CLIENT  # pylint: disable=global-statement
+        with FakeOsduServer(SyntheticDataset(records=10)) as server:
+            search_client = SearchClient(OsduClient(server.url, "opendes", StaticTokenCredential()))
+            search_client.query_by_id("opendes:master-data--Well:0")
+            _FORKED_CLIENT = search_client
+            with multiprocessing.get_context("fork").Pool(2) as pool:
+                pickled_totals = pool.map(_query_total, [search_client] * 4)
+                forked_totals = pool.map(_query_forked_total, range(4))
+            _FORKED_CLIENT = None
+
+        self.assertEqual([10] * 8, pickled_totals + forked_totals)
+
+    # endregion test pickling and fork
+
+
+_FORKED_CLIENT = None
+
+
+def _query_total(search_client: SearchClient) -> int:
+    return search_client.query("*:*:*:*", limit=1)["totalCount"]
+
+
+def _query_forked_total(_) -> int:
+    return _query_total(_FORKED_CLIENT)
+
 
 if __name__ == "__main__":
     import nose2
@@ -0,0 +1,195 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+
+"""Test cases for coalescing of identical in-flight requests"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.case import TestCase
+
+import mock
+from requests.models import HTTPError
+
+from osdu._coalesce import RequestCoalescer
+from osdu.client import OsduClient
+from osdu.deadline import Deadline
+from osdu.exceptions import DeadlineExceededError
+from osdu.testing import StaticTokenCredential
+
+
+class TestRequestCoalescer(TestCase):
+    """Test cases for RequestCoalescer"""
+
+    def test_call_shared_by_concurrent_callers(self):
+        """Test concurrent callers with the same key share one call"""
+        coalescer = RequestCoalescer()
+        started = threading.Event()
+        release = threading.Event()
+        func = mock.Mock(side_effect=lambda: started.set() or release.wait(2) and "result")
+
+        def call():
+            return coalescer.call("key", func)
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            leader = executor.submit(call)
+            started.wait(2)
+            followers = [executor.submit(call) for _ in range(4)]
+            while coalescer.shared < 4:
+                pass
+            release.set()
+            results = [f.result() for f in [leader] + followers]
+
+        self.assertEqual(["result"] * 5, results)
+        func.assert_called_once()
+        self.assertEqual(1, coalescer.calls)
+        self.assertEqual(4, coalescer.shared)
+
+    def test_call_not_cached(self):
+        """Test sequential callers each make a call"""
+        coalescer = RequestCoalescer()
+        func = mock.Mock(return_value="result")
+
+        coalescer.call("key", func)
+        coalescer.call("key", func)
+
+        self.assertEqual(2, func.call_count)
+        self.assertEqual(0, coalescer.shared)
+
+    def test_call_different_keys(self):
+        """Test callers with different keys don't share calls"""
+        coalescer = RequestCoalescer()
+        barrier = threading.Barrier(2, timeout=2)
+
+        def call(key):
+            return coalescer.call(key, lambda: barrier.wait() is not None and key)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(call, ["a", "b"]))
+
+        self.assertEqual(["a", "b"], results)
+        self.assertEqual(2, coalescer.calls)
+
+    def test_call_error_shared(self):
+        """Test an exception is raised for every waiting caller"""
+        coalescer = RequestCoalescer()
+        started = threading.Event()
+        release = threading.Event()
+
+        def func():
+            started.set()
+            release.wait(2)
+            raise ValueError()
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(coalescer.call, "key", func)
+            started.wait(2)
+            follower = executor.submit(coalescer.call, "key", func)
+            while coalescer.shared < 1:
+                pass
+            release.set()
+
+            self.assertIsInstance(leader.exception(), ValueError)
+            self.assertIsInstance(follower.exception(), ValueError)
+
+    def test_call_wait_timeout(self):
+        """Test a waiting caller gives up once its timeout passes"""
+        coalescer = RequestCoalescer()
+        started = threading.Event()
+        release = threading.Event()
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(coalescer.call, "key", lambda: started.set() or release.wait(2))
+            started.wait(2)
+            with self.assertRaises(DeadlineExceededError):
+                coalescer.call("key", mock.Mock(), timeout=0.01)
+            release.set()
+
+
+class TestOsduClientCoalescing(TestCase):
+    """Test cases for coalescing in OsduClient"""
+
+    def test_init_defaults(self):
+        """Test coalescing is disabled by default"""
+        self.assertFalse(OsduClient(None, None, None).coalesce_gets)
+
+    @mock.patch.object(OsduClient, "get_headers")
+    def test_get_coalesced(self, mock_get_headers):
+        """Test identical concurrent gets result in a single request"""
+        mock_get_headers.return_value = {"data-partition-id": "opendes", "Authorization": "a"}
+        release = threading.Event()
+        response = mock.Mock(status_code=200)
+        client = OsduClient("http://www.test.com", "opendes", None, coalesce_gets=True)
+        coalescer = client._coalescer  # pylint: disable=protected-access
+
+        with mock.patch(
+            "requests.Session.request", side_effect=lambda *_, **__: release.wait(2) and response
+        ) as mock_request:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                futures = [
+                    executor.submit(client.get, "http://www.test.com/groups", [200])
+                    for _ in range(4)
+                ]
+                while coalescer.calls + coalescer.shared < 4:
+                    pass
+                release.set()
+                results = [f.result() for f in futures]
+
+        mock_request.assert_called_once()
+        self.assertEqual([response] * 4, results)
+
+    @mock.patch.object(OsduClient, "get_headers")
+    def test_get_coalesced_status_checked_per_caller(self, mock_get_headers):
+        """Test ok_status_codes are still checked for coalesced gets"""
+        mock_get_headers.return_value = {"data-partition-id": "opendes", "Authorization": "a"}
+        client = OsduClient("http://www.test.com", "opendes", None, coalesce_gets=True)
+        with mock.patch("requests.Session.request", return_value=mock.Mock(status_code=404)):
+            with self.assertRaises(HTTPError):
+                client.get("http://www.test.com/groups", [200])
+
+    @mock.patch.object(OsduClient, "get_headers")
+    def test_get_identity_in_key(self, mock_get_headers):
+        """Test gets for different identities are not coalesced"""
+        mock_get_headers.side_effect = [
+            {"data-partition-id": "opendes", "Authorization": "a"},
+            {"data-partition-id": "opendes", "Authorization": "b"},
+        ]
+        client = OsduClient("http://www.test.com", "opendes", None, coalesce_gets=True)
+        coalescer = client._coalescer  # pylint: disable=protected-access
+        with mock.patch.object(coalescer, "call") as mock_call:
+            client.get("http://www.test.com/groups")
+            client.get("http://www.test.com/groups")
+
+        keys = [c[0][0] for c in mock_call.call_args_list]
+        self.assertEqual(
+            [
+                ("http://www.test.com/groups", (("Authorization", "a"), ("data-partition-id", "opendes")), None, None),
+                ("http://www.test.com/groups", (("Authorization", "b"), ("data-partition-id", "opendes")), None, None),
+            ],
+            keys,
+        )
+
+    def test_get_call_options_in_key(self):
+        """Test gets with different headers, timeouts or deadlines are not coalesced"""
+        client = OsduClient("http://www.test.com", "opendes", StaticTokenCredential(), coalesce_gets=True)
+        coalescer = client._coalescer  # pylint: disable=protected-access
+        deadline = Deadline(10)
+        with mock.patch.object(coalescer, "call") as mock_call:
+            client.get("http://www.test.com/groups")
+            client.get("http://www.test.com/groups", headers={"Accept": "text/csv"})
+            client.get("http://www.test.com/groups", timeout=1)
+            client.get("http://www.test.com/groups", deadline=deadline)
+            client.get("http://www.test.com/groups", deadline=deadline)
+
+        keys = [c[0][0] for c in mock_call.call_args_list]
+        self.assertEqual(4, len(set(keys)))
+        self.assertEqual(keys[3], keys[4])
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
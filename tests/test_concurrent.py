@@ -0,0 +1,132 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+
+"""Test cases for bounded concurrent map"""
+
+import threading
+import time
+from unittest.case import TestCase
+
+from osdu._concurrent import bounded_map, prefetch
+
+
+class TestBoundedMap(TestCase):
+    """Test cases for bounded_map"""
+
+    def test_ordered(self):
+        """Test results are in the order of the items"""
+        results = bounded_map(lambda item: time.sleep(0.001 * (item % 3)) or item * 2, range(50), max_workers=4)
+        self.assertEqual([item * 2 for item in range(50)], list(results))
+
+    def test_unordered(self):
+        """Test a slow call doesn't hold back later results"""
+        results = list(bounded_map(lambda item: time.sleep(0.2 if item == 0 else 0) or item, range(5), 2, False))
+        self.assertEqual(set(range(5)), set(results))
+        self.assertEqual(0, results[-1])
+
+    def test_yields_while_waiting_for_items(self):
+        """Test completed results are yielded while the next item is slow to read"""
+        release = threading.Event()
+
+        def items():
+            yield 0
+            release.wait(5)
+            yield 1
+
+        results = bounded_map(lambda item: item, items(), max_workers=2, ordered=False)
+        start = time.perf_counter()
+        self.assertEqual(0, next(results))
+        self.assertLess(time.perf_counter() - start, 1)
+        release.set()
+        self.assertEqual([1], list(results))
+
+    def test_read_error(self):
+        """Test an error reading the items is raised after the results of earlier items"""
+
+        def items():
+            yield 1
+            raise ValueError("read failed")
+
+        results = bounded_map(lambda item: item, items())
+        self.assertEqual(1, next(results))
+        with self.assertRaises(ValueError):
+            next(results)
+
+    def test_bounded(self):
+        """Test at most max_pending items are taken ahead of the results consumed"""
+        taken = []
+
+        def items():
+            for item in range(100):
+                taken.append(item)
+                yield item
+
+        results = bounded_map(lambda item: item, items(), max_workers=2, max_pending=3)
+        self.assertEqual(0, next(results))
+        self.assertLessEqual(len(taken), 4)
+        results.close()
+
+    def test_error(self):
+        """Test an error of a call is raised and later calls aren't started"""
+        started = []
+        lock = threading.Lock()
+
+        def call(item):
+            with lock:
+                started.append(item)
+            if item == 2:
+                raise ValueError("failed")
+            time.sleep(0.01)
+            return item
+
+        with self.assertRaises(ValueError):
+            list(bounded_map(call, range(100), max_workers=2))
+        self.assertLess(len(started), 10)
+
+
+class TestPrefetch(TestCase):
+    """Test cases for prefetch"""
+
+    def test_items(self):
+        """Test every item is yielded in order"""
+        self.assertEqual(list(range(100)), list(prefetch(range(100), max_pending=3)))
+
+    def test_read_ahead(self):
+        """Test items are read in the background up to max_pending ahead"""
+        taken = []
+
+        def items():
+            for item in range(100):
+                taken.append(item)
+                yield item
+
+        results = prefetch(items(), max_pending=2)
+        self.assertEqual(0, next(results))
+        time.sleep(0.05)
+        # two in the buffer and one waiting for space
+        self.assertEqual(4, len(taken))
+        results.close()
+        time.sleep(0.2)
+        self.assertEqual(4, len(taken))
+
+    def test_error(self):
+        """Test an error reading is raised after the items before it"""
+
+        def items():
+            yield 1
+            raise ValueError("failed")
+
+        results = prefetch(items())
+        self.assertEqual(1, next(results))
+        with self.assertRaises(ValueError):
+            next(results)
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
@@ -0,0 +1,65 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+
+"""Test cases for deadlines"""
+
+from unittest.case import TestCase
+
+import mock
+from nose2.tools import params
+
+from osdu.deadline import Deadline
+from osdu.exceptions import DeadlineExceededError
+
+
+class TestDeadline(TestCase):
+    """Test cases for Deadline"""
+
+    @mock.patch("osdu.deadline.time.monotonic", return_value=100.0)
+    def test_remaining(self, mock_monotonic):
+        """Test the remaining time counts down to 0"""
+        deadline = Deadline(10)
+        self.assertEqual(10, deadline.seconds)
+        self.assertEqual(10, deadline.remaining())
+
+        mock_monotonic.return_value = 104.0
+        self.assertEqual(6, deadline.remaining())
+        self.assertFalse(deadline.expired)
+
+        mock_monotonic.return_value = 111.0
+        self.assertEqual(0, deadline.remaining())
+        self.assertTrue(deadline.expired)
+
+    def test_check(self):
+        """Test check raises once the deadline has passed"""
+        Deadline(10).check()
+        with self.assertRaises(DeadlineExceededError):
+            Deadline(0).check()
+
+    @params((None, "Deadline exceeded"), ("Deadline of 5s exceeded", "Deadline of 5s exceeded"))
+    def test_error_message(self, message, expected):
+        """Test the error message defaults to a description rather than None"""
+        self.assertEqual(expected, str(DeadlineExceededError(message)))
+        self.assertEqual("Deadline exceeded", DeadlineExceededError().message)
+
+    @params(
+        (None, 5),
+        (3, 3),
+        (30, 5),
+        ((3, 30), (3, 5)),
+        ((None, 2), (5, 2)),
+    )
+    @mock.patch("osdu.deadline.time.monotonic", return_value=100.0)
+    def test_clip(self, timeout, expected, _):
+        """Test timeouts are limited to the remaining time"""
+        self.assertEqual(expected, Deadline(5).clip(timeout))
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
@@ -0,0 +1,306 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+
+"""Test cases for request hedging"""
+
+import os
+import pickle
+import threading
+import time
+from unittest.case import TestCase
+
+import mock
+from nose2.tools import params
+
+from osdu.client import OsduClient
+from osdu.hedging import HedgingPolicy
+from osdu.identity import OsduTokenCredential
+
+
+def create_dummy_client(hedging, server_url="http://www.test.com"):
+    """Create a dummy client"""
+    credential = OsduTokenCredential(None, None, None, None)
+    return OsduClient(server_url, "opendes", credential, hedging=hedging)
+
+
+class TestHedgingPolicy(TestCase):
+    """Test cases for HedgingPolicy"""
+
+    @params(
+        ("GET", "http://www.test.com/api/entitlements/v2/groups", True),
+        ("POST", "http://www.test.com/api/search/v2/query", True),
+        ("POST", "http://www.test.com/api/search/v2/query_with_cursor", False),
+        ("POST", "http://www.test.com/api/entitlements/v2/groups", False),
+        ("PUT", "http://www.test.com/api/search/v2/query", False),
+        ("DELETE", "http://www.test.com/api/entitlements/v2/groups/a", False),
+    )
+    def test_should_hedge(self, method, url, expected):
+        """Test only idempotent requests are hedged"""
+        self.assertEqual(expected, HedgingPolicy().should_hedge(method, url))
+
+    @params((0, 0.1), (101, 0.1), (95, -0.1), (95, 1.5))
+    def test_init_invalid(self, percentile, max_hedge_ratio):
+        """Test invalid percentile or ratio is rejected"""
+        with self.assertRaises(ValueError):
+            HedgingPolicy(percentile=percentile, max_hedge_ratio=max_hedge_ratio)
+
+    def test_delay_initial(self):
+        """Test the initial delay is used until enough samples are recorded"""
+        policy = HedgingPolicy(initial_delay=0.2, min_samples=5)
+        for _ in range(4):
+            policy.record_latency(0.01)
+
+        self.assertEqual(0.2, policy.delay())
+
+    def test_delay_percentile(self):
+        """Test the delay is the configured percentile of recorded latencies"""
+        policy = HedgingPolicy(percentile=90, min_delay=0, min_samples=10)
+        for i in range(1, 101):
+            policy.record_latency(i / 1000)
+
+        self.assertAlmostEqual(0.091, policy.delay())
+
+    def test_execute_fast_not_hedged(self):
+        """Test a call answering within the delay is not duplicated"""
+        policy = HedgingPolicy(max_hedge_ratio=1, initial_delay=1)
+        send = mock.Mock(return_value="response")
+
+        result = policy.execute(send)
+
+        self.assertEqual("response", result)
+        send.assert_called_once()
+        self.assertEqual(0, policy.hedges)
+
+    def test_execute_returns_fast_hedge_without_waiting(self):
+        """Test a winning hedge is returned without waiting for the slow first attempt"""
+        policy = HedgingPolicy(max_hedge_ratio=1, initial_delay=0.02)
+        calls = []
+
+        def send():
+            calls.append(1)
+            time.sleep(1 if len(calls) == 1 else 0.02)
+            return mock.Mock(status_code=200)
+
+        start = time.perf_counter()
+        policy.execute(send)
+        elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 0.3)
+        self.assertEqual(1, policy.hedge_wins)
+
+    def test_execute_closes_losing_response(self):
+        """Test the response losing the race is closed once it finishes"""
+        policy = HedgingPolicy(max_hedge_ratio=1, initial_delay=0.01)
+        slow = mock.Mock(status_code=200)
+        finished = threading.Event()
+        calls = []
+
+        def send():
+            calls.append(1)
+            if len(calls) == 1:
+                time.sleep(0.1)
+                finished.set()
+                return slow
+            return mock.Mock(status_code=200)
+
+        policy.execute(send)
+        finished.wait(1)
+        time.sleep(0.05)
+
+        slow.close.assert_called_once()
+
+    def test_execute_concurrency_independent_of_max_workers(self):
+        """Test concurrent callers aren't queued behind the hedge pool size"""
+        policy = HedgingPolicy(max_hedge_ratio=0, max_workers=1)
+        barrier = threading.Barrier(4, timeout=2)
+
+        def send():
+            barrier.wait()
+            return "response"
+
+        threads = [threading.Thread(target=policy.execute, args=(send,)) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        self.assertEqual("response", policy.execute(send))
+        for thread in threads:
+            thread.join()
+
+    def test_execute_attempts_bounded(self):
+        """Test a call finding every attempt thread busy is sent on the calling thread"""
+        policy = HedgingPolicy(max_hedge_ratio=1, initial_delay=0.01, max_attempts=1)
+        release = threading.Event()
+        busy = threading.Thread(target=policy.execute, args=(lambda: release.wait(2),))
+        busy.start()
+        time.sleep(0.05)
+        send = mock.Mock(side_effect=threading.current_thread)
+
+        self.assertIs(threading.current_thread(), policy.execute(send))
+        release.set()
+        busy.join()
+        send.assert_called_once()
+
+    def test_execute_hedge_skipped_when_busy(self):
+        """Test no hedge is sent while every hedge thread is busy"""
+        policy = HedgingPolicy(max_hedge_ratio=1, initial_delay=0.01, max_workers=1)
+
+        def send():
+            time.sleep(0.2)
+            return "response"
+
+        threads = [threading.Thread(target=policy.execute, args=(send,)) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(1, policy.hedges)
+
+    def test_execute_slow_hedged(self):
+        """Test a slow call is hedged and the response finishing first is used"""
+        policy = HedgingPolicy(max_hedge_ratio=1, initial_delay=0.01)
+        calls = []
+        hedged = threading.Event()
+
+        def send():
+            calls.append(1)
+            if len(calls) == 1:
+                hedged.wait(2)
+                time.sleep(0.05)
+                return "slow"
+            hedged.set()
+            return "fast"
+
+        result = policy.execute(send)
+
+        self.assertEqual("fast", result)
+        self.assertEqual(1, policy.hedges)
+        self.assertEqual(1, policy.hedge_wins)
+
+    def test_execute_error_response_does_not_win(self):
+        """Test a fast throttling response from the hedge doesn't beat a successful attempt"""
+        policy = HedgingPolicy(max_hedge_ratio=1, initial_delay=0.01)
+        calls = []
+
+        def send():
+            calls.append(1)
+            if len(calls) == 1:
+                time.sleep(0.1)
+                return mock.Mock(status_code=200)
+            return mock.Mock(status_code=429)
+
+        self.assertEqual(200, policy.execute(send).status_code)
+        self.assertEqual(0, policy.hedge_wins)
+
+    def test_execute_error_response_hedge_succeeds(self):
+        """Test a hedge succeeding is used when the first attempt answers with a server error"""
+        policy = HedgingPolicy(max_hedge_ratio=1, initial_delay=0.01)
+        calls = []
+
+        def send():
+            calls.append(1)
+            if len(calls) == 1:
+                time.sleep(0.05)
+                return mock.Mock(status_code=503)
+            time.sleep(0.1)
+            return mock.Mock(status_code=200)
+
+        self.assertEqual(200, policy.execute(send).status_code)
+        self.assertEqual(1, policy.hedge_wins)
+
+    def test_execute_hedge_budget(self):
+        """Test hedges are capped by the max hedge ratio"""
+        policy = HedgingPolicy(max_hedge_ratio=0.5, initial_delay=0.001)
+
+        def send():
+            time.sleep(0.01)
+            return "response"
+
+        for _ in range(10):
+            policy.execute(send)
+
+        self.assertEqual(10, policy.requests)
+        self.assertLessEqual(policy.hedges, 5)
+
+    def test_execute_first_fails_hedge_succeeds(self):
+        """Test a failing attempt doesn't hide a successful hedge"""
+        policy = HedgingPolicy(max_hedge_ratio=1, initial_delay=0.01)
+        calls = []
+
+        def send():
+            calls.append(1)
+            if len(calls) == 1:
+                time.sleep(0.05)
+                raise ConnectionError()
+            return "hedge"
+
+        self.assertEqual("hedge", policy.execute(send))
+
+    def test_execute_all_fail(self):
+        """Test the exception is raised if all attempts fail"""
+        policy = HedgingPolicy(max_hedge_ratio=1, initial_delay=0.01)
+
+        def send():
+            time.sleep(0.02)
+            raise ConnectionError()
+
+        with self.assertRaises(ConnectionError):
+            policy.execute(send)
+
+    def test_pickle(self):
+        """Test an unpickled policy keeps its settings and latencies but not the executor"""
+        policy = HedgingPolicy(percentile=50, min_samples=1)
+        policy.execute(lambda: "first")
+        copy = pickle.loads(pickle.dumps(policy))
+        self.assertEqual(policy.delay(), copy.delay())
+        self.assertEqual("second", copy.execute(lambda: "second"))
+
+    def test_fork_replaces_executor(self):
+        """Test a forked child creates its own executor, the parent's threads don't exist"""
+        policy = HedgingPolicy()
+        policy.execute(lambda: "parent")
+        executor = policy._get_executor()  # pylint: disable=protected-access
+        with mock.patch("osdu.hedging.os.getpid", return_value=os.getpid() + 1):
+            self.assertEqual("child", policy.execute(lambda: "child"))
+            self.assertIsNot(executor, policy._get_executor())  # pylint: disable=protected-access
+
+
+class TestOsduClientHedging(TestCase):
+    """Test cases for hedging in OsduClient"""
+
+    @mock.patch.object(OsduClient, "get_headers", return_value={"headers": "value"})
+    def test_get_uses_policy(self, _):
+        """Test get is executed through the hedging policy"""
+        policy = HedgingPolicy()
+        response_mock = mock.Mock()
+        with mock.patch.object(policy, "execute", return_value=response_mock) as mock_execute:
+            client = create_dummy_client(policy)
+            response = client.get("http://www.test.com/")
+
+            mock_execute.assert_called_once()
+            self.assertEqual(response_mock, response)
+
+    @params(
+        ("http://www.test.com/api/search/v2/query", 1),
+        ("http://www.test.com/api/entitlements/v2/groups", 0),
+    )
+    @mock.patch.object(OsduClient, "get_headers", return_value={"headers": "value"})
+    def test_post_uses_policy_for_query(self, url, expected_calls, _):
+        """Test only query posts are executed through the hedging policy"""
+        policy = HedgingPolicy()
+        response_mock = mock.Mock()
+        with mock.patch.object(policy, "execute", return_value=response_mock) as mock_execute, \
+                mock.patch("requests.Session.request", return_value=response_mock):
+            client = create_dummy_client(policy)
+            response = client.post(url, {"kind": "*:*:*:*"})
+
+            self.assertEqual(expected_calls, mock_execute.call_count)
+            self.assertEqual(response_mock, response)
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
@@ -0,0 +1,224 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+
+"""Test cases for instrumentation hooks"""
+
+from unittest.case import TestCase
+
+import mock
+import requests
+from nose2.tools import params
+
+from osdu import instrumentation
+from osdu._url import split_service_url
+from osdu.client import OsduClient
+from osdu.identity import OsduTokenCredential
+from osdu.instrumentation import (
+    CacheEvent,
+    Histogram,
+    HistogramAggregator,
+    RequestEndEvent,
+    RequestStartEvent,
+    TokenEvent,
+)
+
+
+def create_dummy_client(server_url="http://www.test.com"):
+    """Create a dummy client"""
+    credential = OsduTokenCredential(None, None, None, None)
+    return OsduClient(server_url, "opendes", credential, retries=1)
+
+
+def create_response(status_code=200, content=b'{"a": 1}', body=None):
+    """Create a response mock"""
+    response = mock.Mock(status_code=status_code, content=content, headers={})
+    response.request.body = body
+    return response
+
+
+class TestListeners(TestCase):
+    """Test cases for registering listeners"""
+
+    def tearDown(self):
+        for listener in instrumentation._listeners:  # pylint: disable=protected-access
+            instrumentation.remove_listener(listener)
+
+    def test_add_remove_listener(self):
+        """Test listeners receive events until removed"""
+        listener = mock.Mock()
+        self.assertFalse(instrumentation.has_listeners())
+
+        instrumentation.add_listener(listener)
+        self.assertTrue(instrumentation.has_listeners())
+        instrumentation.emit_cache_event("test", True)
+
+        instrumentation.remove_listener(listener)
+        self.assertFalse(instrumentation.has_listeners())
+        instrumentation.emit_cache_event("test", False)
+
+        listener.assert_called_once_with(CacheEvent("test", True))
+
+    def test_listener_error_ignored(self):
+        """Test a failing listener doesn't stop other listeners"""
+        failing = mock.Mock(side_effect=ValueError())
+        listener = mock.Mock()
+        instrumentation.add_listener(failing)
+        instrumentation.add_listener(listener)
+
+        instrumentation.emit_cache_event("test", True)
+
+        listener.assert_called_once()
+
+    @mock.patch.object(OsduTokenCredential, "get_token", return_value="token")
+    def test_request_events(self, _):
+        """Test request start and end events are emitted for each attempt"""
+        events = []
+        instrumentation.add_listener(events.append)
+        responses = [create_response(503), create_response(200, b"12345", b"abc")]
+        with mock.patch("requests.Session.request", side_effect=responses), \
+                mock.patch("time.sleep"):
+            create_dummy_client().post(
+                "http://www.test.com/api/entitlements/v2/groups/a@b.com/members", "abc"
+            )
+
+        request_events = [e for e in events if not isinstance(e, CacheEvent)]
+        self.assertEqual(4, len(request_events))
+        self.assertIsInstance(request_events[0], RequestStartEvent)
+        self.assertEqual(0, request_events[0].attempt)
+        self.assertEqual(503, request_events[1].status_code)
+        end = request_events[3]
+        self.assertIsInstance(end, RequestEndEvent)
+        self.assertEqual(
+            ("POST", "entitlements", "groups/{id}/members", 1, 200, 3, 5),
+            (
+                end.method, end.service, end.endpoint, end.attempt, end.status_code,
+                end.bytes_sent, end.bytes_received,
+            ),
+        )
+
+    @mock.patch.object(OsduTokenCredential, "get_token", return_value="token")
+    def test_request_error_event(self, _):
+        """Test an end event with the error is emitted when a request fails"""
+        events = []
+        instrumentation.add_listener(events.append)
+        with mock.patch("requests.Session.request", side_effect=requests.ConnectionError()), \
+                mock.patch("time.sleep"):
+            with self.assertRaises(requests.ConnectionError):
+                create_dummy_client().get("http://www.test.com/api/search/v2/health")
+
+        end_events = [e for e in events if isinstance(e, RequestEndEvent)]
+        self.assertEqual(2, len(end_events))
+        self.assertIsNone(end_events[0].status_code)
+        self.assertIsInstance(end_events[0].error, requests.ConnectionError)
+
+    def test_token_event(self):
+        """Test the token credential reports cache hits and refreshes"""
+        events = []
+        instrumentation.add_listener(events.append)
+        credential = OsduTokenCredential(None, None, None, None)
+        result = {"access_token": "token", "expires_in": 3600}
+        with mock.patch.object(credential, "_refresh_access_token", return_value=result):
+            credential.get_token()
+            credential.get_token()
+
+        self.assertEqual(["OsduTokenCredential"] * 2, [e.credential for e in events])
+        self.assertEqual([False, True], [e.cache_hit for e in events])
+
+    @mock.patch.object(OsduTokenCredential, "get_token", side_effect=["a", "a", "b"])
+    def test_header_cache_events(self, _):
+        """Test prepared header lookups are reported as cache events"""
+        events = []
+        instrumentation.add_listener(events.append)
+        client = create_dummy_client()
+        for _ in range(3):
+            client.get_headers()
+
+        self.assertEqual([False, True, False], [e.hit for e in events])
+
+
+class TestHistogram(TestCase):
+    """Test cases for Histogram"""
+
+    def test_observe(self):
+        """Test values are counted in the correct buckets"""
+        histogram = Histogram((1, 2, 5))
+        for value in (0.5, 1, 1.5, 3, 10):
+            histogram.observe(value)
+
+        self.assertEqual([2, 1, 1, 1], histogram.counts)
+        self.assertEqual(5, histogram.count)
+        self.assertEqual(16, histogram.sum)
+
+    @params((50, 2), (80, 5), (100, None))
+    def test_percentile(self, pct, expected):
+        """Test percentiles are estimated from the buckets"""
+        histogram = Histogram((1, 2, 5))
+        for value in (0.5, 1, 1.5, 3, 10):
+            histogram.observe(value)
+
+        self.assertEqual(expected, histogram.percentile(pct))
+
+    def test_percentile_empty(self):
+        """Test an empty histogram has no percentiles"""
+        self.assertIsNone(Histogram().percentile(50))
+
+
+class TestHistogramAggregator(TestCase):
+    """Test cases for HistogramAggregator"""
+
+    def test_snapshot(self):
+        """Test events are aggregated per service and endpoint"""
+        aggregator = HistogramAggregator()
+        aggregator(RequestEndEvent("GET", "u", "search", "query", 0, 200, 0.02, 10, 100))
+        aggregator(RequestEndEvent("GET", "u", "search", "query", 1, 500, 0.2, 10, 50))
+        aggregator(RequestEndEvent("GET", "u", "search", "query", 2, None, 1, 10, 0, OSError()))
+        aggregator(TokenEvent("OsduTokenCredential", 0.5, False))
+        aggregator(TokenEvent("OsduTokenCredential", 0.0, True))
+        aggregator(CacheEvent("headers", True))
+
+        snapshot = aggregator.snapshot()
+
+        query = snapshot["requests"]["search"]["query"]
+        self.assertEqual(3, query["latency"]["count"])
+        self.assertEqual(30, query["bytes_sent"])
+        self.assertEqual(150, query["bytes_received"])
+        self.assertEqual(2, query["retries"])
+        self.assertEqual(1, query["errors"])
+        self.assertEqual({200: 1, 500: 1}, query["status_codes"])
+        token = snapshot["tokens"]["OsduTokenCredential"]
+        self.assertEqual((1, 1), (token["cache_hits"], token["cache_misses"]))
+        self.assertEqual({"headers": {"hits": 1, "misses": 0}}, snapshot["caches"])
+
+        aggregator.reset()
+        self.assertEqual({}, aggregator.snapshot()["requests"])
+
+
+class TestSplitServiceUrl(TestCase):
+    """Test cases for describing urls"""
+
+    @params(
+        ("https://host/api/search/v2/query", ("search", "query")),
+        ("https://host/api/search/v2/query/", ("search", "query")),
+        (
+            "https://host/api/entitlements/v2/groups/data.x@opendes.contoso.com/members",
+            ("entitlements", "groups/{id}/members"),
+        ),
+        (
+            "https://host/api/storage/v2/records/opendes:master-data--Well:123/1234",
+            ("storage", "records/{id}/{id}"),
+        ),
+        ("https://host/other/path", ("host", "other/path")),
+    )
+    def test_split_service_url(self, url, expected):
+        """Test urls are split into service and redacted endpoint"""
+        self.assertEqual(expected, split_service_url(url))
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
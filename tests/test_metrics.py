@@ -0,0 +1,149 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+
+"""Test cases for the metrics registry"""
+
+import threading
+from unittest.case import TestCase
+
+import requests
+
+from osdu.instrumentation import CacheEvent, RequestEndEvent, TokenEvent
+from osdu.metrics import Counter, Histogram, MetricsRegistry
+
+
+def create_registry():
+    """Create a registry fed with a few events"""
+    registry = MetricsRegistry(buckets=(0.1, 1))
+    registry(RequestEndEvent("POST", "u", "search", "query", 0, 200, 0.05, 10, 100))
+    registry(RequestEndEvent("POST", "u", "search", "query", 1, 503, 0.5, 10, 0))
+    registry(RequestEndEvent("GET", "u", "search", "health", 0, None, 2, 0, 0, OSError()))
+    registry(TokenEvent("OsduTokenCredential", 0.2, False))
+    registry(TokenEvent("OsduTokenCredential", 0.0, True))
+    registry(CacheEvent("headers", True))
+    registry(CacheEvent("headers", True))
+    registry(CacheEvent("headers", False))
+    return registry
+
+
+class TestCounter(TestCase):
+    """Test cases for Counter"""
+
+    def test_threaded_increments(self):
+        """Test increments from many threads are all counted"""
+        counter = Counter("test_total", "Test.", ("label",))
+
+        def increment():
+            for _ in range(1000):
+                counter.inc(("a",))
+
+        threads = [threading.Thread(target=increment) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([{"labels": {"label": "a"}, "value": 8000}], counter.collect())
+
+    def test_finished_thread_shards_folded(self):
+        """Test shards of finished threads are folded into the totals instead of kept"""
+        counter = Counter("test_total", "Test.", ("label",))
+        for _ in range(100):
+            thread = threading.Thread(target=counter.inc, args=(("a",), 2))
+            thread.start()
+            thread.join()
+        counter.inc(("b",))
+
+        self.assertEqual(
+            [{"labels": {"label": "a"}, "value": 200}, {"labels": {"label": "b"}, "value": 1}], counter.collect()
+        )
+        self.assertEqual(1, len(counter._values._shards))  # pylint: disable=protected-access
+
+
+class TestHistogram(TestCase):
+    """Test cases for Histogram"""
+
+    def test_collect(self):
+        """Test bucket counts are cumulative"""
+        histogram = Histogram("test_seconds", "Test.", ("label",), (1, 2))
+        for value in (0.5, 1.5, 3):
+            histogram.observe(("a",), value)
+
+        sample, = histogram.collect()
+        self.assertEqual({1: 1, 2: 2, "+Inf": 3}, sample["buckets"])
+        self.assertEqual((3, 5.0), (sample["count"], sample["sum"]))
+
+
+class TestMetricsRegistry(TestCase):
+    """Test cases for MetricsRegistry"""
+
+    def test_snapshot(self):
+        """Test events are counted in the documented metrics"""
+        snapshot = create_registry().snapshot()
+
+        requests_total = {
+            (s["labels"]["endpoint"], s["labels"]["status"]): s["value"]
+            for s in snapshot["osdu_requests_total"]
+        }
+        self.assertEqual({("health", "error"): 1, ("query", "200"): 1, ("query", "503"): 1}, requests_total)
+        self.assertEqual(
+            [{"labels": {"service": "search", "endpoint": "query"}, "value": 1}],
+            snapshot["osdu_request_retries_total"],
+        )
+        self.assertEqual(20, snapshot["osdu_request_sent_bytes_total"][0]["value"])
+        self.assertEqual(
+            {"cache_hit": 1, "refresh": 1},
+            {s["labels"]["result"]: s["value"] for s in snapshot["osdu_token_requests_total"]},
+        )
+        self.assertEqual(
+            {"hit": 2, "miss": 1},
+            {s["labels"]["result"]: s["value"] for s in snapshot["osdu_cache_lookups_total"]},
+        )
+
+    def test_render_prometheus(self):
+        """Test metrics are rendered in the Prometheus text format"""
+        text = create_registry().render_prometheus()
+
+        self.assertIn("# TYPE osdu_requests_total counter", text)
+        self.assertIn(
+            'osdu_requests_total{service="search",endpoint="query",method="POST",status="200"} 1',
+            text,
+        )
+        self.assertIn(
+            'osdu_request_duration_seconds_bucket{service="search",endpoint="query",le="+Inf"} 2',
+            text,
+        )
+        self.assertIn('osdu_cache_lookups_total{cache="headers",result="hit"} 2', text)
+
+    def test_escape_labels(self):
+        """Test label values are escaped"""
+        registry = MetricsRegistry()
+        registry(CacheEvent('a"b\\c', True))
+
+        self.assertIn('cache="a\\"b\\\\c"', registry.render_prometheus())
+
+    def test_http_server(self):
+        """Test the metrics are served over http"""
+        registry = create_registry()
+        server = registry.start_http_server(0, "127.0.0.1")
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}"
+            response = requests.get(url + "/metrics", timeout=5)
+            missing = requests.get(url + "/other", timeout=5)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(registry.render_prometheus(), response.text)
+        self.assertEqual(404, missing.status_code)
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
@@ -0,0 +1,119 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+
+"""Test cases for recording request phase timings"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.case import TestCase
+
+from osdu import instrumentation
+from osdu.client import OsduClient
+from osdu.identity import OsduBaseCredential
+from osdu.instrumentation import HistogramAggregator, PhaseTimings, RequestEndEvent
+
+
+class _StaticCredential(OsduBaseCredential):
+    def get_token(self) -> str:
+        return "token"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Respond with a small json body"""
+        body = b'{"a": 1}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # noqa: A002 pylint: disable=redefined-builtin
+        pass
+
+
+class TestPhaseTimings(TestCase):
+    """Test cases for OsduClient record_phases"""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("localhost", 0), _Handler)
+        self.server.daemon_threads = True
+        threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+        ).start()
+        self.url = f"http://localhost:{self.server.server_address[1]}/api/search/v2/health"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        for listener in instrumentation._listeners:  # pylint: disable=protected-access
+            instrumentation.remove_listener(listener)
+
+    def test_response_timings(self):
+        """Test timings are set on the response and the connection is reused"""
+        client = OsduClient("http://localhost", "opendes", _StaticCredential(), record_phases=True)
+
+        first = client.get_returning_json(self.url)
+        first_timings = client.get(self.url).timings
+        second_timings = client.get(self.url).timings
+
+        self.assertEqual({"a": 1}, first)
+        self.assertIsInstance(first_timings, PhaseTimings)
+        self.assertTrue(first_timings.connection_reused)
+        self.assertTrue(second_timings.connection_reused)
+        self.assertGreaterEqual(second_timings.total, second_timings.ttfb)
+        self.assertEqual(0, second_timings.connect)
+
+    def test_new_connection_timings(self):
+        """Test a new connection records dns and connect time"""
+        client = OsduClient("http://localhost", "opendes", _StaticCredential(), record_phases=True)
+
+        timings = client.get(self.url).timings
+
+        self.assertFalse(timings.connection_reused)
+        self.assertGreater(timings.connect, 0)
+        self.assertGreater(timings.dns, 0)
+        self.assertEqual(0, timings.tls)
+        self.assertAlmostEqual(
+            timings.total,
+            timings.dns + timings.connect + timings.tls + timings.ttfb + timings.transfer,
+            places=6,
+        )
+
+    def test_disabled(self):
+        """Test no timings are recorded by default"""
+        client = OsduClient("http://localhost", "opendes", _StaticCredential())
+
+        response = client.get(self.url)
+
+        self.assertFalse(hasattr(response, "timings"))
+
+    def test_events(self):
+        """Test timings are included in request events and aggregated"""
+        events = []
+        aggregator = HistogramAggregator()
+        instrumentation.add_listener(events.append)
+        instrumentation.add_listener(aggregator)
+        client = OsduClient("http://localhost", "opendes", _StaticCredential(), record_phases=True)
+
+        client.get(self.url)
+        client.get(self.url)
+
+        end_events = [e for e in events if isinstance(e, RequestEndEvent)]
+        self.assertEqual([False, True], [e.timings.connection_reused for e in end_events])
+        health = aggregator.snapshot()["requests"]["search"]["health"]
+        self.assertEqual((1, 1), (health["connections_new"], health["connections_reused"]))
+        self.assertEqual(2, health["phases"]["ttfb"]["count"])
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
@@ -0,0 +1,178 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+
+"""Test cases for the process pool pipeline runner"""
+
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest.case import TestCase
+
+from nose2.tools import params
+
+from osdu.client import OsduClient
+from osdu.pipeline import CallbackSink, JsonLinesSink, ListSink, PipelineRunner
+from osdu.search import SearchClient
+from osdu.testing import FakeOsduServer, StaticTokenCredential, SyntheticDataset
+
+WELL = "osdu:wks:master-data--Well:1.0.0"
+
+
+def _ids(records: list) -> list:
+    return [record["id"] for record in records]
+
+
+def _shuffled_delay(values: list) -> list:
+    time.sleep(random.random() * 0.01)
+    return values
+
+
+def _fail(_):
+    raise ValueError("transform failed")
+
+
+def _failing_source():
+    yield 1
+    raise KeyError("source failed")
+
+
+class TestPipelineRunner(TestCase):
+    """Test cases for PipelineRunner"""
+
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(4)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    @params(1, 3, 100)
+    def test_ordered(self, batch_size):
+        """Test results are written in the order they were read"""
+        sink = ListSink()
+        runner = PipelineRunner(_shuffled_delay, sink, batch_size=batch_size, executor=self.executor)
+        stats = runner.run(range(50))
+        self.assertEqual(list(range(50)), sink.results)
+        self.assertEqual((50, -(-50 // batch_size), 50), stats[:3])
+
+    def test_unordered(self):
+        """Test all results are written when unordered"""
+        sink = ListSink()
+        runner = PipelineRunner(_shuffled_delay, sink, batch_size=2, ordered=False, executor=self.executor)
+        runner.run(range(50))
+        self.assertEqual(list(range(50)), sorted(sink.results))
+
+    def test_multiple_sources(self):
+        """Test every source is read"""
+        sink = ListSink()
+        runner = PipelineRunner(_shuffled_delay, sink, batch_size=4, executor=self.executor)
+        stats = runner.run(range(10), range(100, 120), [])
+        self.assertEqual(list(range(10)) + list(range(100, 120)), sorted(sink.results))
+        self.assertEqual(30, stats.records_read)
+
+    def test_backpressure(self):
+        """Test reading stops while max_pending batches are waiting to be written"""
+        read = []
+        release = threading.Event()
+
+        def source():
+            for value in range(100):
+                read.append(value)
+                yield value
+
+        def blocked(values):
+            release.wait(5)
+            return values
+
+        sink = ListSink()
+        runner = PipelineRunner(blocked, sink, batch_size=1, max_pending=2, executor=self.executor)
+        thread = threading.Thread(target=runner.run, args=(source(),))
+        thread.start()
+        try:
+            time.sleep(0.3)
+            # 2 pending, 1 waiting to be submitted, 2 in the queue and 1 waiting to be put
+            self.assertLessEqual(len(read), 6)
+        finally:
+            release.set()
+            thread.join(5)
+        self.assertEqual(list(range(100)), sink.results)
+
+    def test_transform_error(self):
+        """Test a transform error is raised"""
+        runner = PipelineRunner(_fail, ListSink(), batch_size=1, executor=self.executor)
+        with self.assertRaisesRegex(ValueError, "transform failed"):
+            runner.run(range(100))
+
+    def test_source_error(self):
+        """Test a source error is raised"""
+        runner = PipelineRunner(_shuffled_delay, ListSink(), executor=self.executor)
+        with self.assertRaisesRegex(KeyError, "source failed"):
+            runner.run(_failing_source())
+
+    def test_invalid_batch_size(self):
+        """Test batch size must be positive"""
+        with self.assertRaises(ValueError):
+            PipelineRunner(_ids, ListSink(), batch_size=0)
+
+    def test_callback_sink(self):
+        """Test the callback gets each batch"""
+        batches = []
+        PipelineRunner(_shuffled_delay, CallbackSink(batches.append), batch_size=2, executor=self.executor).run(
+            range(5)
+        )
+        self.assertEqual([[0, 1], [2, 3], [4]], batches)
+
+    def test_json_lines_sink(self):
+        """Test results are written as json lines"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "out.jsonl")
+            with JsonLinesSink(path) as sink:
+                PipelineRunner(_shuffled_delay, sink, executor=self.executor).run([{"a": 1}, {"b": 2}])
+            with open(path, encoding="utf8") as file:
+                self.assertEqual([{"a": 1}, {"b": 2}], [json.loads(line) for line in file])
+
+
+class TestPipelineSearch(TestCase):
+    """Test cases for running a pipeline on search results in a process pool"""
+
+    def test_process_pool(self):
+        """Test records from a search scan are transformed in worker processes"""
+        with FakeOsduServer(SyntheticDataset(records=100, record_size=16)) as server:
+            client = OsduClient(server.url, "opendes", StaticTokenCredential())
+            records = SearchClient(client).iter_query_records(WELL, limit=10)
+            sink = ListSink()
+            with ProcessPoolExecutor(2, mp_context=multiprocessing.get_context("fork")) as executor:
+                stats = PipelineRunner(_ids, sink, batch_size=7, executor=executor).run(records)
+        self.assertEqual([f"opendes:master-data--Well:{i}" for i in range(0, 100, 2)], sink.results)
+        self.assertEqual(50, stats.results_written)
+
+    def test_default_pool(self):
+        """Test a process pool is created for the run when no executor is given"""
+        sink = ListSink()
+        PipelineRunner(_shuffled_delay, sink, batch_size=3, max_workers=2).run(range(20))
+        self.assertEqual(list(range(20)), sink.results)
+
+    def test_default_pool_started_before_readers(self):
+        """Test the workers of the default pool exist before sources are read in reader threads"""
+        workers = []
+
+        def source():
+            workers.extend(multiprocessing.active_children())
+            yield from range(10)
+
+        PipelineRunner(_shuffled_delay, ListSink(), batch_size=3, max_workers=2).run(source())
+        self.assertEqual(2, len(workers))
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
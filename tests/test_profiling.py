@@ -0,0 +1,102 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+
+"""Test cases for sampled profiling"""
+
+import os
+import pstats
+import tempfile
+import tracemalloc
+from unittest.case import TestCase
+
+import mock
+
+from osdu import profiling
+from osdu.client import OsduClient
+from osdu.identity import OsduTokenCredential
+from osdu.profiling import SampledProfiler
+from osdu.search import SearchClient
+
+
+def create_dummy_client(server_url="http://www.test.com"):
+    """Create a dummy client"""
+    credential = OsduTokenCredential(None, None, None, None)
+    return OsduClient(server_url, "opendes", credential, retries=2)
+
+
+class TestSampledProfiler(TestCase):
+    """Test cases for SampledProfiler"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+
+    def tearDown(self):
+        profiling.set_profiler(None)
+        self.directory.cleanup()
+
+    def test_should_sample(self):
+        """Test 1 in every sample_rate calls is sampled"""
+        profiler = SampledProfiler(self.directory.name, sample_rate=3)
+
+        samples = [profiler.should_sample() for _ in range(7)]
+
+        self.assertEqual([True, False, False, True, False, False, True], samples)
+
+    def test_invalid_sample_rate(self):
+        """Test a sample rate below 1 is rejected"""
+        with self.assertRaises(ValueError):
+            SampledProfiler(self.directory.name, sample_rate=0)
+
+    def test_profile_written(self):
+        """Test cpu and memory profiles are written to the directory"""
+        profiler = SampledProfiler(self.directory.name, memory=True)
+
+        with profiler.profile("search.query"):
+            sorted(range(1000))
+
+        files = sorted(os.listdir(self.directory.name))
+        self.assertEqual(2, len(files))
+        self.assertTrue(files[0].startswith("search.query-"))
+        self.assertTrue(files[0].endswith(".prof"))
+        self.assertTrue(files[1].endswith(".tracemalloc"))
+        pstats.Stats(os.path.join(self.directory.name, files[0]))
+        tracemalloc.Snapshot.load(os.path.join(self.directory.name, files[1]))
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertEqual(1, profiler.profiles_written)
+
+    def test_nested_profile_skipped(self):
+        """Test only one call is profiled at a time"""
+        profiler = SampledProfiler(self.directory.name)
+
+        with profiler.profile("outer"):
+            with profiler.profile("inner"):
+                pass
+
+        self.assertEqual(1, profiler.profiles_written)
+
+    @mock.patch.object(OsduTokenCredential, "get_token", return_value="token")
+    def test_service_operation_sampled(self, _):
+        """Test service client operations are profiled according to the sample rate"""
+        profiler = SampledProfiler(self.directory.name, sample_rate=2)
+        profiling.set_profiler(profiler)
+        response = mock.Mock(status_code=200, headers={})
+        response.json.return_value = {"results": [], "totalCount": 0}
+        search_client = SearchClient(create_dummy_client())
+        with mock.patch("requests.Session.request", return_value=response):
+            for _ in range(3):
+                search_client.query_by_kind("a:b:c:1.0.0")
+
+        self.assertEqual(2, profiler.profiles_written)
+        self.assertTrue(
+            all(name.startswith("search.query_by_kind-") for name in os.listdir(self.directory.name))
+        )
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
@@ -0,0 +1,267 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+
+"""Test cases for the fake OSDU server"""
+
+import json
+import os
+import tempfile
+import time
+from unittest.case import TestCase
+
+import msal
+import requests
+import vcr
+from nose2.tools import params
+
+from osdu.client import OsduClient
+from osdu.entitlements import EntitlementsClient
+from osdu.identity import OsduMsalNonInteractiveCredential, OsduTokenCredential
+from osdu.search import SearchClient
+from osdu.testing import (
+    FAKE_AUTHORITY_BASE,
+    FakeAuthorityHttpClient,
+    FakeEntitlements,
+    FakeOsduServer,
+    Faults,
+    StaticTokenCredential,
+    SyntheticDataset,
+    bimodal_latency,
+    constant_latency,
+    lognormal_latency,
+    record_session,
+    replay_session,
+    timing_path,
+    uniform_latency,
+)
+
+WELL = "osdu:wks:master-data--Well:1.0.0"
+
+
+class TestFakeOsduServer(TestCase):
+    """Test cases for FakeOsduServer"""
+
+    def setUp(self):
+        self.server = FakeOsduServer(
+            SyntheticDataset(records=25, record_size=16), FakeEntitlements(groups=3, members_per_group=4)
+        ).start()
+        self.client = OsduClient(self.server.url, "opendes", StaticTokenCredential(), retries=10)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_query_pages_with_cursor(self):
+        """Test paging through all records of a kind"""
+        records = list(SearchClient(self.client).iter_query_records(WELL, limit=5))
+        self.assertEqual(13, len(records))
+        self.assertEqual(len(records), len({record["id"] for record in records}))
+        self.assertTrue(all(record["kind"] == WELL for record in records))
+
+    def test_query_by_id(self):
+        """Test a query by id returns the single record"""
+        response = SearchClient(self.client).query_by_id("opendes:master-data--Wellbore:3")
+        self.assertEqual(1, response["totalCount"])
+        self.assertEqual("opendes:master-data--Wellbore:3", response["results"][0]["id"])
+
+    def test_query_returned_fields(self):
+        """Test only the returned fields are included"""
+        response = SearchClient(self.client).query_with_cursor(
+            WELL, limit=1, returned_fields=["id", "data.FacilityName"]
+        )
+        self.assertEqual(
+            {"id": "opendes:master-data--Well:0", "data": {"FacilityName": "master-data--Well 0"}},
+            response["results"][0],
+        )
+
+    def test_query_all_aggregated(self):
+        """Test records are counted by kind"""
+        response = SearchClient(self.client).query_all_aggregated()
+        self.assertEqual(
+            [{"key": WELL, "count": 13}, {"key": "osdu:wks:master-data--Wellbore:1.0.0", "count": 12}],
+            response["aggregations"],
+        )
+
+    def test_entitlements(self):
+        """Test adding and removing groups and members"""
+        entitlements = EntitlementsClient(self.client)
+        self.assertEqual(3, len(entitlements.list_groups()["groups"]))
+
+        entitlements.add_group("data.new.viewers", "new group")
+        group = "data.new.viewers@opendes.contoso.com"
+        entitlements.add_member_to_group("someone@contoso.com", group, "OWNER")
+        self.assertEqual(
+            [{"email": "someone@contoso.com", "role": "OWNER"}],
+            entitlements.list_group_members(group)["members"],
+        )
+        entitlements.remove_member_from_group("someone@contoso.com", group)
+        self.assertEqual([], entitlements.list_group_members(group)["members"])
+        entitlements.delete_group(group)
+        self.assertEqual(3, len(entitlements.list_groups()["groups"]))
+
+    def test_entitlements_errors(self):
+        """Test conflicts and missing groups are reported as by the real service"""
+        url = self.server.url + "/api/entitlements/v2/groups"
+        response = self.client.post(url, {"name": "data.fake0.viewers"})
+        self.assertEqual(409, response.status_code)
+        response = self.client.get(url + "/missing@opendes.contoso.com/members")
+        self.assertEqual(404, response.status_code)
+
+    def test_members_role_filter(self):
+        """Test listing members filtered by role"""
+        url = self.server.url + "/api/entitlements/v2/groups/data.fake0.viewers@opendes.contoso.com/members"
+        members = self.client.get_returning_json(url + "?role=OWNER")["members"]
+        self.assertEqual([{"email": "user0@contoso.com", "role": "OWNER"}], members)
+
+    def test_health(self):
+        """Test health checks succeed"""
+        self.assertTrue(SearchClient(self.client).is_healthy())
+        self.assertTrue(EntitlementsClient(self.client).is_healthy())
+
+    def test_request_counts(self):
+        """Test requests are counted by endpoint"""
+        SearchClient(self.client).query_by_id("opendes:master-data--Well:0")
+        SearchClient(self.client).query_by_id("opendes:master-data--Well:1")
+        self.assertEqual({("POST", "search", "query"): 2}, self.server.request_counts)
+
+    @params(429, 503)
+    def test_faults_are_retried(self, status):
+        """Test injected faults are retried by the client until they succeed"""
+        rates = {"status_429_rate": 0.5} if status == 429 else {"status_503_rate": 0.5}
+        self.server.faults = Faults(retry_after=0, seed=1, **rates)
+        search = SearchClient(self.client)
+        for _ in range(10):
+            self.assertEqual(1, search.query_by_id("opendes:master-data--Well:0")["totalCount"])
+        self.assertGreater(self.server.request_counts[("POST", "search", "query")], 10)
+
+    def test_fault_response(self):
+        """Test a faulted response has the status and Retry-After header"""
+        self.server.faults = Faults(status_429_rate=1, retry_after=3)
+        response = requests.get(self.server.url + "/api/search/v2/info", timeout=5)
+        self.assertEqual(429, response.status_code)
+        self.assertEqual("3", response.headers["Retry-After"])
+        response = requests.post(self.server.url + "/token", timeout=5)
+        self.assertEqual(200, response.status_code)
+
+    def test_slow_drip_times_out(self):
+        """Test a slowly dripped body triggers the client read timeout"""
+        self.server.faults = Faults(drip_chunk_size=100, drip_interval=0.2)
+        client = OsduClient(self.server.url, "opendes", StaticTokenCredential(), timeout=(1, 0.1))
+        with self.assertRaises((requests.Timeout, requests.ConnectionError)):
+            SearchClient(client).query(WELL, limit=5)
+
+    def test_latency(self):
+        """Test latency is added to each request"""
+        self.server.latency = 0.1
+        start = time.perf_counter()
+        SearchClient(self.client).is_healthy()
+        self.assertGreaterEqual(time.perf_counter() - start, 0.1)
+
+    def test_refresh_token(self):
+        """Test OsduTokenCredential refreshes against the token endpoint"""
+        credential = OsduTokenCredential("client", self.server.url + "/token", "refresh", "secret")
+        self.assertEqual("token", credential.get_token())
+
+    def test_msal_fake_authority(self):
+        """Test msal gets a client credentials token from the fake authority"""
+        app = msal.ConfidentialClientApplication(
+            "client",
+            client_credential="secret",
+            authority=FAKE_AUTHORITY_BASE + "/tenant",
+            http_client=FakeAuthorityHttpClient(self.server.url),
+            instance_discovery=False,
+        )
+        credential = OsduMsalNonInteractiveCredential(
+            "client", "secret", FAKE_AUTHORITY_BASE + "/tenant", "scope", app
+        )
+        self.assertEqual("token", credential.get_token())
+
+
+class TestReplay(TestCase):
+    """Test cases for recording and replaying sessions"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.path = os.path.join(self.directory.name, "scan.json")
+        with FakeOsduServer(SyntheticDataset(records=20, record_size=16), latency=0.02) as server:
+            client = OsduClient(server.url, "opendes", OsduTokenCredential("client", server.url + "/token", "r", "s"))
+            with record_session(self.path):
+                self.records = list(SearchClient(client).iter_query_records(WELL, limit=4))
+        self.url = server.url
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_record(self):
+        """Test only API requests are recorded, with their latency and without credentials"""
+        with open(self.path, encoding="utf8") as file:
+            interactions = json.load(file)["interactions"]
+        with open(timing_path(self.path), encoding="utf8") as file:
+            latencies = json.load(file)["latencies"]
+        self.assertEqual(3, len(interactions))
+        self.assertEqual(3, len(latencies))
+        self.assertTrue(all(latency >= 0.02 for latency in latencies))
+        self.assertTrue(all("/api/search/v2/query_with_cursor" in item["request"]["uri"] for item in interactions))
+        self.assertTrue(all("Authorization" not in item["request"]["headers"] for item in interactions))
+
+    @params(0, 1)
+    def test_replay(self, latency_scale):
+        """Test replaying gives the recorded records, waiting the scaled recorded latency"""
+        client = OsduClient(self.url, "opendes", StaticTokenCredential())
+        start = time.perf_counter()
+        with replay_session(self.path, latency_scale) as cassette:
+            records = list(SearchClient(client).iter_query_records(WELL, limit=4))
+            self.assertTrue(cassette.all_played)
+        elapsed = time.perf_counter() - start
+        self.assertEqual(self.records, records)
+        if latency_scale:
+            self.assertGreaterEqual(elapsed, 0.06)
+        else:
+            self.assertLess(elapsed, 0.06)
+
+    def test_replay_unrecorded_request(self):
+        """Test a request missing from the cassette isn't sent"""
+        client = OsduClient(self.url, "opendes", StaticTokenCredential())
+        with replay_session(self.path, 0):
+            with self.assertRaises(vcr.errors.CannotOverwriteExistingCassetteException):
+                SearchClient(client).query_all_aggregated()
+
+
+class TestLatency(TestCase):
+    """Test cases for the latency distributions"""
+
+    def test_constant(self):
+        """Test constant latency"""
+        self.assertEqual(0.5, constant_latency(0.5)())
+
+    def test_uniform(self):
+        """Test uniform latency is within bounds"""
+        latency = uniform_latency(0.1, 0.2, seed=1)
+        self.assertTrue(all(0.1 <= latency() <= 0.2 for _ in range(100)))
+
+    def test_lognormal_median(self):
+        """Test lognormal latency has about the given median"""
+        latency = lognormal_latency(0.01, seed=1)
+        values = sorted(latency() for _ in range(1001))
+        self.assertAlmostEqual(0.01, values[500], delta=0.001)
+
+    def test_bimodal(self):
+        """Test bimodal latency has about the given fraction of slow requests"""
+        latency = bimodal_latency(0.01, 1, 0.1, seed=1)
+        slow = sum(1 for _ in range(1000) if latency() == 1)
+        self.assertAlmostEqual(100, slow, delta=30)
+
+    def test_seeded_repeatable(self):
+        """Test seeded distributions repeat"""
+        first = lognormal_latency(0.01, seed=3)
+        second = lognormal_latency(0.01, seed=3)
+        self.assertEqual([first() for _ in range(5)], [second() for _ in range(5)])
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()
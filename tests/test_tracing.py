@@ -0,0 +1,209 @@
+# -----------------------------------------------------------------------------
+# Copyright (c) Equinor ASA. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# -----------------------------------------------------------------------------
+
+
+"""Test cases for tracing"""
+
+import json
+import os
+import tempfile
+from unittest.case import TestCase
+
+import mock
+from requests.models import HTTPError
+
+from osdu import tracing
+from osdu.client import OsduClient
+from osdu.identity import OsduTokenCredential
+from osdu.search import SearchClient
+from osdu.storage import StorageClient
+from osdu.tracing import FileSpanExporter, InMemorySpanExporter, Span, Tracer
+
+
+def create_dummy_client(server_url="http://www.test.com"):
+    """Create a dummy client"""
+    credential = OsduTokenCredential(None, None, None, None)
+    return OsduClient(server_url, "opendes", credential, retries=2)
+
+
+def create_response(status_code=200, json_data=None):
+    """Create a response mock"""
+    response = mock.Mock(status_code=status_code, headers={})
+    response.json.return_value = json_data
+    return response
+
+
+class TestSpan(TestCase):
+    """Test cases for Span"""
+
+    def test_child_span(self):
+        """Test a child span shares the trace of its parent"""
+        parent = Span("parent")
+        child = Span("child", parent)
+
+        self.assertEqual(parent.trace_id, child.trace_id)
+        self.assertEqual(parent.span_id, child.parent_span_id)
+        self.assertEqual(32, len(parent.trace_id))
+        self.assertEqual(f"00-{child.trace_id}-{child.span_id}-01", child.traceparent)
+
+    def test_record_exception(self):
+        """Test exceptions are recorded and mark the span as failed"""
+        span = Span("test")
+        span.record_exception(ValueError("bad"))
+        span.end()
+
+        data = span.to_dict()
+        self.assertEqual({"code": "ERROR", "description": "bad"}, data["status"])
+        self.assertEqual("ValueError", data["events"][0]["attributes"]["exception.type"])
+        self.assertIsNotNone(data["end_time_unix_nano"])
+
+
+class TestTracer(TestCase):
+    """Test cases for Tracer and the exporters"""
+
+    def test_nested_spans(self):
+        """Test spans started within a span are its children"""
+        exporter = InMemorySpanExporter()
+        tracer = Tracer(exporter)
+        with tracer.span("outer") as outer:
+            with tracer.span("inner"):
+                pass
+        with tracer.span("other"):
+            pass
+
+        inner, _, other = exporter.spans
+        self.assertEqual(outer.span_id, inner.parent_span_id)
+        self.assertIsNone(other.parent_span_id)
+        self.assertNotEqual(outer.trace_id, other.trace_id)
+
+    def test_inject_keeps_correlation_id(self):
+        """Test an existing correlation-id header is kept"""
+        span = Span("test")
+        headers = {"correlation-id": "abc"}
+        Tracer(InMemorySpanExporter()).inject(span, headers)
+
+        self.assertEqual({"correlation-id": "abc", "traceparent": span.traceparent}, headers)
+
+    def test_file_exporter(self):
+        """Test spans are written to file as json lines"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "spans.jsonl")
+            tracer = Tracer(FileSpanExporter(path))
+            with tracer.span("first", attributes={"a": 1}):
+                pass
+            with self.assertRaises(ValueError):
+                with tracer.span("second"):
+                    raise ValueError()
+
+            with open(path, encoding="utf8") as file:
+                spans = [json.loads(line) for line in file]
+
+        self.assertEqual(["first", "second"], [span["name"] for span in spans])
+        self.assertEqual({"a": 1}, spans[0]["attributes"])
+        self.assertEqual("ERROR", spans[1]["status"]["code"])
+
+    def test_open_telemetry_missing(self):
+        """Test a clear error is raised if opentelemetry isn't installed"""
+        with mock.patch.dict("sys.modules", {"opentelemetry": None}):
+            with self.assertRaises(ImportError):
+                tracing.OpenTelemetryTracer()
+
+
+class TestClientTracing(TestCase):
+    """Test cases for tracing OsduClient and service client calls"""
+
+    def setUp(self):
+        self.exporter = InMemorySpanExporter()
+        tracing.set_tracer(Tracer(self.exporter))
+
+    def tearDown(self):
+        tracing.set_tracer(None)
+
+    @mock.patch.object(OsduTokenCredential, "get_token", return_value="token")
+    def test_request_span(self, _):
+        """Test a span with retry count and propagation headers is created per request"""
+        responses = [create_response(503), create_response(200)]
+        with mock.patch("requests.Session.request", side_effect=responses) as mock_request, \
+                mock.patch("time.sleep"):
+            create_dummy_client().get("http://www.test.com/api/search/v2/health")
+
+        span, = self.exporter.spans
+        self.assertEqual("GET search/health", span.name)
+        self.assertEqual(1, span.attributes["osdu.retry_count"])
+        self.assertEqual(200, span.attributes["http.response.status_code"])
+        self.assertEqual("opendes", span.attributes["osdu.data_partition"])
+        self.assertEqual("OK", span.status)
+        headers = mock_request.call_args.kwargs["headers"]
+        self.assertEqual(span.traceparent, headers["traceparent"])
+        self.assertEqual(span.trace_id, headers["correlation-id"])
+
+    @mock.patch.object(OsduTokenCredential, "get_token", return_value="token")
+    def test_request_span_error(self, _):
+        """Test a span for a failed request is marked as an error"""
+        with mock.patch("requests.Session.request", return_value=create_response(404)):
+            with self.assertRaises(HTTPError):
+                create_dummy_client().get("http://www.test.com/api/search/v2/health", [200])
+
+        span, = self.exporter.spans
+        self.assertEqual("ERROR", span.status)
+
+    @mock.patch.object(OsduTokenCredential, "get_token", return_value="token")
+    def test_service_operation_span(self, _):
+        """Test service client operations are parents of their request spans"""
+        response = create_response(200, {"results": [], "totalCount": 0})
+        with mock.patch("requests.Session.request", return_value=response):
+            SearchClient(create_dummy_client()).query_by_kind("a:b:c:1.0.0")
+
+        request, operation = self.exporter.spans
+        self.assertEqual("search.query_by_kind", operation.name)
+        self.assertEqual(
+            {"osdu.service": "search", "osdu.service_version": "2", "osdu.data_partition": "opendes"},
+            operation.attributes,
+        )
+        self.assertEqual(operation.span_id, request.parent_span_id)
+
+    @mock.patch.object(OsduTokenCredential, "get_token", return_value="token")
+    def test_generator_operation_span(self, _):
+        """Test generator operations are traced until exhausted"""
+        pages = [
+            create_response(200, {"results": [{"id": 1}], "cursor": "c"}),
+            create_response(200, {"results": [{"id": 2}], "cursor": None}),
+        ]
+        with mock.patch("requests.Session.request", side_effect=pages):
+            records = list(SearchClient(create_dummy_client()).iter_query_records("a:b:c:1.0.0"))
+
+        self.assertEqual([{"id": 1}, {"id": 2}], records)
+        names = [span.name for span in self.exporter.spans]
+        self.assertEqual("search.iter_query_records", names[-1])
+        self.assertEqual("search.iter_query_pages", names[-2])
+        outer = self.exporter.spans[-1]
+        self.assertTrue(all(span.trace_id == outer.trace_id for span in self.exporter.spans))
+
+    @mock.patch.object(OsduTokenCredential, "get_token", return_value="token")
+    def test_private_generator_operation_span(self, _):
+        """Test a generator returned by a public method is traced with the public name"""
+        response = create_response(200, {"records": [{"id": "a"}], "invalidRecords": [], "retryRecords": []})
+        with mock.patch("requests.Session.request", return_value=response):
+            batches = list(StorageClient(create_dummy_client()).get_records(["a"]))
+
+        self.assertEqual([{"id": "a"}], batches[0].records)
+        self.assertEqual("storage.get_records", self.exporter.spans[-1].name)
+
+    @mock.patch.object(OsduTokenCredential, "get_token", return_value="token")
+    def test_disabled(self, _):
+        """Test no spans or headers are added when tracing is disabled"""
+        tracing.set_tracer(None)
+        with mock.patch("requests.Session.request", return_value=create_response()) as mock_request:
+            create_dummy_client().get("http://www.test.com/api/search/v2/health")
+
+        self.assertNotIn("traceparent", mock_request.call_args.kwargs["headers"])
+        self.assertEqual([], self.exporter.spans)
+
+
+if __name__ == "__main__":
+    import nose2
+
+    nose2.main()